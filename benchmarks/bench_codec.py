@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Compares the available JSON codecs on the sample series, episode and update payloads.
+
+    PYTHONPATH="." python benchmarks/bench_codec.py [-n 200]
+"""
+import argparse
+import time
+
+from fixtures import load_fixture, episode_pages
+from tvdbrest.codec import JSONCodec, OrjsonCodec
+
+
+def _codecs():
+    codecs = [JSONCodec()]
+    try:
+        codecs.append(OrjsonCodec())
+    except RuntimeError:
+        print("orjson not installed - skipping")
+    return codecs
+
+
+def _bench(codec, payload, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        decoded = codec.loads(payload)
+    decode = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(n):
+        codec.dumps(decoded)
+    encode = time.perf_counter() - start
+    return decode, encode
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    payloads = [
+        ('series', load_fixture('series_71663.json')),
+        ('episodes page', episode_pages()[0]),
+        ('updates', load_fixture('updates.json')),
+    ]
+
+    for label, payload in payloads:
+        print("%s (%d bytes)" % (label, len(payload)))
+        for codec in _codecs():
+            decode, encode = _bench(codec, payload, args.iterations)
+            print("  %-8s decode %8.1f us  %7.1f MB/s   encode %8.1f us" % (
+                codec.name, decode * 1e6 / args.iterations, len(payload) * args.iterations / decode / 1e6,
+                encode * 1e6 / args.iterations))
+
+
+if __name__ == '__main__':
+    main()
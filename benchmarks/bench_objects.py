@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Compares memory usage and attribute access speed of the dict-backed API objects with their compact
+(``__slots__``-based) variants.
+
+    PYTHONPATH="." python benchmarks/bench_objects.py [-n 100000]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from tvdbrest.compact import CompactEpisode
+from tvdbrest.objects import Episode
+
+
+def _episode_json(i):
+    return {
+        'id': i,
+        'airedSeason': i // 20 + 1,
+        'airedSeasonID': 1000 + i // 20,
+        'airedEpisodeNumber': i % 20 + 1,
+        'episodeName': 'Episode %s' % i,
+        'firstAired': '2017-%02d-%02d' % (i % 12 + 1, i % 28 + 1),
+        'guestStars': [],
+        'director': 'Director',
+        'directors': ['Director'],
+        'writers': ['Writer'],
+        'overview': 'Overview of episode %s' % i,
+        'language': {'episodeName': 'en', 'overview': 'en'},
+        'productionCode': '',
+        'showUrl': '',
+        'lastUpdated': 1487000000 + i,
+        'dvdDiscid': '',
+        'dvdSeason': None,
+        'dvdEpisodeNumber': None,
+        'dvdChapter': None,
+        'absoluteNumber': i + 1,
+        'filename': 'episodes/%s.jpg' % i,
+        'seriesId': 71663,
+        'lastUpdatedBy': 1,
+        'airsAfterSeason': None,
+        'airsBeforeSeason': None,
+        'airsBeforeEpisode': None,
+        'thumbAuthor': 1,
+        'thumbAdded': '',
+        'thumbWidth': '400',
+        'thumbHeight': '225',
+        'imdbId': 'tt%07d' % i,
+        'siteRating': 7.5,
+        'siteRatingCount': 10,
+    }
+
+
+def _measure(label, cls, n):
+    payloads = [_episode_json(i) for i in range(n)]
+    gc.collect()
+
+    start = time.perf_counter()
+    objects = [cls(d, None) for d in payloads]
+    build = time.perf_counter() - start
+    del payloads
+
+    # memory held by the objects, including the decoded JSON the dict-backed objects keep alive
+    gc.collect()
+    tracemalloc.start()
+    objects = [cls(_episode_json(i), None) for i in range(n)]
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(3):
+        for o in objects:
+            o.episodeName
+            o.airedSeason
+            o.firstAired
+            o.lastUpdated
+    access = time.perf_counter() - start
+
+    print("%-16s build %7.3fs  memory %8.1f MiB (%5d B/object)  attribute access %7.3fs" % (
+        label, build, memory / 1024.0 / 1024.0, memory / n, access))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--objects', type=int, default=100000)
+    args = parser.parse_args()
+
+    _measure("Episode", Episode, args.objects)
+    _measure("CompactEpisode", CompactEpisode, args.objects)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Compares a new connection per request (module level ``requests.request``) with the pooled keep-alive
+:class:`tvdbrest.transport.SessionTransport` against the local stub server.
+
+    PYTHONPATH="." python benchmarks/bench_transport.py [-n 500] [--certfile cert.pem --keyfile key.pem]
+
+Pass a certificate and key to measure TLS handshakes as well (the client does not verify the certificate).
+"""
+import argparse
+import time
+
+import requests
+import urllib3
+
+from stub_server import StubServer
+from tvdbrest.transport import SessionTransport
+
+
+def _run(label, request_func, url, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        response = request_func('get', url, verify=False)
+        response.content
+    elapsed = time.perf_counter() - start
+    print("%-24s %6d requests  %8.3fs  %8.1f req/s  %6.3f ms/req" % (label, n, elapsed, n / elapsed,
+                                                                      elapsed * 1000 / n))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--requests', type=int, default=500)
+    parser.add_argument('--certfile')
+    parser.add_argument('--keyfile')
+    args = parser.parse_args()
+
+    urllib3.disable_warnings()
+    server = StubServer(certfile=args.certfile, keyfile=args.keyfile).start()
+    url = server.base_url + 'series/1'
+    try:
+        unpooled = _run("requests.request", requests.request, url, args.requests)
+
+        transport = SessionTransport()
+        pooled = _run("SessionTransport", transport.request, url, args.requests)
+        transport.close()
+
+        print("speedup: %.2fx" % (unpooled / pooled))
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""
+Access to the sample API responses (modelled on api.thetvdb.com responses) in ``benchmarks/fixtures``.
+"""
+import glob
+import os
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def fixture_path(name):
+    return os.path.join(FIXTURE_DIR, name)
+
+
+def load_fixture(name):
+    with open(fixture_path(name), 'rb') as f:
+        return f.read()
+
+
+def episode_pages(series_id=71663):
+    paths = sorted(glob.glob(fixture_path('episodes_%s_page*.json' % series_id)),
+                   key=lambda p: int(p.rsplit('page', 1)[1].split('.')[0]))
+    return [load_fixture(os.path.basename(p)) for p in paths]
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Runs the main TVDB methods against the local stub server and reports throughput, p50/p99 latency and memory.
+Results are saved as JSON in ``benchmarks/results`` and can be compared with an earlier run.
+
+    PYTHONPATH="." python benchmarks/run.py [-n 200] [--concurrency 4] [--latency 0.01] [--error-rate 0.01]
+                                           [--compare benchmarks/results/<earlier>.json]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import threading
+import time
+import tracemalloc
+
+from stub_server import StubServer
+from tvdbrest import VERSION
+from tvdbrest.client import TVDB, APIError
+from tvdbrest.ratelimit import RetryPolicy
+from tvdbrest.util import bounded_map
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+SCENARIOS = [
+    ('login', lambda tvdb: tvdb.login()),
+    ('series', lambda tvdb: tvdb.series(71663)),
+    ('search', lambda tvdb: tvdb.search(name='The Simpsons')),
+    ('episodes_by_series', lambda tvdb: tvdb.episodes_by_series(71663)),
+    ('episodes iteration', lambda tvdb: sum(1 for _ in tvdb.episodes_by_series(71663))),
+    ('episodes iteration (prefetch)', lambda tvdb: sum(1 for _ in _prefetching(tvdb).episodes_by_series(71663))),
+    ('stream_episodes_by_series', lambda tvdb: sum(1 for _ in tvdb.stream_episodes_by_series(71663))),
+    ('images', lambda tvdb: tvdb.images(71663, keyType='fanart')),
+    ('updates', lambda tvdb: tvdb.updates(1488100000, 1488186400)),
+]
+
+
+def _prefetching(tvdb):
+    tvdb.prefetch_workers = 4
+    return tvdb
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, int(round(p / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def run_scenario(name, func, server, iterations, concurrency, retries):
+    local = threading.local()
+
+    def _client():
+        # one client per thread, like independent workers would use
+        if not hasattr(local, 'tvdb'):
+            local.tvdb = TVDB("user", "userkey", "apikey",
+                              retry_policy=RetryPolicy(max_retries=retries, backoff_factor=0.01) if retries else None)
+            local.tvdb.api_url = server.base_url
+        return local.tvdb
+
+    def _call(_):
+        tvdb = _client()
+        tvdb.prefetch_workers = 0
+        start = time.perf_counter()
+        try:
+            if not tvdb.logged_in:
+                tvdb.login()
+                start = time.perf_counter()
+            func(tvdb)
+            return time.perf_counter() - start, None
+        except APIError as e:
+            return time.perf_counter() - start, e
+
+    requests_before = server.requests
+    start = time.perf_counter()
+    results = list(bounded_map(_call, range(iterations), concurrency))
+    elapsed = time.perf_counter() - start
+    http_requests = server.requests - requests_before
+
+    # tracing slows down allocations considerably, so the memory is measured in a separate call
+    tracemalloc.start()
+    _call(None)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies = sorted(r[0] for r in results if r[1] is None)
+    return {
+        'name': name,
+        'iterations': iterations,
+        'errors': sum(1 for r in results if r[1] is not None),
+        'http_requests': http_requests,
+        'elapsed': elapsed,
+        'throughput': iterations / elapsed,
+        'p50_ms': _percentile(latencies, 50) * 1000 if latencies else None,
+        'p99_ms': _percentile(latencies, 99) * 1000 if latencies else None,
+        'peak_memory_kib': peak_memory / 1024.0,
+    }
+
+
+def _fmt(value, spec):
+    return spec % value if value is not None else '-'
+
+
+def print_results(results, baseline=None):
+    baseline = dict((r['name'], r) for r in (baseline or {}).get('results', []))
+    print("%-32s %9s %9s %9s %11s %7s %s" % ('scenario', 'ops/s', 'p50 ms', 'p99 ms', 'peak KiB', 'errors',
+                                             'vs. baseline' if baseline else ''))
+    for r in results:
+        comparison = ''
+        if r['name'] in baseline:
+            comparison = '%+.1f%% ops/s' % ((r['throughput'] / baseline[r['name']]['throughput'] - 1) * 100)
+        print("%-32s %9.1f %9s %9s %11.1f %7d %s" % (r['name'], r['throughput'], _fmt(r['p50_ms'], '%.2f'),
+                                                     _fmt(r['p99_ms'], '%.2f'), r['peak_memory_kib'],
+                                                     r['errors'], comparison))
+
+
+def save_results(results, args):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    now = datetime.datetime.now()
+    path = os.path.join(RESULTS_DIR, '%s.json' % now.strftime('%Y%m%d-%H%M%S'))
+    with open(path, 'w') as f:
+        json.dump({
+            'timestamp': now.isoformat(),
+            'version': VERSION,
+            'python': platform.python_version(),
+            'settings': vars(args),
+            'results': results,
+        }, f, indent=2)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--iterations', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=0.0, help="server latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.0, help="additional random server latency in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests failing")
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--retries', type=int, default=0, help="retry failed requests")
+    parser.add_argument('--scenario', action='append', help="only run the given scenario(s)")
+    parser.add_argument('--compare', help="results file of an earlier run")
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args()
+
+    server = StubServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        error_status=args.error_status).start()
+    try:
+        results = [run_scenario(name, func, server, args.iterations, args.concurrency, args.retries)
+                   for name, func in SCENARIOS if not args.scenario or name in args.scenario]
+    finally:
+        server.stop()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    print_results(results, baseline)
+    if not args.no_save:
+        print("Results saved to %s" % save_results(results, args))
+
+
+if __name__ == '__main__':
+    main()
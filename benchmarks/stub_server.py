@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for api.thetvdb.com serving the sample responses from ``benchmarks/fixtures``.
+
+Supported endpoints: ``/login``, ``/refresh_token``, ``/series/{id}``, ``/series/{id}/episodes``,
+``/series/{id}/images/query``, ``/updated/query`` and ``/search/series``. Every fixture is served for any id.
+Responses carry an ``ETag`` and ``If-None-Match`` is answered with ``304 Not Modified``.
+
+``latency`` (seconds, plus up to ``jitter`` seconds) delays every response, ``error_rate`` is the fraction of
+requests answered with ``error_status``.
+
+    PYTHONPATH="." python benchmarks/stub_server.py --port 8080 --latency 0.05
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import ssl
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit, parse_qs
+
+from fixtures import load_fixture, episode_pages
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    routes = [
+        (re.compile(r'^/series/\d+$'), 'series'),
+        (re.compile(r'^/series/\d+/filter$'), 'series'),
+        (re.compile(r'^/series/\d+/episodes(/query)?$'), 'episodes'),
+        (re.compile(r'^/series/\d+/images/query$'), 'images'),
+        (re.compile(r'^/updated/query$'), 'updates'),
+        (re.compile(r'^/search/series$'), 'search'),
+        (re.compile(r'^/refresh_token$'), 'login'),
+    ]
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, extra_headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload).encode('utf-8'))
+
+    def _delay_or_fail(self):
+        server = self.server
+        server.count_request()
+        if server.latency or server.jitter:
+            time.sleep(server.latency + random.uniform(0, server.jitter))
+        if server.error_rate and random.random() < server.error_rate:
+            self._send_json(server.error_status, {'Error': 'Injected error'})
+            return True
+        return False
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        if self._delay_or_fail():
+            return
+
+        if self.path == '/login':
+            self._send(200, self.server.responses['login'])
+        else:
+            self._send_json(404, {'Error': 'Not Found'})
+
+    def do_GET(self):
+        if self._delay_or_fail():
+            return
+
+        url = urlsplit(self.path)
+        body = None
+        for pattern, name in self.routes:
+            if pattern.match(url.path):
+                if name == 'episodes':
+                    body = self.server.episode_page(int(parse_qs(url.query).get('page', ['1'])[0]))
+                else:
+                    body = self.server.responses[name]
+                break
+
+        if body is None:
+            self._send_json(404, {'Error': 'Not Found'})
+            return
+
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            self._send(304, b'', {'ETag': etag})
+        else:
+            self._send(200, body, {'ETag': etag})
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), handler=StubRequestHandler, certfile=None, keyfile=None,
+                 latency=0.0, jitter=0.0, error_rate=0.0, error_status=503):
+        HTTPServer.__init__(self, address, handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self._lock = threading.Lock()
+
+        self.responses = {
+            'login': b'{"token": "stub-token"}',
+            'series': load_fixture('series_71663.json'),
+            'images': load_fixture('images_71663.json'),
+            'updates': load_fixture('updates.json'),
+            'search': load_fixture('search_series.json'),
+        }
+        self.episode_pages = episode_pages()
+
+        self.scheme = 'http'
+        if certfile:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile, keyfile)
+            self.socket = context.wrap_socket(self.socket, server_side=True)
+            self.scheme = 'https'
+        self._thread = None
+
+    def handle_error(self, request, client_address):
+        # clients closing keep-alive connections are expected
+        pass
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def episode_page(self, page):
+        if 1 <= page <= len(self.episode_pages):
+            return self.episode_pages[page - 1]
+        return None
+
+    @property
+    def base_url(self):
+        return '%s://%s:%s/' % (self.scheme, self.server_address[0], self.server_address[1])
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--certfile')
+    parser.add_argument('--keyfile')
+    args = parser.parse_args()
+
+    server = StubServer((args.host, args.port), certfile=args.certfile, keyfile=args.keyfile, latency=args.latency,
+                        jitter=args.jitter, error_rate=args.error_rate, error_status=args.error_status)
+    print("Serving on %s" % server.base_url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -13,6 +13,15 @@ setup(
     url='https://code.not-your-server.de/tvdb-rest.git',
     download_url='https://code.not-your-server.de/tvdb-rest.git/tags/%s.tar.gz' % VERSION,
     packages=find_packages(exclude=('tests',)),
+    python_requires='>=3.5',
+    extras_require={
+        'async': ['aiohttp>=3.3'],
+    },
+    entry_points={
+        'console_scripts': [
+            'tvdb-changefeed = tvdbrest.changefeed:main',
+        ],
+    },
     zip_safe=False,
     license='GPL-3',
 )
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import json as _json
+
 import pytest
 import mock
 
@@ -17,13 +19,13 @@ class TestBase(object):
     def api_response_mock(self, json):
         m = mock.MagicMock()
         m.status_code = 200
-        m.json = mock.Mock(return_value=json)
+        m.content = _json.dumps(json).encode('utf-8')
         return m
     
     def api_response_404_mock(self):
         m = mock.MagicMock()
         m.status_code = 404
-        m.json = mock.MagicMock(return_value={
+        m.content = _json.dumps({
             'Error': 'Not Found'
-        })
+        }).encode('utf-8')
         return m
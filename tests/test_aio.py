@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from tvdbrest.aio import AsyncTVDB, AsyncTransport, AsyncResponse, AsyncPaginatedAPIObjectList, AiohttpTransport
+from tvdbrest.client import NotFound
+from tvdbrest.objects import Series, Episode, Update
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class FakeTransport(AsyncTransport):
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    async def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        await asyncio.sleep(0)
+        status_code, payload = self.responses[(method, url)]
+        return AsyncResponse(status_code, {}, json.dumps(payload).encode('utf-8'))
+
+
+def _tvdb(responses):
+    responses.setdefault(('post', 'https://api.thetvdb.com/login'), (200, {'token': 'jwttoken'}))
+    return AsyncTVDB("myusername", "myuserkey", "myapikey", transport=FakeTransport(responses))
+
+
+class TestAsyncTVDB(object):
+
+    def test_series(self):
+        tvdb = _tvdb({
+            ('get', 'https://api.thetvdb.com/series/1'): (200, {'data': {'id': 1, 'seriesName': 'Dummy'}}),
+        })
+        series = run(tvdb.series(1))
+        assert isinstance(series, Series)
+        assert str(series) == 'Dummy'
+        assert tvdb.jwttoken == 'jwttoken'
+        assert tvdb.transport.requests[1][2]['headers']['Authorization'] == 'Bearer jwttoken'
+
+    def test_not_found(self):
+        tvdb = _tvdb({
+            ('get', 'https://api.thetvdb.com/series/1'): (404, {'Error': 'Not Found'}),
+        })
+        with pytest.raises(NotFound):
+            run(tvdb.series(1))
+
+    def test_single_login_for_concurrent_calls(self):
+        tvdb = _tvdb({
+            ('get', 'https://api.thetvdb.com/series/%s' % i): (200, {'data': {'id': i}}) for i in range(20)
+        })
+
+        async def _fetch():
+            return await asyncio.gather(*[tvdb.series(i) for i in range(20)])
+
+        result = run(_fetch())
+        assert [s.id for s in result] == list(range(20))
+        assert [r[0] for r in tvdb.transport.requests].count('post') == 1
+
+    def test_updates(self):
+        tvdb = _tvdb({
+            ('get', 'https://api.thetvdb.com/updated/query?fromTime=10'): (200, {'data': [{'id': 1,
+                                                                                           'lastUpdated': 12}]}),
+        })
+        updates = run(tvdb.updates(10))
+        assert len(updates) == 1 and isinstance(updates[0], Update)
+
+    def test_related_objects_are_coroutines(self):
+        tvdb = _tvdb({
+            ('get', 'https://api.thetvdb.com/series/1/actors'): (200, {'data': [{'id': 2, 'name': 'Actor'}]}),
+        })
+        actors = run(Series({'id': 1}, tvdb).actors())
+        assert str(actors[0]) == 'Actor'
+
+    def test_search_without_args(self):
+        tvdb = _tvdb({})
+        assert run(tvdb.search()) == []
+
+
+    def test_default_transport(self):
+        async def _login(request):
+            return web.json_response({'token': 'jwttoken'})
+
+        async def _series(request):
+            return web.json_response({'data': {'id': 1, 'seriesName': 'Dummy'}})
+
+        async def _run():
+            app = web.Application()
+            app.router.add_post('/login', _login)
+            app.router.add_get('/series/1', _series)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+
+            tvdb = AsyncTVDB("myusername", "myuserkey", "myapikey")
+            tvdb.api_url = 'http://127.0.0.1:%s/' % runner.addresses[0][1]
+            try:
+                return tvdb.transport, await tvdb.series(1)
+            finally:
+                await tvdb.close()
+                await runner.cleanup()
+
+        transport, series = run(_run())
+        assert isinstance(transport, AiohttpTransport)
+        assert str(series) == 'Dummy'
+
+
+class TestAsyncPagination(object):
+
+    def _tvdb(self):
+        def _page(page, items, last=3):
+            return (200, {'links': {'first': 1, 'last': last}, 'data': [{'id': i} for i in items]})
+
+        return _tvdb({
+            ('get', 'https://api.thetvdb.com/series/1/episodes'): _page(1, [1, 2]),
+            ('get', 'https://api.thetvdb.com/series/1/episodes?page=2'): _page(2, [3, 4]),
+            ('get', 'https://api.thetvdb.com/series/1/episodes?page=3'): _page(3, [5]),
+        })
+
+    def test_async_iteration(self):
+        tvdb = self._tvdb()
+
+        async def _collect():
+            episodes = await tvdb.episodes_by_series(1)
+            assert isinstance(episodes, AsyncPaginatedAPIObjectList)
+            items = []
+            async for e in episodes:
+                items.append(e)
+            return items
+
+        episodes = run(_collect())
+        assert all(isinstance(e, Episode) for e in episodes)
+        assert [e.id for e in episodes] == [1, 2, 3, 4, 5]
+
+    def test_fetch_all(self):
+        tvdb = self._tvdb()
+
+        async def _collect():
+            episodes = await tvdb.episodes_by_series(1)
+            episodes._page_size = 2
+            return await episodes.fetch_all(), await episodes.length(), await episodes.get(-1)
+
+        items, length, last = run(_collect())
+        assert [e.id for e in items] == [1, 2, 3, 4, 5]
+        assert length == 5
+        assert last.id == 5
+
+    def test_get_out_of_range(self):
+        paol = AsyncPaginatedAPIObjectList({'first': 1, 'last': 1}, [1, 2], None, page_size=2)
+        assert run(paol.get(1)) == 2
+        with pytest.raises(IndexError):
+            run(paol.get(2))
+        with pytest.raises(IndexError):
+            run(paol.get(-3))
@@ -1,4 +1,9 @@
 # -*- coding: utf-8 -*-
+import base64
+import json
+import threading
+import time
+
 import mock
 import pytest
 
@@ -16,7 +21,7 @@ def tvdb():
 def empty_positive_response():
     m = mock.Mock()
     m.status_code = 200
-    m.json = mock.Mock(return_value={"data": []})
+    m.content = b'{"data": []}'
     return m
 
 
@@ -26,13 +31,13 @@ class TestLoginLogout(object):
         tvdb = TVDB("myusername", "myuserkey", "myapikey")
         assert not tvdb.logged_in
 
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_login_status_after_login(self, request_mock):
         response_mock = mock.MagicMock()
         response_mock.status_code = 200
-        response_mock.json = mock.MagicMock(return_value={
+        response_mock.content = json.dumps({
             'token': 'jwttoken'
-        })
+        }).encode('utf-8')
         
         request_mock.return_value = response_mock
         
@@ -50,7 +55,7 @@ class TestLoginLogout(object):
 
         assert tvdb.logged_in
 
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_failed_login(self, request_method_mock):
         response_mock = mock.MagicMock()
         response_mock.status_code = 401
@@ -69,11 +74,11 @@ class TestLoginLogout(object):
         assert tvdb.jwttoken is None
         assert not tvdb.logged_in
 
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_decorator_login_before_api_call(self, request_method_mock, tvdb):
         response_mock = mock.MagicMock()
         response_mock.status_code = 200
-        response_mock.json = mock.MagicMock(return_value={"data": []})
+        response_mock.content = b'{"data": []}'
 
         request_method_mock.return_value = response_mock
 
@@ -83,7 +88,7 @@ class TestLoginLogout(object):
         
         assert login_mock.called
 
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_authorization_for_api_call(self, request_mock, tvdb, empty_positive_response):
         request_mock.return_value = empty_positive_response
         tvdb.jwttoken = "test"
@@ -98,7 +103,7 @@ class TestLoginLogout(object):
 
 class TestClientBasics(TestBase):
 
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_accept_language(self, request_mock, empty_positive_response):
         tvdb = TVDB("myusername", "myuserkey", "myapikey", 'de')
         request_mock.return_value = empty_positive_response
@@ -111,7 +116,7 @@ class TestClientBasics(TestBase):
             'User-Agent': 'tvdb-rest %s' % VERSION
         })
 
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_accept_language_not_set(self, request_mock, tvdb, empty_positive_response):
         tvdb.accept_language = None
         request_mock.return_value = empty_positive_response
@@ -123,7 +128,16 @@ class TestClientBasics(TestBase):
             'User-Agent': 'tvdb-rest %s' % VERSION
         })
 
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_api_url(self, request_mock, tvdb, empty_positive_response):
+        request_mock.return_value = empty_positive_response
+        tvdb.api_url = 'http://127.0.0.1:8080/'
+        tvdb.jwttoken = "test"
+        tvdb.languages()
+
+        assert request_mock.call_args[0] == ('get', 'http://127.0.0.1:8080/languages')
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_raise_apierror_on_4xx(self, request_mock, tvdb):
         m = mock.Mock()
         m.status_code = 405
@@ -132,7 +146,7 @@ class TestClientBasics(TestBase):
         with pytest.raises(APIError):
             tvdb.login()
 
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_raise_apierror_on_5xx(self, request_mock, tvdb):
         m = mock.Mock()
         m.status_code = 500
@@ -141,7 +155,7 @@ class TestClientBasics(TestBase):
         with pytest.raises(APIError):
             tvdb.login()
 
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_raise_not_found_on_404(self, request_mock, tvdb):
         # m = mock.Mock()
         # m.status_code = 404
@@ -149,3 +163,85 @@ class TestClientBasics(TestBase):
         
         with pytest.raises(NotFound):
             tvdb.login()
+
+
+def _jwt(exp):
+    payload = base64.urlsafe_b64encode(json.dumps({'exp': exp}).encode('utf-8')).decode('ascii').rstrip('=')
+    return 'header.%s.signature' % payload
+
+
+class TestTokenRefresh(object):
+
+    def test_token_expires(self, tvdb):
+        assert tvdb.token_expires is None
+        tvdb.jwttoken = _jwt(1234)
+        assert tvdb.token_expires == 1234
+        tvdb.jwttoken = 'not-a-jwt'
+        assert tvdb.token_expires is None
+
+    @mock.patch('tvdbrest.client.time.time', return_value=1000)
+    def test_token_expiring(self, time_mock, tvdb):
+        tvdb.token_refresh_margin = 100
+        tvdb.jwttoken = _jwt(1200)
+        assert not tvdb.token_expiring
+        tvdb.jwttoken = _jwt(1050)
+        assert tvdb.token_expiring
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_refresh_before_expiry(self, request_mock, tvdb):
+        old_token, new_token = _jwt(time.time() + 60), _jwt(time.time() + 86400)
+
+        def _response(payload):
+            response_mock = mock.MagicMock()
+            response_mock.status_code = 200
+            response_mock.content = json.dumps(payload).encode('utf-8')
+            return response_mock
+
+        request_mock.side_effect = [_response({'token': new_token}), _response({'data': []})]
+
+        tvdb.jwttoken = old_token
+        tvdb.login = mock.MagicMock()
+        tvdb.languages()
+
+        assert not tvdb.login.called
+        assert request_mock.call_args_list[0][0] == ('get', 'https://api.thetvdb.com/refresh_token')
+        assert request_mock.call_args_list[0][1]['headers']['Authorization'] == 'Bearer %s' % old_token
+        assert request_mock.call_args_list[1][1]['headers']['Authorization'] == 'Bearer %s' % new_token
+        assert tvdb.jwttoken == new_token
+
+    def test_login_if_refresh_fails(self, tvdb):
+        tvdb.jwttoken = _jwt(time.time() + 60)
+        tvdb.refresh_token = mock.MagicMock(side_effect=Unauthorized("expired"))
+        tvdb.login = mock.MagicMock()
+
+        tvdb._ensure_token()
+        assert tvdb.login.called
+
+    def test_single_flight_login(self, tvdb):
+        def _login():
+            time.sleep(0.05)
+            tvdb.jwttoken = 'token'
+
+        tvdb.login = mock.MagicMock(side_effect=_login)
+        tvdb._api_request = mock.MagicMock(return_value={'data': []})
+
+        threads = [threading.Thread(target=tvdb.languages) for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert tvdb.login.call_count == 1
+        assert tvdb._api_request.call_count == 10
+
+    def test_relogin_once_on_unauthorized(self, tvdb):
+        tvdb.jwttoken = 'stale'
+
+        def _login():
+            tvdb.jwttoken = 'fresh'
+
+        tvdb.login = mock.MagicMock(side_effect=_login)
+        tvdb._relogin('stale')
+        tvdb._relogin('stale')  # a second caller which got the 401 with the stale token
+
+        assert tvdb.login.call_count == 1
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+import mock
+import pytest
+
+from tests.base import TestBase
+from tvdbrest.cache import CacheEntry, FileCache, MemoryCache
+from tvdbrest.client import TVDB
+from tvdbrest.codec import JSONCodec
+
+
+@pytest.fixture
+def cached_tvdb():
+    tvdb = TVDB("myusername", "myuserkey", "myapikey", cache=MemoryCache(ttl=60))
+    tvdb.jwttoken = "test-token"
+    return tvdb
+
+
+class TestMemoryCache(object):
+
+    def test_lru_eviction(self):
+        cache = MemoryCache(max_entries=2)
+        cache.set('a', CacheEntry(1))
+        cache.set('b', CacheEntry(2))
+        cache.get('a')
+        cache.set('c', CacheEntry(3))
+
+        assert cache.get('b') is None
+        assert cache.get('a').data == 1
+        assert cache.get('c').data == 3
+        assert cache.evictions == 1
+        assert len(cache) == 2
+
+    def test_ttl_for(self):
+        cache = MemoryCache(ttl=10, ttls={'/languages': 3600, '/series/{id}/actors': 0})
+        assert cache.ttl_for('https://api.thetvdb.com/languages') == 3600
+        assert cache.ttl_for('https://api.thetvdb.com/series/123/actors') == 0
+        assert cache.ttl_for('https://api.thetvdb.com/series/123') == 10
+
+    def test_entry_expired(self):
+        with mock.patch('tvdbrest.cache.time.time', return_value=100):
+            assert CacheEntry(None, expires=100).expired
+            assert not CacheEntry(None, expires=101).expired
+
+
+class TestFileCache(object):
+
+    def test_roundtrip(self, tmpdir):
+        cache = FileCache(str(tmpdir))
+        cache.set(('url', 'en'), CacheEntry({'data': [1, 2]}, etag='"abc"', expires=123))
+
+        entry = FileCache(str(tmpdir)).get(('url', 'en'))
+        assert entry.data == {'data': [1, 2]}
+        assert entry.etag == '"abc"'
+        assert entry.last_modified is None
+        assert entry.expires == 123
+        assert cache.get(('url', 'de')) is None
+
+    def test_max_entries(self, tmpdir):
+        cache = FileCache(str(tmpdir), max_entries=2)
+        for i in range(4):
+            cache.set(i, CacheEntry(i))
+        assert len(cache) == 2
+        assert cache.evictions == 2
+
+    def test_delete_and_clear(self, tmpdir):
+        cache = FileCache(str(tmpdir))
+        cache.set('a', CacheEntry(1))
+        cache.set('b', CacheEntry(2))
+        cache.delete('a')
+        assert cache.get('a') is None
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_client_codec(self, tmpdir):
+        codec = JSONCodec()
+        cache = FileCache(str(tmpdir))
+        TVDB("myusername", "myuserkey", "myapikey", codec=codec, cache=cache)
+        assert cache.codec is codec
+
+        own_codec = JSONCodec()
+        cache = FileCache(str(tmpdir), codec=own_codec)
+        TVDB("myusername", "myuserkey", "myapikey", codec=codec, cache=cache)
+        assert cache.codec is own_codec
+
+
+class TestClientCache(TestBase):
+
+    def response_mock(self, json, status_code=200, headers=None):
+        m = self.api_response_mock(json)
+        m.status_code = status_code
+        m.headers = headers or {}
+        return m
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_cache_hit(self, request_mock, cached_tvdb):
+        request_mock.return_value = self.response_mock({'data': {'id': 1}})
+
+        assert cached_tvdb.series(1).id == 1
+        assert cached_tvdb.series(1).id == 1
+
+        assert request_mock.call_count == 1
+        assert cached_tvdb.cache_stats == {'hits': 1, 'misses': 1, 'revalidations': 0, 'evictions': 0}
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_cache_keyed_by_language(self, request_mock, cached_tvdb):
+        request_mock.return_value = self.response_mock({'data': {'id': 1}})
+
+        cached_tvdb.series(1)
+        cached_tvdb.accept_language = 'de'
+        cached_tvdb.series(1)
+
+        assert request_mock.call_count == 2
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_revalidation(self, request_mock, cached_tvdb):
+        request_mock.return_value = self.response_mock({'data': {'id': 1}}, headers={
+            'ETag': '"v1"',
+            'Last-Modified': 'Sat, 25 Feb 2017 10:00:00 GMT',
+        })
+        cached_tvdb.series(1)
+
+        # expire the entry
+        cached_tvdb.cache.get(('https://api.thetvdb.com/series/1', 'en')).expires = 0
+
+        request_mock.return_value = self.response_mock(None, status_code=304)
+        assert cached_tvdb.series(1).id == 1
+
+        headers = request_mock.call_args[1]['headers']
+        assert headers['If-None-Match'] == '"v1"'
+        assert headers['If-Modified-Since'] == 'Sat, 25 Feb 2017 10:00:00 GMT'
+        assert cached_tvdb.cache.revalidations == 1
+        assert not cached_tvdb.cache.get(('https://api.thetvdb.com/series/1', 'en')).expired
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_endpoint_ttl_zero_disables_caching(self, request_mock, cached_tvdb):
+        cached_tvdb.cache.ttls['/series/{id}/actors'] = 0
+        request_mock.return_value = self.response_mock({'data': []})
+
+        cached_tvdb.actors_by_series(1)
+        cached_tvdb.actors_by_series(1)
+
+        assert request_mock.call_count == 2
+        assert cached_tvdb.cache.misses == 0
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_login_not_cached(self, request_mock, cached_tvdb):
+        request_mock.return_value = self.response_mock({'token': 'abc'})
+
+        cached_tvdb.login()
+        cached_tvdb.login()
+
+        assert request_mock.call_count == 2
+        assert len(cached_tvdb.cache) == 0
+
+    def test_no_cache_stats(self):
+        assert TVDB("myusername", "myuserkey", "myapikey").cache_stats is None
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_refresh_token_not_cached(self, request_mock, cached_tvdb):
+        request_mock.return_value = self.response_mock({'token': 'abc'})
+
+        cached_tvdb.refresh_token()
+        cached_tvdb.refresh_token()
+
+        assert request_mock.call_count == 2
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+import json
+
+import mock
+import pytest
+
+from tvdbrest.cassette import RecordingTransport, ReplayTransport, CassetteMiss, interaction_key, REDACTED_TOKEN
+from tvdbrest.client import TVDB, NotFound
+
+
+class FakeTransport(object):
+
+    def __init__(self):
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url))
+        m = mock.Mock()
+        m.headers = {'ETag': '"abc"'}
+        if url.endswith('/login'):
+            m.status_code = 200
+            m.content = b'{"token": "secret-token"}'
+        elif url.endswith('/series/1'):
+            m.status_code = 200
+            m.content = json.dumps({'data': {'id': 1, 'seriesName': 'Series %s' % len(self.calls)}}).encode('utf-8')
+        else:
+            m.status_code = 404
+            m.content = b'{"Error": "Not Found"}'
+        return m
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(params=['api.cassette', 'api.cassette.gz'])
+def cassette_path(request, tmpdir):
+    return str(tmpdir.join(request.param))
+
+
+def _record(path):
+    transport = RecordingTransport(path, transport=FakeTransport())
+    tvdb = TVDB("myusername", "myuserkey", "myapikey", transport=transport)
+    tvdb.series(1)
+    tvdb.series(1)
+    with pytest.raises(NotFound):
+        tvdb.series(2)
+    tvdb.close()
+
+
+class TestInteractionKey(object):
+
+    def test_key(self):
+        assert interaction_key('get', 'https://api.thetvdb.com/series/1/episodes/query?b=2&a=1') == \
+            interaction_key('GET', 'http://127.0.0.1:8080/series/1/episodes/query?a=1&b=2') == \
+            'GET /series/1/episodes/query?a=1&b=2'
+
+    def test_language(self):
+        assert interaction_key('get', 'https://api.thetvdb.com/series/1', {'accept-language': 'de'}) == \
+            'GET /series/1 [de]'
+
+
+class TestCassette(object):
+
+    def test_record_and_replay(self, cassette_path):
+        _record(cassette_path)
+
+        transport = ReplayTransport(cassette_path)
+        assert len(transport.cassette) == 4
+
+        tvdb = TVDB("myusername", "myuserkey", "myapikey", transport=transport)
+        tvdb.api_url = 'http://localhost:1234/'
+        assert tvdb.series(1).seriesName == 'Series 2'
+        assert tvdb.series(1).seriesName == 'Series 3'
+        # exhausted interactions are repeated
+        assert tvdb.series(1).seriesName == 'Series 3'
+        with pytest.raises(NotFound):
+            tvdb.series(2)
+
+    def test_languages(self, cassette_path):
+        transport = RecordingTransport(cassette_path, transport=FakeTransport())
+        tvdb = TVDB("myusername", "myuserkey", "myapikey", transport=transport)
+        tvdb.series(1)
+        tvdb.series(1, language='de')
+        tvdb.close()
+
+        tvdb = TVDB("myusername", "myuserkey", "myapikey", transport=ReplayTransport(cassette_path))
+        assert tvdb.series(1, language='de').seriesName == 'Series 3'
+        assert tvdb.series(1).seriesName == 'Series 2'
+
+    def test_other_language_not_replayed(self, tmpdir):
+        path = str(tmpdir.join('en.cassette'))
+        with open(path, 'w') as f:
+            f.write(json.dumps({'key': 'GET /series/1 [en]', 'status': 200, 'headers': {},
+                                'content': json.dumps({'data': {'id': 1, 'seriesName': 'The Simpsons'}})}) + '\n')
+
+        tvdb = TVDB("myusername", "myuserkey", "myapikey", transport=ReplayTransport(path))
+        tvdb.jwttoken = "test-token"
+        assert tvdb.series(1).seriesName == 'The Simpsons'
+        with pytest.raises(CassetteMiss):
+            tvdb.series(1, language='de')
+
+    def test_credentials_redacted(self, cassette_path):
+        _record(cassette_path)
+
+        transport = ReplayTransport(cassette_path)
+        for secret in ('myusername', 'myuserkey', 'myapikey', 'secret-token'):
+            assert not any(secret in repr(i) for i in transport.cassette._index.values())
+
+        tvdb = TVDB("myusername", "myuserkey", "myapikey", transport=transport)
+        tvdb.login()
+        assert tvdb.jwttoken == REDACTED_TOKEN
+
+    def test_miss(self, cassette_path):
+        _record(cassette_path)
+
+        tvdb = TVDB("myusername", "myuserkey", "myapikey", transport=ReplayTransport(cassette_path))
+        tvdb.jwttoken = "test-token"
+        with pytest.raises(CassetteMiss):
+            tvdb.languages()
+
+    @mock.patch('tvdbrest.cassette.time.sleep')
+    def test_latency(self, sleep_mock, cassette_path):
+        _record(cassette_path)
+
+        transport = ReplayTransport(cassette_path, latency=0.25)
+        transport.request('get', 'https://api.thetvdb.com/series/1', headers={'Accept-Language': 'en'})
+        sleep_mock.assert_called_once_with(0.25)
+
+    def test_headers_and_streaming(self, cassette_path):
+        _record(cassette_path)
+
+        response = ReplayTransport(cassette_path).request('get', 'https://api.thetvdb.com/series/1',
+                                                          headers={'Accept-Language': 'en'})
+        assert response.headers.get('etag') == '"abc"'
+        assert b''.join(response.iter_content(7)) == response.content
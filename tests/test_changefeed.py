@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+import json
+import queue
+
+import mock
+import pytest
+
+from tvdbrest.changefeed import ChangeFeed, FileCheckpoint, JSONLinesSink, CallbackSink, QueueSink, main
+from tvdbrest.client import NotFound, APIError, UPDATES_WINDOW
+from tvdbrest.objects import Series, Episode, Update
+
+
+class FakeTVDB(object):
+
+    def __init__(self, updates):
+        self.update_data = updates
+        self.updates = mock.MagicMock(side_effect=self._updates)
+
+    def _updates(self, from_time, to_time):
+        return [Update(dict(u), self) for u in self.update_data if from_time <= u['lastUpdated'] <= to_time]
+
+    def series(self, series_id):
+        if series_id == 404:
+            raise NotFound("Not Found")
+        return Series({'id': series_id, 'seriesName': 'Series %s' % series_id}, self)
+
+    def episodes_by_series(self, series_id):
+        return [Episode({'id': series_id * 10, 'airedSeason': 1, 'airedEpisodeNumber': 1}, self)]
+
+
+UPDATES = [
+    {'id': 1, 'lastUpdated': 110},
+    {'id': 2, 'lastUpdated': 105},
+    {'id': 1, 'lastUpdated': 120},
+    {'id': 3, 'lastUpdated': 130},
+]
+
+
+@pytest.fixture
+def checkpoint(tmpdir):
+    return FileCheckpoint(str(tmpdir.join('checkpoint')))
+
+
+class TestChangeFeed(object):
+
+    def test_poll(self, checkpoint):
+        events = []
+        feed = ChangeFeed(FakeTVDB(UPDATES), [CallbackSink(events.append)], checkpoint, start_time=100,
+                          batch_size=2)
+
+        assert feed.poll(to_time=200) == 3
+        assert [(e.series_id, e.last_updated) for e in events] == [(2, 105), (1, 120), (3, 130)]
+        assert events[0].series is None
+        assert checkpoint.load() == 200
+
+        # the next poll starts at the checkpoint
+        assert feed.poll(to_time=300) == 0
+        feed.tvdb.updates.assert_called_with(200, 300)
+
+    def test_poll_without_start_time(self, checkpoint):
+        events = []
+        tvdb = FakeTVDB([{'id': 1, 'lastUpdated': 900}, {'id': 2, 'lastUpdated': 1100}])
+        feed = ChangeFeed(tvdb, [CallbackSink(events.append)], checkpoint)
+
+        assert feed.poll(to_time=1000) == 0
+        assert checkpoint.load() == 1000
+
+        assert feed.poll(to_time=1300) == 1
+        assert [e.series_id for e in events] == [2]
+        tvdb.updates.assert_called_once_with(1000, 1300)
+        assert checkpoint.load() == 1300
+
+    def test_windows(self, checkpoint):
+        tvdb = FakeTVDB([{'id': 1, 'lastUpdated': 100}, {'id': 2, 'lastUpdated': UPDATES_WINDOW + 150}])
+        q = queue.Queue()
+        feed = ChangeFeed(tvdb, [QueueSink(q)], checkpoint, start_time=0)
+
+        assert feed.poll(to_time=UPDATES_WINDOW + 200) == 2
+        assert tvdb.updates.call_args_list == [mock.call(0, UPDATES_WINDOW),
+                                               mock.call(UPDATES_WINDOW, UPDATES_WINDOW + 200)]
+        assert [q.get_nowait().series_id for _ in range(2)] == [1, 2]
+
+    def test_resolve(self, checkpoint):
+        events = []
+        tvdb = FakeTVDB([{'id': 1, 'lastUpdated': 110}, {'id': 404, 'lastUpdated': 120}])
+        feed = ChangeFeed(tvdb, [CallbackSink(events.append)], checkpoint, start_time=100, resolve_series=True,
+                          resolve_episodes=True)
+        feed.poll(to_time=200)
+
+        assert events[0].series == {'id': 1, 'seriesName': 'Series 1'}
+        assert events[0].episodes == [{'id': 10, 'airedSeason': 1, 'airedEpisodeNumber': 1}]
+        assert events[1].series is None and events[1].error == 'Not Found'
+
+    def test_at_least_once(self, checkpoint):
+        delivered = []
+
+        def _sink(event):
+            if event.series_id == 3 and 'failed' not in delivered:
+                delivered.append('failed')
+                raise APIError()
+            delivered.append(event.series_id)
+
+        feed = ChangeFeed(FakeTVDB(UPDATES), [CallbackSink(_sink)], checkpoint, start_time=100, batch_size=2)
+        with pytest.raises(APIError):
+            feed.poll(to_time=200)
+        # the first batch was delivered and checkpointed
+        assert checkpoint.load() == 120
+
+        assert feed.poll(to_time=200) == 2
+        assert delivered == [2, 1, 'failed', 1, 3]
+        assert checkpoint.load() == 200
+
+    def test_run(self, checkpoint):
+        tvdb = FakeTVDB(UPDATES)
+        tvdb.updates.side_effect = APIError()
+        feed = ChangeFeed(tvdb, [], checkpoint, interval=0, start_time=100)
+        feed.run(iterations=2)  # failed polls don't stop the feed
+        assert tvdb.updates.call_count == 2
+        assert checkpoint.load() == 100  # the position isn't advanced
+
+
+class TestSinks(object):
+
+    def test_jsonlines(self, tmpdir, checkpoint):
+        path = str(tmpdir.join('changes.jsonl'))
+        sink = JSONLinesSink(path)
+        feed = ChangeFeed(FakeTVDB(UPDATES), [sink], checkpoint, start_time=100, resolve_series=True)
+        feed.poll(to_time=200)
+        feed.close()
+
+        with open(path) as f:
+            lines = [json.loads(line) for line in f]
+        assert lines[0] == {'series_id': 2, 'last_updated': 105, 'series': {'id': 2, 'seriesName': 'Series 2'}}
+        assert len(lines) == 3
+
+    def test_checkpoint(self, checkpoint, tmpdir):
+        assert checkpoint.load() is None
+        checkpoint.save(123)
+        assert FileCheckpoint(checkpoint.path).load() == 123
+        assert tmpdir.listdir() == [tmpdir.join('checkpoint')]
+
+
+class TestMain(object):
+
+    def test_once(self, tmpdir):
+        tvdb = FakeTVDB(UPDATES)
+        tvdb.close = mock.MagicMock()
+        output = str(tmpdir.join('changes.jsonl'))
+
+        with mock.patch('tvdbrest.changefeed.TVDB', return_value=tvdb) as tvdb_class:
+            main(['--username', 'u', '--userkey', 'k', '--apikey', 'a', '--checkpoint', str(tmpdir.join('cp')),
+                  '--output', output, '--since', '100', '--once'])
+
+        tvdb_class.assert_called_with('u', 'k', 'a', language=None)
+        with open(output) as f:
+            assert len(f.readlines()) == 3
+        assert tvdb.close.called
+
+    def test_credentials_required(self, tmpdir):
+        with mock.patch.dict('os.environ', clear=True), pytest.raises(SystemExit):
+            main(['--checkpoint', str(tmpdir.join('cp'))])
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import mock
+import pytest
+
+from tvdbrest import codec
+from tvdbrest.cache import FileCache, CacheEntry
+from tvdbrest.client import TVDB
+from tvdbrest.codec import JSONCodec, OrjsonCodec, default_codec
+
+PAYLOAD = {'data': [{'id': 1, 'episodeName': u'Ünïcode', 'rating': 1.5, 'flags': [True, None]}]}
+
+
+def _codecs():
+    codecs = [JSONCodec()]
+    if codec.orjson is not None:
+        codecs.append(OrjsonCodec())
+    return codecs
+
+
+class TestCodecs(object):
+
+    @pytest.mark.parametrize('c', _codecs(), ids=lambda c: c.name)
+    def test_roundtrip(self, c):
+        encoded = c.dumps(PAYLOAD)
+        assert isinstance(encoded, bytes)
+        assert c.loads(encoded) == PAYLOAD
+        assert c.loads(encoded.decode('utf-8')) == PAYLOAD
+
+    @pytest.mark.parametrize('c', _codecs(), ids=lambda c: c.name)
+    def test_invalid(self, c):
+        with pytest.raises(ValueError):
+            c.loads(b'{"data": ')
+
+    def test_default_codec_fallback(self):
+        with mock.patch('tvdbrest.codec.orjson', None):
+            assert isinstance(default_codec(), JSONCodec)
+            with pytest.raises(RuntimeError):
+                OrjsonCodec()
+
+    @pytest.mark.skipif(codec.orjson is None, reason="orjson not installed")
+    def test_default_codec_fast_path(self):
+        assert isinstance(default_codec(), OrjsonCodec)
+
+
+class TestCodecUsage(object):
+
+    def test_client_uses_codec(self):
+        c = mock.Mock(wraps=JSONCodec())
+        tvdb = TVDB("myusername", "myuserkey", "myapikey", codec=c)
+        response = mock.Mock(status_code=200, content=b'{"data": {"id": 1}}')
+        tvdb.transport = mock.Mock()
+        tvdb.transport.request.return_value = response
+        tvdb.jwttoken = 'test-token'
+
+        assert tvdb.series(1).id == 1
+        c.loads.assert_called_once_with(b'{"data": {"id": 1}}')
+
+    def test_file_cache_uses_codec(self, tmpdir):
+        c = mock.Mock(wraps=JSONCodec())
+        cache = FileCache(str(tmpdir), codec=c)
+        cache.set('a', CacheEntry(PAYLOAD))
+        assert cache.get('a').data == PAYLOAD
+        assert c.dumps.called and c.loads.called
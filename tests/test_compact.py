@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import mock
+import pytest
+
+from tests.base import tvdb
+from tvdbrest.compact import CompactSeries, CompactEpisode, CompactUpdate, CompactImage, CompactActor
+from tvdbrest.objects import Series, Episode, Update, Image, Actor
+
+
+EPISODE = {
+    'id': 1,
+    'airedSeason': 2,
+    'airedEpisodeNumber': 3,
+    'episodeName': 'Dummy',
+    'firstAired': '1989-12-17',
+    'lastUpdated': 1,
+    'someNewField': 'x',
+}
+
+
+class TestCompactObjects(object):
+
+    def test_slotted(self):
+        e = CompactEpisode(EPISODE, None)
+        # the fields are kept in slots, the instance dict is never filled
+        assert vars(e) == {}
+        assert e.episodeName == EPISODE['episodeName']
+
+    def test_regular_objects_dict_backed(self):
+        e = Episode(EPISODE, None)
+        e.foo = 1
+        assert e.foo == 1
+        assert e.as_dict() == EPISODE
+
+    def test_isinstance(self):
+        for compact, cls in (CompactSeries, Series), (CompactEpisode, Episode), (CompactUpdate, Update), \
+                            (CompactImage, Image), (CompactActor, Actor):
+            assert isinstance(compact({'id': 1}, None), cls)
+
+    def test_fields(self):
+        e = CompactEpisode(EPISODE, None)
+        assert e.id == 1
+        assert e.airedSeason == 2
+        assert str(e) == 'Dummy'
+        assert e.someNewField == 'x'
+        assert e == CompactEpisode({'id': 1}, None)
+
+    def test_missing_field(self):
+        e = CompactEpisode({'id': 1}, None)
+        with pytest.raises(KeyError):
+            e.overview
+        with pytest.raises(KeyError):
+            e.unknown
+
+    def test_dates(self):
+        e = CompactEpisode(EPISODE, None)
+        assert e.firstAired == datetime.date(1989, 12, 17)
+        assert e.lastUpdated == datetime.datetime(1970, 1, 1, 0, 0, 1, tzinfo=datetime.timezone.utc)
+
+        e = CompactEpisode({'firstAired': ''}, None)
+        assert e.firstAired is None
+        assert e.lastUpdated is None
+
+    def test_dates_memoized(self):
+        e = CompactSeries({'firstAired': '1989-12-17'}, None)
+        with mock.patch('tvdbrest.compact.datetime.date', wraps=datetime.date) as date_mock:
+            assert e.firstAired is e.firstAired
+            assert date_mock.call_count == 1
+
+    def test_as_dict(self):
+        assert CompactEpisode(EPISODE, None).as_dict() == EPISODE
+        assert Episode(EPISODE, None).as_dict() == EPISODE
+
+    def test_image_urls(self):
+        i = CompactImage({'fileName': 'a.jpg', 'thumbnail': 'b.jpg'}, None)
+        assert i.url == 'http://thetvdb.com/banners/a.jpg'
+        assert i.thumbnail_url == 'http://thetvdb.com/banners/b.jpg'
+
+
+class TestCompactClient(object):
+
+    def test_compact_responses(self, tvdb):
+        tvdb.compact = True
+        tvdb._api_request = mock.MagicMock(return_value={'data': {'id': 1}})
+        assert isinstance(tvdb.series(1), CompactSeries)
+
+        tvdb._api_request = mock.MagicMock(return_value={'links': {'first': 1, 'last': 1}, 'data': [{'id': 1}]})
+        assert all(isinstance(e, CompactEpisode) for e in tvdb.episodes_by_series(1))
+
+    def test_default_responses(self, tvdb):
+        tvdb._api_request = mock.MagicMock(return_value={'data': {'id': 1}})
+        assert type(tvdb.series(1)) is Series
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+import threading
+
+import mock
+import pytest
+
+from tvdbrest.download import ImageDownloader, DownloadError
+from tvdbrest.objects import Image
+
+
+class FakeTransport(object):
+
+    def __init__(self, files):
+        self.files = files
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def request(self, method, url, headers=None, **kwargs):
+        with self._lock:
+            self.requests.append((url, dict(headers or {})))
+
+        m = mock.Mock()
+        content = self.files.get(url.rsplit('/', 1)[-1])
+        etag = '"%s"' % hashlib.md5(content).hexdigest() if content is not None else None
+        if content is None:
+            m.status_code = 404
+        elif headers and headers.get('If-None-Match') == etag:
+            m.status_code = 304
+        else:
+            m.status_code = 200
+        m.headers = {'ETag': etag}
+        m.iter_content.side_effect = lambda chunk_size: (content[i:i + chunk_size]
+                                                         for i in range(0, len(content), chunk_size))
+        return m
+
+    def close(self):
+        pass
+
+
+FILES = {
+    'a.jpg': b'a' * 1000,
+    'a-thumb.jpg': b't' * 100,
+    'b.jpg': b'b' * 500,
+    'b-copy.jpg': b'b' * 500,
+}
+
+
+def _image(name, thumbnail=None):
+    return Image({'fileName': 'fanart/original/%s' % name, 'thumbnail': '_cache/fanart/%s' % (thumbnail or name)},
+                 None)
+
+
+@pytest.fixture
+def transport():
+    return FakeTransport(FILES)
+
+
+class TestImageDownloader(object):
+
+    def test_download(self, tmpdir, transport):
+        downloader = ImageDownloader(str(tmpdir), workers=4, transport=transport, chunk_size=64)
+        images = [_image('a.jpg', 'a-thumb.jpg'), _image('b.jpg'), _image('b-copy.jpg'),
+                  _image('a.jpg', 'a-thumb.jpg')]
+
+        report = downloader.download(images, thumbnails=True)
+
+        assert report.downloaded == 6
+        assert report.deduplicated == 3  # b-copy.jpg and the thumbnails of b.jpg and b-copy.jpg
+        assert report.bytes == 1000 + 100 + 500 * 4
+        assert not report.failed
+        assert report.throughput > 0
+        assert 'downloaded' in str(report)
+
+        path = report.paths[images[0].url]
+        with open(path, 'rb') as f:
+            assert f.read() == FILES['a.jpg']
+        assert os.path.basename(path) == hashlib.sha256(FILES['a.jpg']).hexdigest() + '.jpg'
+        assert report.paths[images[1].url] == report.paths[images[2].url]
+        assert not os.listdir(str(tmpdir.join('tmp')))
+
+    def test_conditional_requests(self, tmpdir, transport):
+        ImageDownloader(str(tmpdir), transport=transport).download([_image('a.jpg'), _image('b.jpg')])
+        transport.requests = []
+
+        downloader = ImageDownloader(str(tmpdir), transport=transport)
+        report = downloader.download([_image('a.jpg'), _image('b.jpg')])
+
+        assert report.not_modified == 2
+        assert report.downloaded == 0
+        assert report.bytes == 0
+        assert all('If-None-Match' in headers for _, headers in transport.requests)
+        assert downloader.path(_image('a.jpg').url) == report.paths[_image('a.jpg').url]
+
+    def test_missing_file_downloaded_again(self, tmpdir, transport):
+        downloader = ImageDownloader(str(tmpdir), transport=transport)
+        path = downloader.download([_image('a.jpg')]).paths[_image('a.jpg').url]
+        os.remove(path)
+
+        report = downloader.download([_image('a.jpg')])
+        assert report.downloaded == 1
+        assert os.path.exists(path)
+
+    def test_failures(self, tmpdir, transport):
+        report = ImageDownloader(str(tmpdir), transport=transport).download([_image('missing.jpg'), _image('a.jpg')])
+
+        assert report.downloaded == 1
+        assert isinstance(report.failed[_image('missing.jpg').url], DownloadError)
@@ -1,15 +1,21 @@
 # -*- coding: utf-8 -*-
+import datetime
+import time
 
 import mock
 import pytest
 
 from tests.base import TestBase, tvdb
-from tvdbrest.client import NotFound, Episode
+from tvdbrest.cache import CacheEntry
+from tvdbrest.client import NotFound, Episode, Series
+from tvdbrest.compact import CompactEpisode
+from tvdbrest.episodes import EpisodeIndex
+from tvdbrest.objects import PaginatedAPIObjectList
 
 
 class TestEpisodesAPI(TestBase):
 
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_get_episode(self, request_method_mock, tvdb):
         request_method_mock.return_value = self.api_response_mock({
             "data": {
@@ -22,10 +28,182 @@ class TestEpisodesAPI(TestBase):
         assert isinstance(episode, Episode)
         assert episode.id == 1
     
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_episodes_does_not_exist(self, request_method_mock, tvdb):
         request_method_mock.return_value = self.api_response_404_mock()
         
         with pytest.raises(NotFound):
             tvdb.episode_details(1)
 
+
+def _episodes():
+    return [
+        Episode({'id': 11, 'airedSeason': 1, 'airedEpisodeNumber': 1, 'dvdSeason': 1, 'dvdEpisodeNumber': 1.0,
+                 'firstAired': '2017-01-01'}, None),
+        Episode({'id': 13, 'airedSeason': 1, 'airedEpisodeNumber': 3, 'dvdSeason': 1, 'dvdEpisodeNumber': 2.0,
+                 'firstAired': '2017-01-15'}, None),
+        Episode({'id': 12, 'airedSeason': 1, 'airedEpisodeNumber': 2, 'dvdSeason': 1, 'dvdEpisodeNumber': 3.0,
+                 'firstAired': '2017-01-08'}, None),
+        Episode({'id': 21, 'airedSeason': 2, 'airedEpisodeNumber': 1, 'firstAired': '2018-01-01',
+                 'imdbId': 'tt0000021'}, None),
+        Episode({'id': 1, 'airedSeason': 0, 'airedEpisodeNumber': 1, 'firstAired': ''}, None),
+        Episode({'id': 99}, None),
+    ]
+
+
+class TestEpisodeIndex(object):
+
+    def test_lookups(self):
+        index = EpisodeIndex(_episodes(), 1)
+
+        assert len(index) == 6
+        assert index.get(1, 3).id == 13
+        assert index[(2, 1)].id == 21
+        assert (2, 2) not in index
+        assert index.get(2, 2) is None
+        assert index.get_dvd(1, 2).id == 13
+        assert index.get_dvd(1, 3).id == 12
+        assert index.by_id(99).id == 99
+
+    def test_seasons(self):
+        index = EpisodeIndex(_episodes())
+
+        assert index.seasons == [0, 1, 2]
+        assert [e.id for e in index.season(1)] == [11, 12, 13]
+        assert index.season(5) == ()
+
+    def test_aired(self):
+        index = EpisodeIndex(_episodes())
+
+        assert [e.id for e in index.aired] == [11, 12, 13, 21]
+        assert [e.id for e in index.aired_between(datetime.date(2017, 1, 8), datetime.date(2017, 12, 31))] == [12, 13]
+        assert [e.id for e in index.aired_between(datetime.datetime(2017, 1, 15, 20, 0))] == [13]
+        assert index.aired_between(datetime.date(2016, 1, 1), datetime.date(2016, 12, 31)) == []
+        assert index.latest(datetime.date(2017, 1, 10)).id == 12
+        assert index.next(datetime.date(2017, 1, 15)).id == 21
+        assert index.latest(datetime.date(2000, 1, 1)) is None
+        assert index.next(datetime.date(2020, 1, 1)) is None
+
+    def test_query(self):
+        index = EpisodeIndex(_episodes())
+
+        assert [e.id for e in index.query(airedSeason=1)] == [11, 12, 13]
+        assert [e.id for e in index.query(airedSeason='1', airedEpisode='2')] == [12]
+        assert [e.id for e in index.query(dvdSeason=1, dvdEpisode=3)] == [12]
+        assert [e.id for e in index.query(imdbId='tt0000021')] == [21]
+        assert [e.id for e in index.query(firstAired='2017-01-08')] == [12]
+        assert [e.id for e in index.query(airedSeason=1, firstAired='2017-01-15')] == [13]
+        assert index.query(airedSeason=3) == []
+
+        with pytest.raises(ValueError):
+            index.query(seriesName='x')
+
+    def test_compact(self):
+        index = EpisodeIndex([CompactEpisode(e.as_dict(), None) for e in _episodes()])
+        assert index.get(1, 2).id == 12
+        assert [e.id for e in index.aired_between(datetime.date(2017, 1, 1), datetime.date(2017, 1, 8))] == [11, 12]
+
+
+class TestEpisodeIndexAPI(TestBase):
+
+    def test_memoized(self, tvdb):
+        tvdb.episodes_by_series = mock.Mock(return_value=_episodes())
+
+        index = tvdb.episode_index(1)
+        assert tvdb.episode_index(1) is index
+        assert Series({'id': 1}, tvdb).episode_index() is index
+        tvdb.episodes_by_series.assert_called_once_with(1)
+
+        assert tvdb.episode_index(1, refresh=True) is not index
+        assert tvdb.episodes_by_series.call_count == 2
+
+    @mock.patch('tvdbrest.cache.time.time')
+    def test_expired(self, time_mock, tvdb):
+        time_mock.return_value = 1000
+        tvdb.episodes_by_series = mock.Mock(return_value=_episodes())
+
+        index = tvdb.episode_index(1)
+        time_mock.return_value = 1000 + 3600
+        assert tvdb.episode_index(1) is not index
+
+
+class TestLocalEpisodeQueries(TestBase):
+
+    QUERY_PARAMS = ['absoluteNumber', 'airedEpisode', 'airedSeason', 'dvdEpisode', 'dvdSeason', 'firstAired',
+                    'imdbId']
+
+    def _tvdb(self, tvdb):
+        tvdb._api_request = mock.MagicMock(return_value={'links': {'first': 1, 'last': 1}, 'data': []})
+        tvdb.episode_query_params = mock.MagicMock(return_value=self.QUERY_PARAMS)
+        return tvdb
+
+    def test_without_index(self, tvdb):
+        tvdb = self._tvdb(tvdb)
+        tvdb.episodes_by_series(1, airedSeason=2)
+        tvdb._api_request.assert_called_once_with('get', '/series/1/episodes/query?airedSeason=2')
+
+    def test_answered_locally(self, tvdb):
+        tvdb = self._tvdb(tvdb)
+        tvdb.episode_index_cache.set((1, 'en'), CacheEntry(EpisodeIndex(_episodes(), 1), expires=time.time() + 60))
+
+        assert [e.id for e in tvdb.episodes_by_series(1, airedSeason=1)] == [11, 12, 13]
+        assert [e.id for e in Series({'id': 1}, tvdb).episodes(imdbId='tt0000021')] == [21]
+        assert not tvdb._api_request.called
+
+    def test_unsupported_key(self, tvdb):
+        tvdb = self._tvdb(tvdb)
+
+        # rejected whether the index exists or not
+        with pytest.raises(ValueError):
+            tvdb.episodes_by_series(1, episodeName='x')
+        tvdb.episode_index_cache.set((1, 'en'), CacheEntry(EpisodeIndex(_episodes(), 1), expires=time.time() + 60))
+        with pytest.raises(ValueError):
+            tvdb.episodes_by_series(1, episodeName='x')
+        assert not tvdb._api_request.called
+
+    def test_validated_against_query_params(self, tvdb):
+        tvdb = self._tvdb(tvdb)
+        tvdb.episode_query_params.return_value = self.QUERY_PARAMS + ['airedSeasonID']
+        tvdb.episode_index_cache.set((1, 'en'), CacheEntry(EpisodeIndex(_episodes(), 1), expires=time.time() + 60))
+
+        # supported by the API, but not by the index
+        tvdb.episodes_by_series(1, airedSeasonID=5)
+        tvdb._api_request.assert_called_once_with('get', '/series/1/episodes/query?airedSeasonID=5')
+        tvdb.episode_query_params.assert_called_with(1)
+
+        tvdb.episode_query_params.return_value = ['airedSeason']
+        with pytest.raises(ValueError):
+            tvdb.episodes_by_series(1, imdbId='tt0000021')
+
+    def test_same_type_with_and_without_index(self, tvdb):
+        tvdb = self._tvdb(tvdb)
+        remote = tvdb.episodes_by_series(1, airedSeason=1)
+
+        tvdb.episode_index_cache.set((1, 'en'), CacheEntry(EpisodeIndex(_episodes(), 1), expires=time.time() + 60))
+        local = tvdb.episodes_by_series(1, airedSeason=1)
+
+        assert type(local) is type(remote) is PaginatedAPIObjectList
+        assert len(local) == 3
+        assert [e.id for e in local[1:]] == [12, 13]
+        assert local[-1].id == 13
+        assert len(tvdb.episodes_by_series(1, airedSeason=99)) == 0
+
+    def test_stale_index(self, tvdb):
+        tvdb = self._tvdb(tvdb)
+        tvdb.episode_index_cache.set((1, 'en'), CacheEntry(EpisodeIndex(_episodes(), 1), expires=time.time() - 1))
+
+        tvdb.episodes_by_series(1, airedSeason=1)
+        tvdb._api_request.assert_called_once_with('get', '/series/1/episodes/query?airedSeason=1')
+
+    def test_page_uses_api(self, tvdb):
+        tvdb = self._tvdb(tvdb)
+        tvdb.episode_index_cache.set((1, 'en'), CacheEntry(EpisodeIndex(_episodes(), 1), expires=time.time() + 60))
+
+        tvdb.episodes_by_series(1, airedSeason=1, page=2)
+        assert tvdb._api_request.call_count == 1
+
+    def test_query_params_memoized(self, tvdb):
+        tvdb._api_request = mock.MagicMock(return_value={'data': self.QUERY_PARAMS})
+        assert tvdb.episode_query_params(1) == self.QUERY_PARAMS
+        assert tvdb.episode_query_params(1) == self.QUERY_PARAMS
+        tvdb._api_request.assert_called_once_with('get', '/series/1/episodes/query/params')
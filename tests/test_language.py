@@ -9,7 +9,7 @@ from tvdbrest.client import NotFound, Language
 
 class TestLanguageAPI(TestBase):
 
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_languages(self, request_method_mock, tvdb):
         request_method_mock.return_value = self.api_response_mock({
             "data": [
@@ -31,7 +31,7 @@ class TestLanguageAPI(TestBase):
         assert languages
         assert all(isinstance(x, Language) for x in languages)
 
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_get_language(self, request_method_mock, tvdb):
         request_method_mock.return_value = self.api_response_mock({
             "id": 27,
@@ -44,7 +44,7 @@ class TestLanguageAPI(TestBase):
         assert language
         assert language.id == 27
 
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_get_language_does_not_exist(self, request_method_mock, tvdb):
         request_method_mock.return_value = self.api_response_404_mock()
     
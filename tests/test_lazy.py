@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+import datetime
+import json
+import threading
+
+import mock
+import pytest
+
+from tests.base import TestBase
+from tvdbrest.client import TVDB, APIError
+from tvdbrest.lazy import LazySeries
+
+FULL = {
+    1: {'id': 1, 'seriesName': 'The Simpsons', 'overview': 'Springfield', 'firstAired': '1989-12-17'},
+    2: {'id': 2, 'seriesName': 'Futurama', 'overview': 'New New York', 'firstAired': '1999-03-28'},
+    3: {'id': 3, 'seriesName': 'Scrubs', 'overview': 'Sacred Heart', 'firstAired': '2001-10-02'},
+}
+
+
+class FakeAPI(object):
+
+    def __init__(self, failing=()):
+        self.urls = []
+        self.failing = failing
+        self._lock = threading.Lock()
+
+    def __call__(self, method, url, headers=None, **kwargs):
+        with self._lock:
+            self.urls.append(url.replace(TVDB.api_url, '/'))
+        m = mock.MagicMock()
+        m.status_code = 200
+        if '/search/series' in url:
+            data = [{'id': i, 'seriesName': FULL[i]['seriesName']} for i in sorted(FULL)]
+        else:
+            series_id = int(url.split('/')[4].split('?')[0])
+            if series_id in self.failing and '/filter' not in url:
+                m.status_code = 500
+                data = None
+            elif series_id not in FULL:
+                m.status_code = 404
+                data = None
+            elif '/filter' in url:
+                data = {'id': series_id, 'seriesName': FULL[series_id]['seriesName']}
+            else:
+                data = FULL[series_id]
+        m.content = json.dumps({'data': data}).encode('utf-8')
+        return m
+
+
+@pytest.fixture
+def tvdb():
+    tvdb = TVDB("myusername", "myuserkey", "myapikey", lazy=True)
+    tvdb.jwttoken = "test-token"
+    return tvdb
+
+
+class TestLazySeries(TestBase):
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_upgrade_on_missing_field(self, request_mock, tvdb):
+        request_mock.side_effect = api = FakeAPI()
+
+        series = tvdb.series(1, keys=['seriesName'])
+        assert isinstance(series, LazySeries)
+        assert series.partial
+        assert series.fields == {'id', 'seriesName'}
+        assert series.seriesName == 'The Simpsons'
+        assert api.urls == ['/series/1/filter?keys=seriesName']
+
+        assert series.overview == 'Springfield'
+        assert series.firstAired == datetime.date(1989, 12, 17)
+        assert not series.partial
+        assert api.urls == ['/series/1/filter?keys=seriesName', '/series/1']
+
+        with pytest.raises(KeyError):
+            series.unknownField
+        assert len(api.urls) == 2
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_search_results_upgraded_together(self, request_mock, tvdb):
+        request_mock.side_effect = api = FakeAPI()
+
+        results = tvdb.search(name='x')
+        assert [s.seriesName for s in results] == ['The Simpsons', 'Futurama', 'Scrubs']
+        assert len(api.urls) == 1
+
+        assert results[1].overview == 'New New York'
+        assert sorted(api.urls[1:]) == ['/series/1', '/series/2', '/series/3']
+        assert [s.overview for s in results] == ['Springfield', 'New New York', 'Sacred Heart']
+        assert len(api.urls) == 4
+        assert results[0]._lazy is None
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_max_batch(self, request_mock, tvdb):
+        request_mock.side_effect = api = FakeAPI()
+
+        results = tvdb.search(name='x')
+        results[0]._lazy[0].max_batch = 2
+        results[2].overview
+        assert sorted(api.urls[1:]) == ['/series/1', '/series/3']
+        assert results[1].partial
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_errors(self, request_mock, tvdb):
+        request_mock.side_effect = FakeAPI(failing=(1, ))
+
+        series = tvdb.series(1, keys=['seriesName'])
+        with pytest.raises(APIError):
+            series.overview
+        assert series.partial
+
+        request_mock.side_effect = FakeAPI()
+        assert series.overview == 'Springfield'
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_not_lazy(self, request_mock):
+        request_mock.side_effect = FakeAPI()
+        tvdb = TVDB("myusername", "myuserkey", "myapikey")
+        tvdb.jwttoken = "test-token"
+
+        series = tvdb.series(1, keys=['seriesName'])
+        assert not isinstance(series, LazySeries)
+        with pytest.raises(KeyError):
+            series.overview
+        assert not isinstance(tvdb.search(name='x')[0], LazySeries)
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import mock
+import pytest
+
+from tests.base import TestBase, tvdb
+from tvdbrest.client import TVDB, NotFound
+from tvdbrest.metrics import Histogram, MetricsCollector, RequestEvent
+from tvdbrest.ratelimit import RetryPolicy
+
+
+class TestHistogram(object):
+
+    def test_observe(self):
+        h = Histogram(buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            h.observe(value)
+
+        assert h.count == 4
+        assert h.sum == pytest.approx(3.65)
+        assert h.cumulative() == [(0.1, 2), (1, 3), (float('inf'), 4)]
+
+
+class TestRequestEvent(object):
+
+    def test_endpoint_template(self):
+        event = RequestEvent('GET', 'https://api.thetvdb.com/series/71663/episodes?page=2')
+        assert event.method == 'get'
+        assert event.endpoint == '/series/{id}/episodes'
+
+
+class TestHooks(TestBase):
+
+    def test_unknown_event(self, tvdb):
+        with pytest.raises(ValueError):
+            tvdb.add_hook('after_everything', lambda e: None)
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_hooks_called(self, request_mock, tvdb):
+        request_mock.return_value = self.api_response_mock({'data': {'id': 1}})
+        calls = []
+        tvdb.add_hook('before_request', lambda e: calls.append(('before', e.endpoint)))
+        tvdb.add_hook('after_request', lambda e: calls.append(('after', e.status_code)))
+
+        tvdb.series(1)
+        assert calls == [('before', '/series/{id}'), ('after', 200)]
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_error_hook(self, request_mock, tvdb):
+        request_mock.return_value = self.api_response_404_mock()
+        errors = []
+        tvdb.add_hook('on_error', errors.append)
+
+        with pytest.raises(NotFound):
+            tvdb.series(1)
+        assert len(errors) == 1
+        assert isinstance(errors[0].error, NotFound)
+        assert errors[0].status_code == 404
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_failing_hook_ignored(self, request_mock, tvdb):
+        request_mock.return_value = self.api_response_mock({'data': {'id': 1}})
+        tvdb.add_hook('after_request', lambda e: 1 / 0)
+
+        assert tvdb.series(1).id == 1
+
+
+class TestMetricsCollector(TestBase):
+
+    @mock.patch('tvdbrest.client.time.sleep')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_collect(self, request_mock, sleep_mock):
+        retry = self.api_response_mock({})
+        retry.status_code = 503
+        retry.headers = {}
+        request_mock.side_effect = [
+            self.api_response_mock({'token': 'abc'}),
+            retry,
+            self.api_response_mock({'data': {'id': 1}}),
+            self.api_response_404_mock(),
+        ]
+        metrics = MetricsCollector()
+        tvdb = TVDB("myusername", "myuserkey", "myapikey", metrics=metrics, retry_policy=RetryPolicy(jitter=False))
+
+        tvdb.login()
+        tvdb.series(1)
+        with pytest.raises(NotFound):
+            tvdb.series(2)
+
+        assert metrics.logins == 1
+        summary = metrics.summary()
+        assert summary['/series/{id}']['requests'] == 3
+        assert summary['/series/{id}']['status_codes'] == {200: 1, 404: 1, 503: 1}
+        assert summary['/series/{id}']['retries'] == 1
+        assert summary['/series/{id}']['errors'] == 1
+        assert summary['/series/{id}']['response_bytes'] == len(b'{"data": {"id": 1}}')
+        assert '/series/{id}' in metrics.decode_time
+        assert summary['/login']['requests'] == 1
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_prometheus(self, request_mock):
+        request_mock.return_value = self.api_response_mock({'data': []})
+        metrics = MetricsCollector(buckets=(0.5,))
+        tvdb = TVDB("myusername", "myuserkey", "myapikey", metrics=metrics)
+        tvdb.jwttoken = "test-token"
+
+        tvdb.languages()
+        text = metrics.to_prometheus()
+
+        assert '# TYPE tvdb_requests_total counter' in text
+        assert 'tvdb_requests_total{endpoint="/languages",method="get",status="200"} 1\n' in text
+        assert 'tvdb_request_duration_seconds_bucket{endpoint="/languages",le="0.5"} 1\n' in text
+        assert 'tvdb_request_duration_seconds_bucket{endpoint="/languages",le="+Inf"} 1\n' in text
+        assert 'tvdb_request_duration_seconds_count{endpoint="/languages"} 1\n' in text
+        assert 'tvdb_response_bytes_total{endpoint="/languages"} 12\n' in text
+        assert 'tvdb_logins_total 0\n' in text
+
+    def test_label_escaping(self):
+        metrics = MetricsCollector()
+        event = RequestEvent('get', 'https://api.thetvdb.com/search/"x"')
+        event.status_code = 200
+        metrics.after_request(event)
+        assert 'endpoint="/search/\\"x\\""' in metrics.to_prometheus()
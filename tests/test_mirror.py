@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import mock
+import pytest
+
+from tvdbrest.client import NotFound
+from tvdbrest.mirror import Mirror, UPDATES_WINDOW
+from tvdbrest.objects import Series, Episode, Update
+
+
+class FakeTVDB(object):
+
+    def __init__(self):
+        self.series_data = {
+            1: {'id': 1, 'seriesName': 'One', 'imdbId': 'tt001', 'lastUpdated': 100},
+            2: {'id': 2, 'seriesName': 'Two', 'imdbId': 'tt002', 'lastUpdated': 100},
+        }
+        self.episode_data = {
+            1: [
+                {'id': 11, 'airedSeason': 1, 'airedEpisodeNumber': 2, 'firstAired': '2017-01-08',
+                 'imdbId': 'tt011', 'lastUpdated': 100},
+                {'id': 10, 'airedSeason': 1, 'airedEpisodeNumber': 1, 'firstAired': '2017-01-01',
+                 'imdbId': 'tt010', 'lastUpdated': 100},
+            ],
+            2: [
+                {'id': 20, 'airedSeason': 1, 'airedEpisodeNumber': 1, 'firstAired': '2017-01-03',
+                 'imdbId': '', 'lastUpdated': 100},
+            ],
+        }
+        self.updates = mock.MagicMock(return_value=[])
+        self.series_calls = []
+
+    def series(self, series_id):
+        self.series_calls.append(series_id)
+        if series_id not in self.series_data:
+            raise NotFound("Not Found")
+        return Series(dict(self.series_data[series_id]), self)
+
+    def episodes_by_series(self, series_id):
+        return [Episode(dict(e), self) for e in self.episode_data[series_id]]
+
+
+@pytest.fixture
+def mirror():
+    tvdb = FakeTVDB()
+    m = Mirror(tvdb, ':memory:')
+    m.add_series(1)
+    m.add_series(2)
+    return m
+
+
+class TestMirror(object):
+
+    def test_read_series(self, mirror):
+        assert mirror.series_ids == {1, 2}
+
+        series = mirror.series(1)
+        assert isinstance(series, Series)
+        assert str(series) == 'One'
+        assert series._tvdb is mirror.tvdb
+        assert mirror.series_by_imdb_id('tt002').id == 2
+
+        with pytest.raises(NotFound):
+            mirror.series(3)
+        with pytest.raises(NotFound):
+            mirror.series_by_imdb_id('tt003')
+
+    def test_read_episodes(self, mirror):
+        assert [e.id for e in mirror.episodes_by_series(1)] == [10, 11]
+        assert mirror.episode(20).airedSeason == 1
+        assert [e.id for e in mirror.episodes_by_imdb_id('tt011')] == [11]
+
+        with pytest.raises(NotFound):
+            mirror.episode(99)
+
+    def test_episodes_aired(self, mirror):
+        assert [e.id for e in mirror.episodes_aired(datetime.date(2017, 1, 1), datetime.date(2017, 1, 7))] == [10, 20]
+        assert [e.id for e in mirror.episodes_aired('2017-01-08')] == [11]
+        assert [e.id for e in mirror.episodes_aired('2017-01-01', '2017-01-31', series_id=2)] == [20]
+
+    def test_sync_refetches_changed_series_only(self, mirror):
+        tvdb = mirror.tvdb
+        tvdb.series_calls = []
+        tvdb.series_data[1]['lastUpdated'] = 200
+        tvdb.episode_data[1][0]['lastUpdated'] = 200
+        tvdb.episode_data[1][0]['episodeName'] = 'Changed'
+        del tvdb.episode_data[1][1]
+        tvdb.updates.return_value = [
+            Update({'id': 1, 'lastUpdated': 200}, tvdb),
+            Update({'id': 2, 'lastUpdated': 100}, tvdb),  # not newer than the mirrored copy
+            Update({'id': 3, 'lastUpdated': 200}, tvdb),  # not mirrored
+        ]
+
+        start = mirror.last_sync
+        assert mirror.sync(to_time=start + 10) == {1}
+        assert tvdb.series_calls == [1]
+        tvdb.updates.assert_called_once_with(start, start + 10)
+
+        assert mirror.last_sync == start + 10
+        assert [str(e.episodeName) for e in mirror.episodes_by_series(1)] == ['Changed']
+
+    def test_sync_splits_long_ranges(self, mirror):
+        start = mirror.last_sync
+        mirror.sync(to_time=start + 2 * UPDATES_WINDOW + 1)
+
+        assert mirror.tvdb.updates.call_args_list == [
+            mock.call(start, start + UPDATES_WINDOW),
+            mock.call(start + UPDATES_WINDOW, start + 2 * UPDATES_WINDOW),
+            mock.call(start + 2 * UPDATES_WINDOW, start + 2 * UPDATES_WINDOW + 1),
+        ]
+
+    def test_sync_removes_deleted_series(self, mirror):
+        tvdb = mirror.tvdb
+        del tvdb.series_data[2]
+        tvdb.updates.return_value = [Update({'id': 2, 'lastUpdated': 300}, tvdb)]
+
+        mirror.sync(to_time=mirror.last_sync + 10)
+        assert mirror.series_ids == {1}
+        assert mirror.episodes_by_series(2) == []
+
+    def test_persistence(self, tmpdir):
+        path = str(tmpdir.join('mirror.db'))
+        m = Mirror(FakeTVDB(), path)
+        m.add_series(1)
+        m.close()
+
+        m = Mirror(FakeTVDB(), path)
+        assert m.series(1).seriesName == 'One'
+        assert m.last_sync is not None
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 import datetime
+import threading
+import time
 
 import mock
 import pytest
@@ -53,16 +55,58 @@ class TestFieldMixins(object):
 
 class TestPagination(object):
 
-    def test_slicing(self):
-        paol = PaginatedAPIObjectList({
+    def _paginated(self, fetched, prefetch_workers=0):
+        # 7 pages of 3 items (0..20), the last page holds 2 items
+        def _fetch(page):
+            fetched.append(page)
+            return list(range((page-1) * 3, min(page * 3, 20)))
+
+        return PaginatedAPIObjectList({
             "first": 1,
             "last": 7,
             "next": 2,
             "prev": None
-        }, [], None, page_size=1)
+        }, [0, 1, 2], _fetch, page_size=3, prefetch_workers=prefetch_workers)
+
+    def test_slicing(self):
+        expected = list(range(20))
+        for s in (slice(1, 2), slice(None, 5), slice(4, 11, 3), slice(-5, None), slice(-7, -2, 2),
+                  slice(None, None, -1), slice(15, 2, -4), slice(18, 100), slice(30, 40), slice(5, 5)):
+            assert self._paginated([])[s] == expected[s], s
+
+    def test_slicing_fetches_covering_pages(self):
+        fetched = []
+        paol = self._paginated(fetched)
+        assert paol[4:8] == [4, 5, 6, 7]
+        assert sorted(fetched) == [2, 3]
+
+        fetched = []
+        paol = self._paginated(fetched)
+        assert paol[-10:] == list(range(10, 20))
+        assert sorted(fetched) == [4, 5, 6, 7]
+
+        fetched = []
+        paol = self._paginated(fetched)
+        assert paol[-2:] == [18, 19]
+        assert fetched == [7]
+
+    def test_slicing_concurrent(self):
+        fetched = []
+        paol = self._paginated(fetched, prefetch_workers=4)
+        assert paol[::2] == list(range(0, 20, 2))
+        assert sorted(fetched) == [2, 3, 4, 5, 6, 7]
+
+    def test_negative_indexing(self):
+        fetched = []
+        paol = self._paginated(fetched)
+        assert paol[-1] == 19
+        assert paol[-20] == 0
+        assert paol[-3] == 17
+        assert paol[3] == 3
+        assert fetched == [7, 6, 2]
 
-        with pytest.raises(ValueError):
-            paol[1:2]
+        with pytest.raises(IndexError):
+            paol[-21]
 
     def test_indexing_out_of_bounds(self):
         paol = PaginatedAPIObjectList({
@@ -196,3 +240,60 @@ class TestPagination(object):
 
         for i, item in enumerate(paol, 1):
             assert item == i
+
+    def test_iter_prefetch(self):
+        active = []
+        max_active = []
+        lock = threading.Lock()
+
+        def _dummy_fetch(page):
+            with lock:
+                active.append(page)
+                max_active.append(len(active))
+            time.sleep(0.01 * (10 - page))  # later pages finish first
+            with lock:
+                active.remove(page)
+            return [page * 10 + i for i in range(2)]
+
+        paol = PaginatedAPIObjectList({
+            "first": 1,
+            "last": 8,
+            "next": 2,
+            "prev": None
+        }, [10, 11], _dummy_fetch, page_size=2, prefetch_workers=3, read_ahead=4)
+
+        assert list(paol) == [p * 10 + i for p in range(1, 9) for i in range(2)]
+        assert all(page is not None for page in paol._pages)
+        assert 1 < max(max_active) <= 3
+
+    def test_iter_prefetch_error(self):
+        def _dummy_fetch(page):
+            raise RuntimeError("failed")
+
+        paol = PaginatedAPIObjectList({
+            "first": 1,
+            "last": 3,
+            "next": 2,
+            "prev": None
+        }, [1, 2], _dummy_fetch, page_size=2, prefetch_workers=2)
+
+        it = iter(paol)
+        assert next(it) == 1
+        assert next(it) == 2
+        with pytest.raises(RuntimeError):
+            next(it)
+        assert paol._pages[1] is None
+
+    def test_fetch_kwargs_not_modified(self):
+        fetch_mock = mock.Mock(return_value=[3, 4])
+        fetch_kwargs = {'airedSeason': 1}
+        paol = PaginatedAPIObjectList({
+            "first": 1,
+            "last": 2,
+            "next": 2,
+            "prev": None
+        }, [1, 2], fetch_mock, (), fetch_kwargs, page_size=2)
+
+        assert list(paol) == [1, 2, 3, 4]
+        fetch_mock.assert_called_once_with(airedSeason=1, page=2)
+        assert fetch_kwargs == {'airedSeason': 1}
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+import mock
+import pytest
+
+from tests.base import TestBase
+from tvdbrest.client import TVDB, APIError
+from tvdbrest.ratelimit import TokenBucket, RetryPolicy
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    c = FakeClock()
+    with mock.patch('tvdbrest.ratelimit.time.monotonic', c.monotonic), \
+            mock.patch('tvdbrest.ratelimit.time.sleep', c.sleep):
+        yield c
+
+
+class TestTokenBucket(object):
+
+    def test_burst_then_throttle(self, clock):
+        bucket = TokenBucket(rate=2, capacity=2)
+
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == pytest.approx(0.5)
+        assert bucket.throttled == 1
+        assert bucket.throttle_delay == pytest.approx(0.5)
+
+    def test_refill(self, clock):
+        bucket = TokenBucket(rate=10, capacity=1)
+        bucket.acquire()
+        clock.now += 1
+        assert bucket.acquire() == 0
+
+
+class TestRetryPolicy(object):
+
+    def test_should_retry(self):
+        policy = RetryPolicy(max_retries=2)
+        assert policy.should_retry('GET', 503, 0)
+        assert policy.should_retry('get', 429, 1)
+        assert not policy.should_retry('get', 429, 2)
+        assert not policy.should_retry('post', 503, 0)
+        assert not policy.should_retry('get', 404, 0)
+
+    def test_exponential_backoff(self):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=5, jitter=False)
+        assert [policy.backoff(i) for i in range(4)] == [1, 2, 4, 5]
+        assert policy.retries == 4
+        assert policy.retry_delay == 12
+
+    def test_jitter(self):
+        policy = RetryPolicy(backoff_factor=1)
+        assert all(0 <= policy.backoff(3) <= 8 for _ in range(20))
+
+    def test_retry_after_seconds(self):
+        response = mock.Mock(headers={'Retry-After': '7'})
+        assert RetryPolicy().backoff(0, response) == 7
+        # the server's delay is a minimum
+        assert RetryPolicy(max_backoff=3).backoff(0, response) == 7
+        assert RetryPolicy(backoff_factor=10, jitter=False).backoff(1, response) == 20
+        assert RetryPolicy(max_backoff=3, max_retry_after=5).backoff(0, response) == 5
+
+    @mock.patch('tvdbrest.ratelimit.time.time', return_value=1488124800)
+    def test_retry_after_date(self, time_mock):
+        response = mock.Mock(headers={'Retry-After': 'Sun, 26 Feb 2017 16:00:10 GMT'})
+        assert RetryPolicy().backoff(0, response) == 10
+
+
+class TestClientRetry(TestBase):
+
+    def _response(self, status_code, json=None):
+        m = self.api_response_mock(json)
+        m.status_code = status_code
+        m.headers = {}
+        return m
+
+    @mock.patch('tvdbrest.client.time.sleep')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_retry_on_503(self, request_mock, sleep_mock):
+        request_mock.side_effect = [self._response(503), self._response(429),
+                                    self._response(200, {'data': {'id': 1}})]
+        tvdb = TVDB("myusername", "myuserkey", "myapikey", retry_policy=RetryPolicy(jitter=False))
+        tvdb.jwttoken = "test-token"
+
+        assert tvdb.series(1).id == 1
+        assert request_mock.call_count == 3
+        assert sleep_mock.call_args_list == [mock.call(0.5), mock.call(1.0)]
+
+    @mock.patch('tvdbrest.client.time.sleep')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_retry_after_longer_than_max_backoff(self, request_mock, sleep_mock):
+        throttled = self._response(429)
+        throttled.headers = {'Retry-After': '60'}
+        request_mock.side_effect = [throttled, self._response(200, {'data': {'id': 1}})]
+        tvdb = TVDB("myusername", "myuserkey", "myapikey", retry_policy=RetryPolicy(max_backoff=30))
+        tvdb.jwttoken = "test-token"
+
+        assert tvdb.series(1).id == 1
+        sleep_mock.assert_called_once_with(60)
+
+    @mock.patch('tvdbrest.client.time.sleep')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_failed_responses_closed(self, request_mock, sleep_mock):
+        responses = [self._response(503), self._response(200, {'data': []})]
+        request_mock.side_effect = responses
+        tvdb = TVDB("myusername", "myuserkey", "myapikey", retry_policy=RetryPolicy(jitter=False))
+        tvdb.jwttoken = "test-token"
+
+        tvdb._stream_request('/series/1/episodes')
+        assert responses[0].close.called
+        assert not responses[1].close.called
+
+    @mock.patch('tvdbrest.client.time.sleep')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_give_up(self, request_mock, sleep_mock):
+        request_mock.return_value = self._response(500)
+        tvdb = TVDB("myusername", "myuserkey", "myapikey", retry_policy=RetryPolicy(max_retries=2))
+        tvdb.jwttoken = "test-token"
+
+        with pytest.raises(APIError):
+            tvdb.series(1)
+        assert request_mock.call_count == 3
+
+    @mock.patch('tvdbrest.client.time.sleep')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_no_retry_for_post(self, request_mock, sleep_mock):
+        request_mock.return_value = self._response(503)
+        tvdb = TVDB("myusername", "myuserkey", "myapikey", retry_policy=RetryPolicy())
+
+        with pytest.raises(APIError):
+            tvdb.login()
+        assert request_mock.call_count == 1
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_rate_limiter_used(self, request_mock):
+        request_mock.return_value = self._response(200, {'data': []})
+        bucket = mock.Mock(spec=TokenBucket)
+        tvdb = TVDB("myusername", "myuserkey", "myapikey", rate_limiter=bucket)
+        tvdb.jwttoken = "test-token"
+
+        tvdb.languages()
+        tvdb.languages()
+        assert bucket.acquire.call_count == 2
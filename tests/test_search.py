@@ -4,12 +4,14 @@ import mock
 import pytest
 
 from tests.base import TestBase, tvdb
-from tvdbrest.client import NotFound
+from tvdbrest.client import TVDB, NotFound, Series
+from tvdbrest.compact import CompactSeries
+from tvdbrest.search import SeriesSearchIndex
 
 
 class TestSearchAPI(TestBase):
 
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_series_search_params(self, request_method_mock, tvdb):
         request_method_mock.return_value = self.api_response_mock({
             "data": {
@@ -20,12 +22,12 @@ class TestSearchAPI(TestBase):
         assert tvdb.series_search_params == ["foo", "bar", "baz"]
         request_method_mock.assert_called_once()
 
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_series_search_no_args(self, request_method_mock, tvdb):
         assert tvdb.search() == []
         request_method_mock.assert_not_called()
     
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_series_search(self, request_method_mock, tvdb):
         request_method_mock.return_value = self.api_response_mock({
             'data': [{
@@ -38,9 +40,116 @@ class TestSearchAPI(TestBase):
         assert search_result
         assert search_result[0].id == 1
 
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_series_search_not_found(self, request_method_mock, tvdb):
         request_method_mock.return_value = self.api_response_404_mock()
 
         with pytest.raises(NotFound):
             tvdb.search(name='foo')
+
+
+def _series(tvdb=None):
+    return [
+        Series({'id': 71663, 'seriesName': 'The Simpsons', 'aliases': ['Los Simpson'], 'network': 'FOX',
+                'imdbId': 'tt0096697', 'zap2itId': 'EP00018693'}, tvdb),
+        Series({'id': 76156, 'seriesName': 'Scrubs', 'aliases': [], 'network': 'NBC', 'imdbId': 'tt0285403'}, tvdb),
+        Series({'id': 75897, 'seriesName': 'South Park', 'aliases': [], 'network': 'Comedy Central'}, tvdb),
+        Series({'id': 80379, 'seriesName': 'The Big Bang Theory', 'aliases': [], 'network': 'CBS'}, tvdb),
+        Series({'id': 79168, 'seriesName': 'Pokémon', 'aliases': ['Pocket Monsters'], 'network': 'TV Tokyo'}, tvdb),
+    ]
+
+
+class TestSeriesSearchIndex(object):
+
+    def _index(self, tvdb=None):
+        index = SeriesSearchIndex(tvdb)
+        index.add_many(_series(tvdb))
+        return index
+
+    def _ids(self, results):
+        return [s.id for s in results]
+
+    def test_exact_and_tokens(self):
+        index = self._index()
+        assert self._ids(index.local_search('The Simpsons')) == [71663]
+        assert self._ids(index.local_search('simpsons')) == [71663]
+        assert self._ids(index.local_search('the')) == [71663, 80379]
+        assert self._ids(index.local_search('park south')) == [75897]
+
+    def test_prefix(self):
+        index = self._index()
+        assert self._ids(index.local_search('Sc')) == [76156]
+        assert self._ids(index.local_search('the big ba')) == [80379]
+        assert set(self._ids(index.local_search('s'))) == {71663, 76156, 75897}
+
+    def test_typos(self):
+        index = self._index()
+        assert self._ids(index.local_search('Simspons')) == [71663]   # transposition
+        assert self._ids(index.local_search('Scrbs')) == [76156]      # deletion
+        assert self._ids(index.local_search('Scrubbs')) == [76156]    # insertion
+        assert self._ids(index.local_search('Sauth Park')) == [75897]  # substitution
+        assert index.local_search('Scxyz') == []
+
+    def test_other_fields(self):
+        index = self._index()
+        assert self._ids(index.local_search('tt0096697')) == [71663]
+        assert self._ids(index.local_search('EP00018693')) == [71663]
+        assert self._ids(index.local_search('pokemon')) == [79168]
+        assert self._ids(index.local_search('pocket monsters')) == [79168]
+        assert self._ids(index.local_search('nbc')) == [76156]
+
+    def test_ranking(self):
+        index = self._index()
+        index.add(Series({'id': 1, 'seriesName': 'Simpsons Documentary', 'aliases': [], 'network': 'FOX'}, None))
+        assert self._ids(index.local_search('simpsons')) == [1, 71663]
+        assert self._ids(index.local_search('the simpsons')) == [71663]
+        assert self._ids(index.local_search('fox', limit=1)) == [1]
+
+    def test_remove_and_replace(self):
+        index = self._index()
+        index.remove(76156)
+        assert 76156 not in index
+        assert index.local_search('scrubs') == []
+
+        index.add(Series({'id': 71663, 'seriesName': 'Die Simpsons', 'aliases': []}, None))
+        assert len(index) == 4
+        assert index.local_search('the simpsons') == []
+        assert self._ids(index.local_search('die simpsons')) == [71663]
+
+    def test_remote_fallback(self):
+        tvdb = mock.Mock()
+        tvdb.codec = None
+        tvdb.search.return_value = [Series({'id': 81189, 'seriesName': 'Breaking Bad', 'aliases': []}, tvdb)]
+        index = self._index(tvdb)
+
+        assert self._ids(index.search('simpsons')) == [71663]
+        assert not tvdb.search.called
+
+        assert self._ids(index.search('breaking bad')) == [81189]
+        tvdb.search.assert_called_once_with(name='breaking bad')
+        assert self._ids(index.search('breaking')) == [81189]
+        assert tvdb.search.call_count == 1
+
+        assert index.search('unknown', remote=False) == []
+
+    def test_no_match(self):
+        tvdb = mock.Mock()
+        tvdb.codec = None
+        tvdb.search.side_effect = NotFound()
+        index = self._index(tvdb)
+
+        assert index.search('unknown') == []
+        tvdb.search.assert_called_once_with(name='unknown')
+        assert len(index) == 5
+
+    def test_persistence(self, tmpdir):
+        path = str(tmpdir.join('series.idx'))
+        self._index().save(path)
+
+        tvdb = TVDB("myusername", "myuserkey", "myapikey", compact=True)
+        index = SeriesSearchIndex.load(path, tvdb)
+        assert len(index) == 5
+        results = index.local_search('simpsons')
+        assert self._ids(results) == [71663]
+        assert isinstance(results[0], CompactSeries)
+        assert results[0].network == 'FOX'
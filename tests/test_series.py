@@ -1,15 +1,17 @@
 # -*- coding: utf-8 -*-
+import threading
+import time
 
 import mock
 import pytest
 
 from tests.base import TestBase, tvdb
-from tvdbrest.client import NotFound, Series
+from tvdbrest.client import TVDB, NotFound, APIError, Series, Episode
 
 
 class TestSeriesAPI(TestBase):
 
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_get_series(self, request_method_mock, tvdb):
         request_method_mock.return_value = self.api_response_mock({
             "data": {
@@ -37,7 +39,7 @@ class TestSeriesAPI(TestBase):
         tvdb.series(123, keys=['foo', 'bar', 'baz'])
         tvdb._api_request.assert_called_with('get', '/series/123/filter?keys=foo%2Cbar%2Cbaz')
 
-    @mock.patch('tvdbrest.client.requests.request')
+    @mock.patch('tvdbrest.transport.requests.Session.request')
     def test_get_series_does_not_exist(self, request_method_mock, tvdb):
         request_method_mock.return_value = self.api_response_404_mock()
         
@@ -54,6 +56,7 @@ class TestSeriesAPI(TestBase):
 
     def test_episode_by_series_with_query(self, tvdb):
         tvdb._api_request = mock.MagicMock()
+        tvdb.episode_query_params = mock.MagicMock(return_value=['airedSeason'])
     
         s = Series({'id': 123}, tvdb)
         s.episodes(airedSeason=2)
@@ -103,3 +106,156 @@ class TestSeriesAPI(TestBase):
         tvdb.images(123, keyType='fanart')
     
         tvdb._api_request.assert_called_with('get', '/series/123/images/query?keyType=fanart')
+
+    def test_episodes_by_series_prefetch_settings(self, tvdb):
+        tvdb.prefetch_workers = 4
+        tvdb.prefetch_read_ahead = 6
+        tvdb._api_request = mock.MagicMock(return_value={
+            'links': {'first': 1, 'last': 1},
+            'data': [],
+        })
+
+        episodes = tvdb.episodes_by_series(123)
+        assert episodes.prefetch_workers == 4
+        assert episodes.read_ahead == 6
+
+
+class TestSeriesMany(object):
+
+    def _series(self, series_id, keys=None, language=None):
+        if series_id == 2:
+            raise NotFound("Not Found")
+        if series_id == 3:
+            raise APIError()
+        return Series({'id': series_id, 'keys': keys}, None)
+
+    def test_series_many_ordered(self, tvdb):
+        tvdb.series = mock.MagicMock(side_effect=self._series)
+
+        results = list(tvdb.series_many([1, 2, 3, 4, 5], keys=['seriesName'], concurrency=2))
+
+        assert [r.series_id for r in results] == [1, 2, 3, 4, 5]
+        assert [r.series.id for r in results if r.series] == [1, 4, 5]
+        assert isinstance(results[1].error, NotFound)
+        assert isinstance(results[2].error, APIError)
+        assert results[0].series.keys == ['seriesName']
+        assert results[0].error is None
+
+    def test_series_many_as_completed(self, tvdb):
+        tvdb.series = mock.MagicMock(side_effect=self._series)
+
+        results = list(tvdb.series_many(range(100), concurrency=4, ordered=False))
+
+        assert sorted(r.series_id for r in results) == list(range(100))
+        assert tvdb.series.call_count == 100
+
+    def test_series_many_login(self):
+        tvdb = TVDB("myusername", "myuserkey", "myapikey")
+        tvdb.login = mock.MagicMock()
+        tvdb.series = mock.MagicMock(side_effect=self._series)
+        list(tvdb.series_many([1]))
+        tvdb.login.assert_called_once_with()
+
+
+class TestCoalescing(TestBase):
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_concurrent_identical_requests(self, request_mock, tvdb):
+        def _request(*args, **kwargs):
+            time.sleep(0.05)
+            return self.api_response_mock({'data': {'id': 1}})
+
+        request_mock.side_effect = _request
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(tvdb.series(1))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert request_mock.call_count == 1
+        assert tvdb.coalesced_requests == 7
+        assert all(s.id == 1 for s in results) and len(results) == 8
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_coalescing_disabled(self, request_mock):
+        tvdb = TVDB("myusername", "myuserkey", "myapikey", coalesce=False)
+        tvdb.jwttoken = "test-token"
+        request_mock.return_value = self.api_response_mock({'data': {'id': 1}})
+
+        tvdb.series(1)
+        assert tvdb.coalesced_requests == 0
+
+
+class TestLanguages(TestBase):
+
+    TRANSLATIONS = {
+        'en': {'id': 1, 'seriesName': 'The Simpsons', 'overview': 'Springfield family', 'network': 'FOX'},
+        'de': {'id': 1, 'seriesName': 'Die Simpsons', 'overview': '', 'network': None},
+        'fr': {'id': 1, 'seriesName': 'Les Simpson', 'overview': 'Famille', 'network': None},
+    }
+
+    def _request(self, requests):
+        def _request(method, url, headers=None, **kwargs):
+            language = headers['Accept-Language']
+            requests.append((url, language))
+            return self.api_response_mock({'data': self.TRANSLATIONS[language]})
+        return _request
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_language_per_call(self, request_mock, tvdb):
+        requests = []
+        request_mock.side_effect = self._request(requests)
+
+        assert tvdb.series(1).seriesName == 'The Simpsons'
+        assert tvdb.series(1, language='de').seriesName == 'Die Simpsons'
+        assert [r[1] for r in requests] == ['en', 'de']
+        assert tvdb.accept_language == 'en'
+
+    def test_language_search_and_episodes(self, tvdb):
+        tvdb._api_request = mock.MagicMock(return_value={'links': {'first': 1, 'last': 1}, 'data': []})
+        tvdb.episode_query_params = mock.MagicMock(return_value=['airedSeason'])
+
+        tvdb.search(name='Simpsons', language='de')
+        tvdb._api_request.assert_called_with('get', '/search/series?name=Simpsons',
+                                             headers={'Accept-Language': 'de'})
+
+        tvdb.episodes_by_series(1, language='fr', airedSeason=2)
+        tvdb._api_request.assert_called_with('get', '/series/1/episodes/query?airedSeason=2',
+                                             headers={'Accept-Language': 'fr'})
+
+        tvdb.episodes_by_series(1)
+        tvdb._api_request.assert_called_with('get', '/series/1/episodes')
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_translated_series(self, request_mock, tvdb):
+        requests = []
+        request_mock.side_effect = self._request(requests)
+
+        series = tvdb.translated_series(1, ['de', 'fr', 'en'])
+        assert series.seriesName == 'Die Simpsons'
+        assert series.overview == 'Famille'
+        assert series.network == 'FOX'
+        assert sorted(r[1] for r in requests) == ['de', 'en', 'fr']
+
+        # translations are fetched only once
+        assert tvdb.translated_series(1, ['en', 'de']).overview == 'Springfield family'
+        assert len(requests) == 3
+        assert set(tvdb.series_translations(1, ['de', 'en'])) == {'de', 'en'}
+        assert len(requests) == 3
+
+    def test_translated_episodes(self, tvdb):
+        episodes = {
+            'de': [Episode({'id': 1, 'episodeName': 'Es weihnachtet schwer', 'overview': None}, tvdb),
+                   Episode({'id': 2, 'episodeName': '', 'overview': None}, tvdb)],
+            'en': [Episode({'id': 2, 'episodeName': 'Bart the Genius', 'overview': 'Bart cheats'}, tvdb),
+                   Episode({'id': 1, 'episodeName': 'Simpsons Roasting', 'overview': 'Christmas'}, tvdb)],
+        }
+        tvdb.episodes_by_series = mock.Mock(side_effect=lambda series_id, language: episodes[language])
+
+        merged = tvdb.translated_episodes(1, ['de', 'en'])
+        assert [(e.id, e.episodeName, e.overview) for e in merged] == [
+            (1, 'Es weihnachtet schwer', 'Christmas'),
+            (2, 'Bart the Genius', 'Bart cheats'),
+        ]
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+import json
+
+import mock
+import pytest
+
+from tests.base import TestBase, tvdb
+from tvdbrest.client import NotFound
+from tvdbrest.objects import Episode, Image
+from tvdbrest.streaming import JSONArrayStream
+
+
+def _chunks(b, size):
+    return [b[i:i+size] for i in range(0, len(b), size)]
+
+
+DOCUMENT = {
+    'links': {'first': 1, 'last': 2, 'next': 2, 'prev': None},
+    'data': [
+        {'id': 1, 'episodeName': u'Pilot – "Ünïcode" {[,]}', 'rating': 12345.5, 'flags': [True, None]},
+        {'id': 2, 'episodeName': 'Second', 'number': 123456789},
+        123,
+        'string',
+    ],
+    'errors': {'invalidLanguage': 'x'},
+}
+
+
+class TestJSONArrayStream(object):
+
+    @pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64, 100000])
+    def test_chunk_sizes(self, chunk_size):
+        body = json.dumps(DOCUMENT, ensure_ascii=False, indent=1).encode('utf-8')
+        stream = JSONArrayStream(_chunks(body, chunk_size))
+
+        assert list(stream) == DOCUMENT['data']
+        assert stream.members == {'links': DOCUMENT['links'], 'errors': DOCUMENT['errors']}
+
+    def test_items_yielded_before_end(self):
+        body = json.dumps({'data': [{'id': i} for i in range(100)]}).encode('utf-8')
+        chunks = iter(_chunks(body, 10))
+        stream = iter(JSONArrayStream(chunks))
+
+        assert next(stream) == {'id': 0}
+        assert len(list(chunks)) > 100  # most of the body has not been read yet
+
+    @pytest.mark.parametrize('chunks, data, members', [
+        ([b'{"data":[1.', b'5]}'], [1.5], {}),
+        ([b'{"data":[2e', b'3]}'], [2e3], {}),
+        ([b'{"data":[2E', b'-', b'3,1', b'0]}'], [2e-3, 10], {}),
+        ([b'{"data":[-1', b'2.25e+', b'1]}'], [-122.5], {}),
+        ([b'{"n":1.', b'5,"data":[]}'], [], {'n': 1.5}),
+        ([b'{"n":1', b'0', b'}'], [], {'n': 10}),
+    ])
+    def test_numbers_split_across_chunks(self, chunks, data, members):
+        stream = JSONArrayStream(chunks)
+        assert list(stream) == data
+        assert stream.members == members
+
+    def test_empty(self):
+        assert list(JSONArrayStream([b'{}'])) == []
+        assert list(JSONArrayStream([b'{"data": []}'])) == []
+
+    def test_data_not_an_array(self):
+        stream = JSONArrayStream([b'{"data": null}'])
+        assert list(stream) == []
+        assert stream.members == {'data': None}
+
+    def test_truncated(self):
+        with pytest.raises(ValueError):
+            list(JSONArrayStream([b'{"data": [{"id": 1}, {"id"']))
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            list(JSONArrayStream([b'[1, 2]']))
+
+
+class TestStreamingClient(TestBase):
+
+    def stream_response_mock(self, payload):
+        m = mock.MagicMock()
+        m.status_code = 200
+        body = json.dumps(payload).encode('utf-8')
+        m.iter_content = mock.Mock(side_effect=lambda chunk_size: iter(_chunks(body, chunk_size)))
+        return m
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_stream_episodes_by_series(self, request_mock, tvdb):
+        responses = [
+            self.stream_response_mock({'links': {'first': 1, 'last': 2, 'next': 2}, 'data': [{'id': 1}, {'id': 2}]}),
+            self.stream_response_mock({'links': {'first': 1, 'last': 2, 'next': None}, 'data': [{'id': 3}]}),
+        ]
+        request_mock.side_effect = responses
+
+        episodes = list(tvdb.stream_episodes_by_series(123, chunk_size=5))
+
+        assert [e.id for e in episodes] == [1, 2, 3]
+        assert all(isinstance(e, Episode) for e in episodes)
+        assert request_mock.call_args_list[0][0][1] == 'https://api.thetvdb.com/series/123/episodes'
+        assert request_mock.call_args_list[0][1]['stream']
+        assert request_mock.call_args_list[1][0][1] == 'https://api.thetvdb.com/series/123/episodes?page=2'
+        assert all(r.close.called for r in responses)
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_stream_single_page(self, request_mock, tvdb):
+        request_mock.return_value = self.stream_response_mock({'links': {'next': 3}, 'data': [{'id': 1}]})
+
+        assert [e.id for e in tvdb.stream_episodes_by_series(123, page=2)] == [1]
+        assert request_mock.call_count == 1
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_stream_images(self, request_mock, tvdb):
+        response = self.stream_response_mock({'data': [{'id': 1, 'fileName': 'a.jpg'}]})
+        request_mock.return_value = response
+
+        images = list(tvdb.stream_images(123, keyType='fanart'))
+        assert isinstance(images[0], Image)
+        assert images[0].url == 'http://thetvdb.com/banners/a.jpg'
+        assert request_mock.call_args[0][1] == 'https://api.thetvdb.com/series/123/images/query?keyType=fanart'
+        assert response.close.called
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_stream_not_found(self, request_mock, tvdb):
+        request_mock.return_value = self.api_response_404_mock()
+
+        with pytest.raises(NotFound):
+            list(tvdb.stream_images(123))
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+import mock
+
+from tvdbrest.client import TVDB
+from tvdbrest.transport import SessionTransport, Transport
+
+
+class TestSessionTransport(object):
+
+    def test_session_created_lazily(self):
+        transport = SessionTransport()
+        assert transport._session is None
+        session = transport.session
+        assert session is not None
+        assert transport.session is session
+
+    def test_single_session_for_concurrent_requests(self):
+        transport = SessionTransport()
+        create_session = transport._create_session
+
+        def _slow_create_session():
+            time.sleep(0.05)
+            return create_session()
+
+        sessions = []
+        with mock.patch.object(transport, '_create_session', side_effect=_slow_create_session) as create_mock:
+            threads = [threading.Thread(target=lambda: sessions.append(transport.session)) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        assert create_mock.call_count == 1
+        assert all(s is sessions[0] for s in sessions)
+
+    def test_pool_configuration(self):
+        transport = SessionTransport(pool_connections=3, pool_maxsize=7, pool_block=True)
+        adapter = transport.session.get_adapter('https://api.thetvdb.com/')
+        assert adapter._pool_connections == 3
+        assert adapter._pool_maxsize == 7
+        assert adapter._pool_block
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_default_timeout(self, request_mock):
+        transport = SessionTransport(timeout=5)
+        transport.request('get', 'https://api.thetvdb.com/languages')
+        request_mock.assert_called_with('get', 'https://api.thetvdb.com/languages', timeout=5)
+
+        transport.request('get', 'https://api.thetvdb.com/languages', timeout=1)
+        request_mock.assert_called_with('get', 'https://api.thetvdb.com/languages', timeout=1)
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_no_timeout(self, request_mock):
+        SessionTransport().request('get', 'https://api.thetvdb.com/languages')
+        request_mock.assert_called_with('get', 'https://api.thetvdb.com/languages')
+
+    def test_close(self):
+        transport = SessionTransport()
+        session = transport.session
+        session.close = mock.MagicMock()
+        transport.close()
+        assert session.close.called
+        assert transport._session is None
+
+
+class TestClientTransport(object):
+
+    def test_default_transport(self):
+        tvdb = TVDB("myusername", "myuserkey", "myapikey")
+        assert isinstance(tvdb.transport, SessionTransport)
+
+    def test_custom_transport(self):
+        response = mock.MagicMock()
+        response.status_code = 200
+        response.content = b'{"token": "jwttoken"}'
+
+        transport = mock.MagicMock(spec=Transport)
+        transport.request.return_value = response
+
+        tvdb = TVDB("myusername", "myuserkey", "myapikey", transport=transport)
+        tvdb.login()
+
+        assert tvdb.jwttoken == 'jwttoken'
+        assert transport.request.call_args[0] == ('post', 'https://api.thetvdb.com/login')
+
+    def test_context_manager_closes_transport(self):
+        transport = mock.MagicMock(spec=Transport)
+        with TVDB("myusername", "myuserkey", "myapikey", transport=transport) as tvdb:
+            assert tvdb.transport is transport
+        assert transport.close.called
@@ -4,20 +4,24 @@ import datetime
 import mock
 
 from tests.base import TestBase, tvdb
-from tvdbrest.client import  Update
+from tvdbrest.cache import MemoryCache
+from tvdbrest.client import  Update, NotFound, UPDATES_WINDOW
+from tvdbrest.objects import UpdateList, UpdateStream
 
 
 class TestUpdateAPI(TestBase):
     
-    def test_updated(self, tvdb):
+    @mock.patch('tvdbrest.client.time.time', return_value=3600)
+    def test_updated(self, time_mock, tvdb):
         tvdb._api_request = mock.MagicMock()
     
         tvdb.updates(123)
     
         tvdb._api_request.assert_called_with('get', '/updated/query?fromTime=123')
 
-    @mock.patch('tvdbrest.client.requests.request')
-    def test_updated_result(self, request_method_mock, tvdb):
+    @mock.patch('tvdbrest.client.time.time', return_value=3600)
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_updated_result(self, request_method_mock, time_mock, tvdb):
         request_method_mock.return_value = self.api_response_mock({
             "data": [{
                 "id": 1,
@@ -37,8 +41,9 @@ class TestUpdateAPI(TestBase):
         update.series
         get_series_mock.assert_called_with(1)
 
+    @mock.patch('tvdbrest.client.time.time', return_value=1488124800 + 3600)
     @mock.patch('tvdbrest.client.urlencode')
-    def test_updated_with_datetimes(self, urlencode_mock, tvdb):
+    def test_updated_with_datetimes(self, urlencode_mock, time_mock, tvdb):
         tvdb._api_request = mock.MagicMock()
 
         dt = datetime.datetime(2017, 2, 26, 16, 00, 00, tzinfo=datetime.timezone.utc)
@@ -60,3 +65,112 @@ class TestUpdateAPI(TestBase):
             'fromTime': 1488124800,
             'toTime': 1488128400
         })
+
+
+class TestResolveUpdates(TestBase):
+
+    def _series_response(self, url):
+        series_id = int(url.rsplit('/', 1)[-1])
+        if series_id == 404:
+            return self.api_response_404_mock()
+        return self.api_response_mock({'data': {'id': series_id, 'seriesName': 'Series %s' % series_id,
+                                                'lastUpdated': 200}})
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_resolve(self, request_method_mock, tvdb):
+        request_method_mock.side_effect = lambda method, url, **kwargs: self._series_response(url)
+        updates = UpdateList([Update({'id': series_id, 'lastUpdated': last_updated}, tvdb)
+                              for series_id, last_updated in ((1, 100), (2, 100), (1, 150), (404, 100))], tvdb)
+
+        results = dict((r.series_id, r) for r in updates.resolve(concurrency=2))
+
+        assert sorted(results) == [1, 2, 404]
+        assert results[1].series.seriesName == 'Series 1'
+        assert results[2].series.id == 2
+        assert isinstance(results[404].error, NotFound) and results[404].series is None
+        assert request_method_mock.call_count == 3
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_resolve_skips_current_cached_series(self, request_method_mock, tvdb):
+        request_method_mock.side_effect = lambda method, url, **kwargs: self._series_response(url)
+        tvdb.cache = MemoryCache(ttl=300)
+        tvdb.series(1)
+        tvdb.series(2)
+        assert request_method_mock.call_count == 2
+
+        updates = [Update({'id': 1, 'lastUpdated': 200}, tvdb), Update({'id': 2, 'lastUpdated': 250}, tvdb),
+                   Update({'id': 3, 'lastUpdated': 100}, tvdb)]
+        results = dict((r.series_id, r.series) for r in tvdb.resolve_updates(updates))
+
+        assert sorted(results) == [1, 2, 3]
+        # series 1 is current in the cache, the cached series 2 is outdated and refetched
+        assert [c[0][1].rsplit('/', 1)[-1] for c in request_method_mock.call_args_list[2:]] == ['2', '3']
+        assert tvdb.cache.hits == 1
+
+    @mock.patch('tvdbrest.client.time.time', return_value=3600)
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_updates_returns_update_list(self, request_method_mock, time_mock, tvdb):
+        request_method_mock.return_value = self.api_response_mock({"data": [{"id": 1, 'lastUpdated': 123}]})
+
+        updates = tvdb.updates(from_time=10)
+        assert isinstance(updates, UpdateList)
+
+        tvdb.resolve_updates = mock.MagicMock()
+        updates.resolve(concurrency=4)
+        tvdb.resolve_updates.assert_called_with(updates, concurrency=4, language=None)
+
+
+class TestUpdateWindows(TestBase):
+
+    def _window_response(self, url):
+        from_time = int(url.split('fromTime=')[1].split('&')[0])
+        # series 1 is updated in every window, series 2 only in the first one
+        data = [{'id': 1, 'lastUpdated': from_time + 10}, {'id': 1, 'lastUpdated': from_time + 5}]
+        if from_time == 0:
+            data.append({'id': 2, 'lastUpdated': 20})
+        return self.api_response_mock({'data': data})
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_long_range_split(self, request_method_mock, tvdb):
+        request_method_mock.side_effect = lambda method, url, **kwargs: self._window_response(url)
+
+        updates = tvdb.updates(0, UPDATES_WINDOW * 2 + 100, concurrency=2)
+        assert isinstance(updates, UpdateStream)
+        assert request_method_mock.call_count == 0
+
+        updates = list(updates)
+        assert [(u.id, u.as_dict()['lastUpdated']) for u in updates] == [(1, UPDATES_WINDOW + 110), (2, 20)]
+
+        urls = sorted(c[0][1].split('?')[1] for c in request_method_mock.call_args_list)
+        assert urls == sorted([
+            'fromTime=0&toTime=100',
+            'fromTime=100&toTime=%s' % (UPDATES_WINDOW + 100),
+            'fromTime=%s&toTime=%s' % (UPDATES_WINDOW + 100, UPDATES_WINDOW * 2 + 100),
+        ])
+
+    @mock.patch('tvdbrest.client.time.time', return_value=UPDATES_WINDOW + 100)
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_open_range_split_up_to_now(self, request_method_mock, time_mock, tvdb):
+        request_method_mock.side_effect = lambda method, url, **kwargs: self._window_response(url)
+
+        updates = tvdb.updates(0)
+        assert isinstance(updates, UpdateStream)
+        assert [u.id for u in updates] == [1, 2]
+
+        urls = sorted(c[0][1].split('?')[1] for c in request_method_mock.call_args_list)
+        assert urls == ['fromTime=0&toTime=100', 'fromTime=100&toTime=%s' % (UPDATES_WINDOW + 100)]
+
+    @mock.patch('tvdbrest.transport.requests.Session.request')
+    def test_short_range_not_split(self, request_method_mock, tvdb):
+        request_method_mock.side_effect = lambda method, url, **kwargs: self._window_response(url)
+
+        updates = tvdb.updates(0, UPDATES_WINDOW)
+        assert isinstance(updates, UpdateList)
+        assert len(updates) == 3
+        assert request_method_mock.call_count == 1
+
+    def test_stream_resolve(self, tvdb):
+        tvdb.resolve_updates = mock.MagicMock()
+        stream = UpdateStream(iter([]), tvdb)
+        stream.resolve()
+        tvdb.resolve_updates.assert_called_with(stream, concurrency=8, language=None)
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+import os
+import threading
+import time
+
+import mock
+import pytest
+
+from tvdbrest.util import atomic_write, bounded_map, endpoint_template, SingleFlight
+
+
+class TestEndpointTemplate(object):
+
+    def test_endpoint_template(self):
+        assert endpoint_template('https://api.thetvdb.com/series/71663/episodes?page=2') == '/series/{id}/episodes'
+        assert endpoint_template('/languages') == '/languages'
+        assert endpoint_template('/updated/query?fromTime=1') == '/updated/query'
+
+
+class TestAtomicWrite(object):
+
+    def test_write(self, tmpdir):
+        path = str(tmpdir.join('file'))
+        atomic_write(path, b'old')
+        atomic_write(path, b'new', sync=True)
+        with open(path, 'rb') as f:
+            assert f.read() == b'new'
+        assert os.listdir(str(tmpdir)) == ['file']
+
+    def test_failed_write_keeps_old_content(self, tmpdir):
+        path = str(tmpdir.join('file'))
+        atomic_write(path, b'old')
+        with mock.patch('tvdbrest.util.os.replace', side_effect=OSError):
+            with pytest.raises(OSError):
+                atomic_write(path, b'new')
+        with open(path, 'rb') as f:
+            assert f.read() == b'old'
+        assert os.listdir(str(tmpdir)) == ['file']
+
+
+class TestBoundedMap(object):
+
+    def test_ordered(self):
+        def _func(x):
+            time.sleep(0.001 * (10 - x))
+            return x * 2
+
+        assert list(bounded_map(_func, range(10), 4)) == [x * 2 for x in range(10)]
+
+    def test_unordered(self):
+        assert sorted(bounded_map(lambda x: x, range(50), 4, ordered=False)) == list(range(50))
+
+    def test_window_bounds_consumption(self):
+        consumed = []
+
+        def _items():
+            for i in range(1000):
+                consumed.append(i)
+                yield i
+
+        results = bounded_map(lambda x: x, _items(), 2, window=3)
+        assert next(results) == 0
+        assert len(consumed) <= 4
+        results.close()
+
+    def test_concurrency(self):
+        active = [0]
+        peak = [0]
+        lock = threading.Lock()
+
+        def _func(x):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.005)
+            with lock:
+                active[0] -= 1
+            return x
+
+        list(bounded_map(_func, range(20), 3))
+        assert 1 < peak[0] <= 3
+
+
+class TestSingleFlight(object):
+
+    def _run_concurrently(self, func, n=10):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(func())) for _ in range(n)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    def test_concurrent_calls_coalesced(self):
+        sf = SingleFlight()
+        calls = []
+
+        def _func():
+            calls.append(1)
+            time.sleep(0.05)
+            return {'data': 42}
+
+        results = self._run_concurrently(lambda: sf.do('key', _func))
+
+        assert len(calls) == 1
+        assert sf.coalesced == 9
+        assert all(r is results[0] for r in results)
+
+    def test_sequential_calls_not_coalesced(self):
+        sf = SingleFlight()
+        assert sf.do('key', lambda: 1) == 1
+        assert sf.do('key', lambda: 2) == 2
+        assert sf.coalesced == 0
+
+    def test_exception_shared(self):
+        sf = SingleFlight()
+        errors = []
+
+        def _func():
+            time.sleep(0.05)
+            raise ValueError("failed")
+
+        def _call():
+            try:
+                sf.do('key', _func)
+            except ValueError as e:
+                errors.append(e)
+
+        self._run_concurrently(_call, n=5)
+        assert len(errors) == 5
+        assert sf.do('key', lambda: 'ok') == 'ok'
@@ -0,0 +1,393 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import logging
+from functools import wraps
+from urllib.parse import urljoin, urlencode
+
+from tvdbrest import VERSION
+from tvdbrest.client import Unauthorized, NotFound, APIError, _dt_to_epoch
+from tvdbrest.codec import default_codec
+from tvdbrest.objects import *
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+
+def login_required(f):
+    @wraps(f)
+    async def wrapper(obj, *args, **kwargs):
+        if not obj.logged_in:
+            logger.debug("not logged in")
+            await obj._login_once(None)
+
+        token = obj.jwttoken
+        try:
+            return await f(obj, *args, **kwargs)
+        except Unauthorized:
+            logger.info("Unauthorized API error - login again")
+            await obj._login_once(token)
+            return await f(obj, *args, **kwargs)
+
+    return wrapper
+
+
+def single_response(response_class):
+    def _inner(func):
+        @wraps(func)
+        async def wrapper(obj, *args, **kwargs):
+            result = await func(obj, *args, **kwargs)
+            return response_class(result["data"], obj)
+
+        return wrapper
+
+    return _inner
+
+
+def multi_response(response_class):
+    def _inner(func):
+        @wraps(func)
+        async def wrapper(obj, *args, **kwargs):
+            result = await func(obj, *args, **kwargs)
+            return [response_class(d, obj) for d in result["data"]]
+
+        return wrapper
+
+    return _inner
+
+
+def paged_response(response_class, page_size=100):
+    def _inner(func):
+        @wraps(func)
+        async def wrapper(obj, *args, **kwargs):
+            result = await func(obj, *args, **kwargs)
+            return AsyncPaginatedAPIObjectList(result['links'],
+                                               [response_class(d, obj) for d in result['data']],
+                                               multi_response(response_class)(func), tuple([obj] + list(args)),
+                                               kwargs, page_size=page_size)
+
+        return wrapper
+
+    return _inner
+
+
+class _AsyncPageIterator(object):
+    """
+    Iterates the items of an :class:`AsyncPaginatedAPIObjectList`, fetching the pages one after another.
+    """
+
+    def __init__(self, object_list):
+        self._list = object_list
+        self._page_idx = object_list._first_page - 1
+        self._items = iter(())
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            try:
+                return next(self._items)
+            except StopIteration:
+                pass
+            if self._page_idx >= self._list._last_page:
+                raise StopAsyncIteration
+            self._items = iter(await self._list._page(self._page_idx))
+            self._page_idx += 1
+
+
+class AsyncPaginatedAPIObjectList(object):
+    """
+    Asynchronous counterpart of :class:`tvdbrest.objects.PaginatedAPIObjectList`. Iterate with ``async for`` to
+    fetch the pages one after another or use :meth:`fetch_all` to fetch all missing pages concurrently.
+    """
+
+    def __init__(self, links, initial_items, fetch_func, fetch_args=None, fetch_kwargs=None, page_size=100):
+        self._first_page = links['first']
+        self._last_page = links['last']
+
+        self._pages = [initial_items]
+        if self._first_page != self._last_page:
+            self._pages.extend([None for _ in range(self._first_page+1, self._last_page+1)])
+
+        self._page_size = page_size
+        self._fetch_func = fetch_func
+        self._fetch_args = fetch_args
+        self._fetch_kwargs = fetch_kwargs
+
+    async def _fetch_page(self, page_number):
+        kwargs = dict(self._fetch_kwargs or {})
+        kwargs['page'] = page_number
+        return await self._fetch_func(*self._fetch_args or (), **kwargs)
+
+    async def _page(self, page_idx):
+        if self._pages[page_idx] is None:
+            self._pages[page_idx] = await self._fetch_page(page_idx+1)
+        return self._pages[page_idx]
+
+    def __aiter__(self):
+        return _AsyncPageIterator(self)
+
+    async def length(self):
+        return (self._last_page-1) * self._page_size + len(await self._page(self._last_page-1))
+
+    async def get(self, index):
+        if index < 0:
+            index += await self.length()
+        if index < 0:
+            raise IndexError("list index out of range")
+
+        page_idx = index // self._page_size
+        if page_idx >= self._last_page:
+            raise IndexError("list index out of range")
+
+        page = await self._page(page_idx)
+        page_item_idx = index - (page_idx * self._page_size)
+        if page_item_idx >= len(page):
+            raise IndexError("list index out of range")
+        return page[page_item_idx]
+
+    async def fetch_all(self):
+        """
+        Fetches all missing pages concurrently and returns all items as a list.
+        """
+        missing = [idx for idx, page in enumerate(self._pages) if page is None]
+        await asyncio.gather(*[self._page(idx) for idx in missing])
+        return [item for page in self._pages for item in page]
+
+
+class AsyncResponse(object):
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content.decode('utf-8'))
+
+
+class AsyncTransport(object):
+    """
+    Base class for the HTTP layer of :class:`AsyncTVDB`. ``request`` is a coroutine returning a response with
+    ``status_code``, ``headers`` and the body as ``content`` (bytes).
+    """
+
+    async def request(self, method, url, **kwargs):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class AiohttpTransport(AsyncTransport):
+    """
+    Transport based on a pooled :class:`aiohttp.ClientSession`.
+
+    :param limit: maximum number of simultaneous connections
+    :param limit_per_host: maximum number of simultaneous connections to the same host
+    :param timeout: total timeout of a request in seconds
+    """
+
+    def __init__(self, limit=100, limit_per_host=0, timeout=None):
+        if aiohttp is None:
+            raise RuntimeError("aiohttp is required for AiohttpTransport")
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self._session = None
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host),
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def request(self, method, url, **kwargs):
+        async with self.session.request(method, url, **kwargs) as response:
+            content = await response.read()
+            return AsyncResponse(response.status, response.headers, content)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class AsyncTVDB(object):
+    """
+    asyncio client for the TVDB REST API. Provides the methods of :class:`tvdbrest.client.TVDB` as coroutines and
+    returns the same object types.
+    """
+    api_url = 'https://api.thetvdb.com/'
+
+    def __init__(self, username, userkey, apikey, language=None, transport=None, codec=None):
+        self.username = username
+        self.userkey = userkey
+        self.apikey = apikey
+        self.accept_language = language or "en"
+
+        assert self.username and self.userkey and self.apikey
+        self.jwttoken = None
+
+        self.useragent = "tvdb-rest %s" % VERSION
+        self._series_search_params = None
+        self._login_lock = None
+        self.transport = transport or AiohttpTransport()
+        self.codec = codec or default_codec()
+
+    async def close(self):
+        await self.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def login(self):
+        self.jwttoken = None
+        response = await self._api_request('post', '/login', json={
+            'username': self.username,
+            'userkey': self.userkey,
+            'apikey': self.apikey,
+        })
+
+        self.jwttoken = response['token']
+
+    async def _login_once(self, stale_token):
+        # only one coroutine logs in; the others wait for the lock and reuse the new token
+        if self._login_lock is None:
+            self._login_lock = asyncio.Lock()
+
+        async with self._login_lock:
+            if self.jwttoken is None or self.jwttoken == stale_token:
+                await self.login()
+
+    def logout(self):
+        self.jwttoken = None
+
+    @property
+    def logged_in(self):
+        return self.jwttoken is not None
+
+    @login_required
+    async def series_search_params(self):
+        if self._series_search_params is None:
+            self._series_search_params = (await self._api_request('get', '/search/series/params'))['data']['params']
+        return self._series_search_params
+
+    @multi_response(Language)
+    @login_required
+    async def languages(self):
+        return await self._api_request('get', '/languages')
+
+    @login_required
+    async def language(self, language_id):
+        return Language(await self._api_request('get', '/languages/%s' % language_id), self)
+
+    @single_response(Series)
+    @login_required
+    async def series(self, series_id, keys=None):
+        u = '/series/%s' % series_id
+        if keys:
+            u += "/filter?%s" % urlencode({
+                'keys': ','.join(keys)
+            })
+        return await self._api_request('get', u)
+
+    @login_required
+    async def series_key_params(self, series_id):
+        return (await self._api_request('get', '/series/%s/filter/params' % series_id))['data']['params']
+
+    @multi_response(Series)
+    @login_required
+    async def search(self, **kwargs):
+        if not kwargs:
+            return {
+                "data": []
+            }
+        return await self._api_request('get', "/search/series?%s" % urlencode(kwargs))
+
+    @multi_response(Actor)
+    @login_required
+    async def actors_by_series(self, series_id):
+        return await self._api_request('get', '/series/%s/actors' % series_id)
+
+    @paged_response(Episode)
+    @login_required
+    async def episodes_by_series(self, series_id, *args, **kwargs):
+        u = '/series/%s/episodes' % series_id
+        if kwargs:
+            if not (len(kwargs) == 1 and 'page' in kwargs):
+                u += '/query'
+            u += "?%s" % urlencode(kwargs)
+
+        return await self._api_request('get', u)
+
+    @login_required
+    async def episode_query_params(self, series_id):
+        return (await self._api_request('get', '/series/%s/episodes/query/params' % series_id))['data']
+
+    @single_response(Episode)
+    @login_required
+    async def episode_details(self, episode_id):
+        return await self._api_request('get', '/episodes/%s' % episode_id)
+
+    @single_response(ImageCount)
+    @login_required
+    async def image_count(self, series_id):
+        return await self._api_request('get', '/series/%s/images' % series_id)
+
+    @multi_response(Image)
+    @login_required
+    async def images(self, series_id, **kwargs):
+        u = '/series/%s/images/query' % series_id
+        if kwargs:
+            u += "?%s" % urlencode(kwargs)
+        return await self._api_request('get', u)
+
+    @multi_response(Update)
+    @login_required
+    async def updates(self, from_time, to_time=None):
+        kwargs = {
+            'fromTime': _dt_to_epoch(from_time)
+        }
+        if to_time:
+            kwargs['toTime'] = _dt_to_epoch(to_time)
+
+        return await self._api_request('get', '/updated/query?%s' % urlencode(kwargs))
+
+    async def _api_request(self, method, relative_url, **kwargs):
+        url = urljoin(self.api_url, relative_url)
+
+        headers = kwargs.pop('headers', {})
+        headers['User-Agent'] = self.useragent
+        if self.jwttoken:
+            headers['Authorization'] = 'Bearer %s' % self.jwttoken
+        if self.accept_language:
+            headers['Accept-Language'] = self.accept_language
+
+        response = await self.transport.request(method, url, headers=headers, **kwargs)
+
+        if response.status_code == 401:
+            raise Unauthorized(self._error_message(response))
+        elif response.status_code == 404:
+            raise NotFound(self._error_message(response))
+        elif response.status_code >= 400:
+            raise APIError()
+
+        logger.info("Response: %s", response.status_code)
+        return self.codec.loads(response.content)
+
+    def _error_message(self, response):
+        try:
+            return self.codec.loads(response.content)["Error"]
+        except (TypeError, ValueError, KeyError):
+            return None
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from tvdbrest.codec import default_codec
+from tvdbrest.util import atomic_write, endpoint_template
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry(object):
+    __slots__ = ('data', 'etag', 'last_modified', 'expires')
+
+    def __init__(self, data, etag=None, last_modified=None, expires=0):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = expires
+
+    @property
+    def expired(self):
+        return self.expires <= time.time()
+
+    @property
+    def revalidatable(self):
+        return bool(self.etag or self.last_modified)
+
+
+class Cache(object):
+    """
+    Base class for response caches used by :class:`tvdbrest.client.TVDB`.
+
+    :param ttl: default time-to-live of a response in seconds
+    :param ttls: dict mapping endpoint templates (e.g. ``/series/{id}/actors``) to a time-to-live in seconds. A TTL
+        of ``0`` disables caching for that endpoint.
+    """
+
+    def __init__(self, ttl=300, ttls=None):
+        self.ttl = ttl
+        self.ttls = ttls or {}
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self._lock = threading.RLock()
+
+    def ttl_for(self, url):
+        return self.ttls.get(endpoint_template(url), self.ttl)
+
+    def get(self, key):
+        with self._lock:
+            return self._get(key)
+
+    def set(self, key, entry):
+        with self._lock:
+            self._set(key, entry)
+
+    def delete(self, key):
+        with self._lock:
+            self._delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @property
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'evictions': self.evictions,
+        }
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, entry):
+        raise NotImplementedError
+
+    def _delete(self, key):
+        raise NotImplementedError
+
+    def _clear(self):
+        raise NotImplementedError
+
+
+class MemoryCache(Cache):
+    """
+    In-memory cache which evicts the least recently used entry once ``max_entries`` is reached.
+    """
+
+    def __init__(self, max_entries=1024, **kwargs):
+        super(MemoryCache, self).__init__(**kwargs)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get(self, key):
+        entry = self._entries.get(key, None)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _set(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _delete(self, key):
+        self._entries.pop(key, None)
+
+    def _clear(self):
+        self._entries.clear()
+
+
+class FileCache(Cache):
+    """
+    On-disk cache storing one file per response in ``directory``. If ``max_entries`` is set, the least recently
+    used files are removed once the limit is exceeded.
+
+    :param codec: the :mod:`tvdbrest.codec` used to serialize the responses (default: the codec of the
+        :class:`tvdbrest.client.TVDB` using the cache)
+    """
+
+    def __init__(self, directory, max_entries=None, codec=None, **kwargs):
+        super(FileCache, self).__init__(**kwargs)
+        self.directory = directory
+        self.max_entries = max_entries
+        self.codec = codec
+        os.makedirs(directory, exist_ok=True)
+
+    def _codec(self):
+        if self.codec is None:
+            self.codec = default_codec()
+        return self.codec
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(repr(key).encode('utf-8')).hexdigest())
+
+    def __len__(self):
+        return len(os.listdir(self.directory))
+
+    def _get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                d = self._codec().loads(f.read())
+        except (IOError, OSError, ValueError):
+            return None
+        os.utime(path, None)
+        return CacheEntry(d['data'], d.get('etag'), d.get('last_modified'), d.get('expires', 0))
+
+    def _set(self, key, entry):
+        path = self._path(key)
+        atomic_write(path, self._codec().dumps({
+            'data': entry.data,
+            'etag': entry.etag,
+            'last_modified': entry.last_modified,
+            'expires': entry.expires,
+        }))
+
+        if self.max_entries is not None:
+            self._prune()
+
+    def _prune(self):
+        files = [os.path.join(self.directory, name) for name in os.listdir(self.directory)]
+        if len(files) <= self.max_entries:
+            return
+
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - self.max_entries]:
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except OSError:  # pragma: no cover
+                logger.warning("Could not remove cache file %s", path)
+
+    def _delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _clear(self):
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Record and replay API traffic. :class:`RecordingTransport` wraps another transport and appends every
+request/response pair to a cassette, :class:`ReplayTransport` answers requests from a cassette without touching the
+network:
+
+    api = TVDB(..., transport=RecordingTransport('simpsons.cassette.gz'))
+    ...
+    api = TVDB(..., transport=ReplayTransport('simpsons.cassette.gz', latency='recorded'))
+
+A cassette is a JSON Lines file (gzip compressed if the name ends with ``.gz``) with one interaction per line.
+Interactions are matched by method, path, query string (parameter order doesn't matter) and ``Accept-Language``;
+scheme and host are ignored so cassettes recorded against one server can be replayed with a different ``api_url``.
+Request bodies and any other request headers are never stored, and the tokens returned by ``/login`` and
+``/refresh_token`` are replaced, so cassettes don't contain any credentials.
+"""
+import gzip
+import logging
+import threading
+import time
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+from requests.structures import CaseInsensitiveDict
+
+from tvdbrest.codec import default_codec
+from tvdbrest.transport import Transport, SessionTransport
+
+logger = logging.getLogger(__name__)
+
+REDACTED_TOKEN = 'redacted'
+
+_TOKEN_PATHS = ('/login', '/refresh_token')
+_RECORDED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Retry-After')
+
+
+class CassetteMiss(Exception):
+    pass
+
+
+def interaction_key(method, url, headers=None):
+    """
+    Returns the key matching requests are replayed by: the upper-cased method, the path with the sorted query and
+    the ``Accept-Language`` of the request (responses differ by language).
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    key = '%s %s%s' % (method.upper(), parts.path or '/', '?' + query if query else '')
+    language = CaseInsensitiveDict(headers or {}).get('Accept-Language')
+    return '%s [%s]' % (key, language) if language else key
+
+
+def _open(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode)
+    return open(path, mode)
+
+
+class Cassette(object):
+    """
+    Interactions of a cassette file indexed by :func:`interaction_key`. Requests recorded several times are replayed
+    in recording order; once all of them were used the last one is repeated.
+
+    :param path: the cassette file
+    :param codec: the :mod:`tvdbrest.codec` used to read and write the interactions
+    """
+
+    def __init__(self, path, codec=None):
+        self.path = path
+        self.codec = codec or default_codec()
+        self._index = {}
+        self._positions = {}
+        self._file = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(len(interactions) for interactions in self._index.values())
+
+    def load(self):
+        self._index = {}
+        self._positions = {}
+        with _open(self.path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    self._add(self.codec.loads(line))
+        logger.debug("Loaded %s interactions from %s", len(self), self.path)
+        return self
+
+    def _add(self, interaction):
+        self._index.setdefault(interaction['key'], []).append(interaction)
+
+    def append(self, interaction):
+        """
+        Adds ``interaction`` to the index and appends it to the file.
+        """
+        line = self.codec.dumps(interaction) + b'\n'
+        with self._lock:
+            self._add(interaction)
+            if self._file is None:
+                self._file = _open(self.path, 'ab')
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def find(self, key):
+        """
+        Returns the next interaction recorded for ``key``.
+        """
+        with self._lock:
+            interactions = self._index.get(key)
+            if not interactions:
+                raise CassetteMiss("No recorded interaction for %s in %s" % (key, self.path))
+            position = self._positions.get(key, 0)
+            self._positions[key] = min(position + 1, len(interactions) - 1)
+            return interactions[position]
+
+    def rewind(self):
+        with self._lock:
+            self._positions = {}
+
+
+class ReplayResponse(object):
+    """
+    A recorded response, compatible with the parts of :class:`requests.Response` used by the client.
+    """
+
+    def __init__(self, status_code, headers, content, url=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+
+    def iter_content(self, chunk_size=1):
+        chunk_size = chunk_size or len(self.content) or 1
+        for pos in range(0, len(self.content), chunk_size):
+            yield self.content[pos:pos + chunk_size]
+
+    def close(self):
+        pass
+
+    def __repr__(self):
+        return "<ReplayResponse [%s]>" % self.status_code
+
+
+class RecordingTransport(Transport):
+    """
+    Passes requests on to ``transport`` (a new :class:`SessionTransport` by default) and appends the interactions
+    to the cassette at ``path``.
+    """
+
+    def __init__(self, path, transport=None, codec=None):
+        self.transport = transport or SessionTransport()
+        self.cassette = Cassette(path, codec)
+
+    def request(self, method, url, **kwargs):
+        start = time.perf_counter()
+        response = self.transport.request(method, url, **kwargs)
+        content = response.content
+        elapsed = time.perf_counter() - start
+
+        key = interaction_key(method, url, kwargs.get('headers'))
+        recorded = content
+        if urlsplit(url).path in _TOKEN_PATHS and response.status_code == 200:
+            recorded = self.cassette.codec.dumps({'token': REDACTED_TOKEN})
+
+        self.cassette.append({
+            'key': key,
+            'status': response.status_code,
+            'headers': dict((name, response.headers[name]) for name in _RECORDED_HEADERS
+                            if name in response.headers),
+            'content': recorded.decode('utf-8'),
+            'elapsed': round(elapsed, 6),
+        })
+        return response
+
+    def close(self):
+        self.cassette.close()
+        self.transport.close()
+
+
+class ReplayTransport(Transport):
+    """
+    Answers requests from the cassette at ``path``. Requests that were not recorded raise :class:`CassetteMiss`.
+
+    :param latency: ``None`` to answer immediately, ``'recorded'`` to wait as long as the recorded request took or
+                    the delay in seconds
+    """
+
+    def __init__(self, path, latency=None, codec=None):
+        self.latency = latency
+        self.cassette = Cassette(path, codec).load()
+
+    def request(self, method, url, **kwargs):
+        interaction = self.cassette.find(interaction_key(method, url, kwargs.get('headers')))
+
+        delay = interaction.get('elapsed', 0) if self.latency == 'recorded' else self.latency
+        if delay:
+            time.sleep(delay)
+
+        return ReplayResponse(interaction['status'], CaseInsensitiveDict(interaction['headers']),
+                              interaction['content'].encode('utf-8'), url)
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+Change feed: polls :meth:`tvdbrest.client.TVDB.updates` and emits a :class:`ChangeEvent` per changed series to
+pluggable sinks. The position in the feed (the end of the last processed time range or the ``lastUpdated`` of the
+last delivered batch) is kept in a :class:`FileCheckpoint` which is written only after all sinks accepted a batch, so
+events are delivered at least once: after a crash the feed resumes from the checkpoint and may repeat the events of
+the batch which was in progress.
+
+    feed = ChangeFeed(api, [JSONLinesSink('changes.jsonl')], FileCheckpoint('changes.checkpoint'),
+                      resolve_series=True)
+    feed.run()
+"""
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+
+from tvdbrest.client import TVDB, NotFound, UPDATES_WINDOW
+from tvdbrest.codec import default_codec
+from tvdbrest.objects import latest_updates
+from tvdbrest.util import atomic_write, bounded_map
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeEvent(object):
+    """
+    A changed series. ``series`` and ``episodes`` hold the attributes of the series and its episodes if the feed
+    resolves them (``None`` otherwise or if the series doesn't exist anymore, see ``error``).
+    """
+    __slots__ = ('series_id', 'last_updated', 'series', 'episodes', 'error')
+
+    def __init__(self, series_id, last_updated, series=None, episodes=None, error=None):
+        self.series_id = series_id
+        self.last_updated = last_updated
+        self.series = series
+        self.episodes = episodes
+        self.error = error
+
+    def __repr__(self):
+        return "ChangeEvent(series_id=%s, last_updated=%s)" % (self.series_id, self.last_updated)
+
+    def as_dict(self):
+        d = {
+            'series_id': self.series_id,
+            'last_updated': self.last_updated,
+        }
+        if self.series is not None:
+            d['series'] = self.series
+        if self.episodes is not None:
+            d['episodes'] = self.episodes
+        if self.error is not None:
+            d['error'] = self.error
+        return d
+
+
+class FileCheckpoint(object):
+    """
+    Keeps the position of a :class:`ChangeFeed` (a timestamp) in ``path``. The file is replaced atomically (and
+    synced to disk), so it always holds either the old or the new position.
+    """
+
+    def __init__(self, path, codec=None):
+        self.path = path
+        self.codec = codec or default_codec()
+
+    def load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                return self.codec.loads(f.read())['last_updated']
+        except (IOError, OSError):
+            return None
+
+    def save(self, last_updated):
+        atomic_write(self.path, self.codec.dumps({'last_updated': last_updated, 'saved': int(time.time())}), sync=True)
+
+
+class Sink(object):
+    """
+    Receives the events of a :class:`ChangeFeed` in batches. :meth:`emit` has to return only once the events are
+    delivered; if it raises, the batch is delivered again on the next poll.
+    """
+
+    def emit(self, events):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JSONLinesSink(Sink):
+    """
+    Appends the events to ``path`` (``-`` for stdout) as one JSON object per line. Every batch is synced to disk.
+    """
+
+    def __init__(self, path, codec=None):
+        self.path = path
+        self.codec = codec or default_codec()
+        self._file = sys.stdout.buffer if path == '-' else open(path, 'ab')
+
+    def emit(self, events):
+        self._file.write(b''.join(self.codec.dumps(event.as_dict()) + b'\n' for event in events))
+        self._file.flush()
+        if self.path != '-':
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self.path != '-':
+            self._file.close()
+
+
+class CallbackSink(Sink):
+    """
+    Calls ``func`` with each event.
+    """
+
+    def __init__(self, func):
+        self.func = func
+
+    def emit(self, events):
+        for event in events:
+            self.func(event)
+
+
+class QueueSink(Sink):
+    """
+    Puts the events into ``queue`` (e.g. a bounded :class:`queue.Queue` consumed by another thread, which slows the
+    feed down to the pace of the consumer).
+    """
+
+    def __init__(self, queue, timeout=None):
+        self.queue = queue
+        self.timeout = timeout
+
+    def emit(self, events):
+        for event in events:
+            self.queue.put(event, timeout=self.timeout)
+
+
+class ChangeFeed(object):
+    """
+    Polls the updates since the checkpoint every ``interval`` seconds and delivers them in batches of at most
+    ``batch_size`` events (in ``lastUpdated`` order, one event per series and batch) to ``sinks``.
+
+    With ``resolve_series`` and ``resolve_episodes`` the events carry the series and its episodes, fetched with at
+    most ``concurrency`` concurrent requests. Only one batch is resolved at a time, so memory stays bounded.
+
+    :param start_time: where to start without a checkpoint (default: the time of the first poll)
+    """
+
+    def __init__(self, tvdb, sinks, checkpoint, interval=300, batch_size=100, resolve_series=False,
+                 resolve_episodes=False, concurrency=8, start_time=None):
+        self.tvdb = tvdb
+        self.sinks = sinks
+        self.checkpoint = checkpoint
+        self.interval = interval
+        self.batch_size = batch_size
+        self.resolve_series = resolve_series
+        self.resolve_episodes = resolve_episodes
+        self.concurrency = concurrency
+        self.start_time = start_time
+        self.delivered = 0
+        self._stop = threading.Event()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self, iterations=None):
+        """
+        Polls until :meth:`stop` is called (or ``iterations`` polls are done). Failed polls are logged and retried
+        from the checkpoint on the next poll.
+        """
+        self._stop.clear()
+        n = 0
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Polling updates failed")
+            n += 1
+            if iterations is not None and n >= iterations:
+                break
+            self._stop.wait(self.interval)
+
+    def poll(self, to_time=None):
+        """
+        Delivers the updates between the checkpoint and ``to_time`` (default: now). Returns the number of delivered
+        events.
+        """
+        to_time = int(to_time or time.time())
+        from_time = self.checkpoint.load()
+        if from_time is None:
+            from_time = int(self.start_time if self.start_time is not None else to_time)
+            # the first poll without a start time only records where the feed starts
+            self.checkpoint.save(from_time)
+
+        delivered = 0
+        window_start = from_time
+        while window_start < to_time:
+            window_end = min(window_start + UPDATES_WINDOW, to_time)
+            updates = sorted(latest_updates(self.tvdb.updates(window_start, window_end)).values(),
+                             key=lambda u: u.as_dict().get('lastUpdated') or 0)
+
+            for i in range(0, len(updates), self.batch_size):
+                batch = updates[i:i + self.batch_size]
+                self._deliver(self._events(batch))
+                delivered += len(batch)
+                # updates at this timestamp which are not in the batch yet are delivered (again) after a restart
+                self.checkpoint.save(batch[-1].as_dict().get('lastUpdated') or window_start)
+
+            self.checkpoint.save(window_end)
+            window_start = window_end
+
+        self.delivered += delivered
+        logger.info("Delivered %s changes up to %s", delivered, to_time)
+        return delivered
+
+    def _events(self, updates):
+        events = [ChangeEvent(u.id, u.as_dict().get('lastUpdated')) for u in updates]
+        if not (self.resolve_series or self.resolve_episodes):
+            return events
+        return list(bounded_map(self._resolve, events, self.concurrency))
+
+    def _resolve(self, event):
+        try:
+            if self.resolve_series:
+                event.series = self.tvdb.series(event.series_id).as_dict()
+            if self.resolve_episodes:
+                event.episodes = [e.as_dict() for e in self.tvdb.episodes_by_series(event.series_id)]
+        except NotFound as e:
+            event.series = event.episodes = None
+            event.error = str(e) or 'not found'
+        return event
+
+    def _deliver(self, events):
+        for sink in self.sinks:
+            sink.emit(events)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Writes the changes of TheTVDB to a JSON lines file")
+    parser.add_argument('--username', default=os.environ.get('TVDB_USERNAME'))
+    parser.add_argument('--userkey', default=os.environ.get('TVDB_USERKEY'))
+    parser.add_argument('--apikey', default=os.environ.get('TVDB_APIKEY'))
+    parser.add_argument('--language')
+    parser.add_argument('--checkpoint', required=True, help="File keeping the position in the feed")
+    parser.add_argument('--output', default='-', help="JSON lines file the changes are appended to (default: stdout)")
+    parser.add_argument('--since', type=int, help="Timestamp to start from without a checkpoint (default: now)")
+    parser.add_argument('--interval', type=int, default=300, help="Seconds between polls")
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--resolve-series', action='store_true', help="Include the series in the changes")
+    parser.add_argument('--resolve-episodes', action='store_true', help="Include the episodes in the changes")
+    parser.add_argument('--once', action='store_true', help="Poll once and exit")
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    if not (args.username and args.userkey and args.apikey):
+        parser.error("--username, --userkey and --apikey (or TVDB_USERNAME, TVDB_USERKEY and TVDB_APIKEY) are "
+                     "required")
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, stream=sys.stderr)
+
+    tvdb = TVDB(args.username, args.userkey, args.apikey, language=args.language)
+    feed = ChangeFeed(tvdb, [JSONLinesSink(args.output)], FileCheckpoint(args.checkpoint), interval=args.interval,
+                      batch_size=args.batch_size, resolve_series=args.resolve_series,
+                      resolve_episodes=args.resolve_episodes, concurrency=args.concurrency, start_time=args.since)
+    try:
+        if args.once:
+            feed.poll()
+        else:
+            feed.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        feed.close()
+        tvdb.close()
+
+
+if __name__ == '__main__':
+    main()
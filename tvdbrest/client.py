@@ -1,12 +1,23 @@
 # -*- coding: utf-8 -*-
+import base64
+import json
 import logging
+import threading
+from collections import namedtuple
 from functools import wraps
 from urllib.parse import urljoin, urlencode
 
-import requests
-
 from tvdbrest import VERSION
+from tvdbrest.cache import CacheEntry, MemoryCache
+from tvdbrest.codec import default_codec
+from tvdbrest.compact import COMPACT_CLASSES
+from tvdbrest.episodes import EpisodeIndex, QUERY_FIELDS
+from tvdbrest.lazy import UpgradeGroup
+from tvdbrest.metrics import HOOK_EVENTS, RequestEvent
 from tvdbrest.objects import *
+from tvdbrest.streaming import JSONArrayStream
+from tvdbrest.transport import SessionTransport
+from tvdbrest.util import bounded_map, SingleFlight
 import datetime
 import time
 
@@ -25,18 +36,23 @@ class APIError(Exception):
     pass
 
 
+# the updates endpoint accepts at most one week per request
+UPDATES_WINDOW = 7 * 24 * 60 * 60
+
+SeriesResult = namedtuple('SeriesResult', ('series_id', 'series', 'error'))
+
+
 def login_required(f):
     @wraps(f)
     def wrapper(obj, *args, **kwargs):
-        if not obj.logged_in:
-            logger.debug("not logged in")
-            obj.login()
+        obj._ensure_token()
 
+        token = obj.jwttoken
         try:
             return f(obj, *args, **kwargs)
         except Unauthorized:
             logger.info("Unauthorized API error - login again")
-            obj.login()
+            obj._relogin(token)
             return f(obj, *args, **kwargs)
     
     return wrapper
@@ -49,7 +65,7 @@ def single_response(response_class):
         @wraps(func)
         def wrapper(obj, *args, **kwargs):
             result = func(obj, *args, **kwargs)
-            return response_class(result["data"], obj)
+            return obj.object_class(response_class)(result["data"], obj)
         
         return wrapper
     
@@ -61,7 +77,8 @@ def multi_response(response_class):
         @wraps(func)
         def wrapper(obj, *args, **kwargs):
             result = func(obj, *args, **kwargs)
-            return [response_class(d, obj) for d in result["data"]]
+            cls = obj.object_class(response_class)
+            return [cls(d, obj) for d in result["data"]]
         
         return wrapper
     
@@ -73,19 +90,62 @@ def paged_response(response_class, page_size=100):
         @wraps(func)
         def wrapper(obj, *args, **kwargs):
             result = func(obj, *args, **kwargs)
+            cls = obj.object_class(response_class)
             return PaginatedAPIObjectList(result['links'],
-                                          [response_class(d, obj) for d in result['data']],
+                                          [cls(d, obj) for d in result['data']],
                                           multi_response(response_class)(func), tuple([obj] + list(args)), kwargs,
-                                          page_size=page_size)
+                                          page_size=page_size, prefetch_workers=obj.prefetch_workers,
+                                          read_ahead=obj.prefetch_read_ahead)
         
         return wrapper
     
     return _inner
 
 
+def _jwt_expiry(token):
+    """
+    Returns the expiry (``exp`` claim, seconds since the epoch) of a JWT or ``None`` if it can't be decoded.
+    """
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(payload.encode('ascii')).decode('utf-8'))['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _language_kwargs(language):
+    # per-call languages override the Accept-Language header of the instance
+    return {'headers': {'Accept-Language': language}} if language else {}
+
+
+def _episodes_url(series_id, **kwargs):
+    u = '/series/%s/episodes' % series_id
+    if kwargs:
+        if not (len(kwargs) == 1 and 'page' in kwargs):
+            u += '/query'
+        u += "?%s" % urlencode(kwargs)
+    return u
+
+
+def _images_url(series_id, **kwargs):
+    u = '/series/%s/images/query' % series_id
+    if kwargs:
+        u += "?%s" % urlencode(kwargs)
+    return u
+
+
+def _dt_to_epoch(o):
+    return int(time.mktime(o.timetuple())) - time.timezone if isinstance(o, datetime.datetime) else o
+
+
 class TVDB(object):
+    api_url = 'https://api.thetvdb.com/'
     
-    def __init__(self, username, userkey, apikey, language=None):
+    def __init__(self, username, userkey, apikey, language=None, transport=None, cache=None, prefetch_workers=0,
+                 prefetch_read_ahead=None, token_refresh_margin=600, coalesce=True,
+                 rate_limiter=None, retry_policy=None, compact=False, codec=None, metrics=None,
+                 episode_index_cache=None, translation_cache=None, lazy=False):
         self.username = username
         self.userkey = userkey
         self.apikey = apikey
@@ -93,9 +153,67 @@ class TVDB(object):
         
         assert self.username and self.userkey and self.apikey
         self.jwttoken = None
+        self.token_refresh_margin = token_refresh_margin
+        self._token_expiry = (None, None)
+        self._login_lock = threading.RLock()
         
         self.useragent = "tvdb-rest %s" % VERSION
         self._series_search_params = None
+        self._episode_query_params = {}
+        self.transport = transport or SessionTransport()
+        self.cache = cache
+        self.prefetch_workers = prefetch_workers
+        self.prefetch_read_ahead = prefetch_read_ahead
+        self._single_flight = SingleFlight() if coalesce else None
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.compact = compact
+        self.lazy = lazy
+        self.codec = codec or default_codec()
+        if getattr(cache, 'codec', False) is None:
+            # caches without a codec of their own serialize with the codec of the client
+            cache.codec = self.codec
+        self.episode_index_cache = episode_index_cache or MemoryCache(max_entries=64, ttl=3600)
+        self.translation_cache = translation_cache or MemoryCache(max_entries=256, ttl=3600)
+        self.hooks = dict((event, []) for event in HOOK_EVENTS)
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.install(self)
+
+    def close(self):
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def add_hook(self, event, func):
+        """
+        Registers ``func`` to be called with a :class:`tvdbrest.metrics.RequestEvent` on ``event``: before each
+        attempt of an API request (``before_request``), after a successful request (``after_request``), when a
+        request fails (``on_error``) and before a request is retried (``on_retry``).
+        """
+        if event not in self.hooks:
+            raise ValueError("Unknown hook event %r (expected one of %s)" % (event, ', '.join(HOOK_EVENTS)))
+        self.hooks[event].append(func)
+
+    def remove_hook(self, event, func):
+        self.hooks[event].remove(func)
+
+    def _fire(self, event, request_event):
+        for func in self.hooks[event]:
+            try:
+                func(request_event)
+            except Exception:
+                logger.exception("Hook %r for %s failed", func, event)
+
+    def object_class(self, cls):
+        """
+        Returns the class used to represent API objects of type ``cls`` (its compact variant with ``compact=True``).
+        """
+        return COMPACT_CLASSES.get(cls, cls) if self.compact else cls
 
     def login(self):
         self.jwttoken = None
@@ -107,9 +225,54 @@ class TVDB(object):
         
         self.jwttoken = response['token']
     
+    def refresh_token(self):
+        response = self._api_request('get', '/refresh_token', cacheable=False)
+        self.jwttoken = response['token']
+
     def logout(self):
         self.jwttoken = None
+
+    @property
+    def token_expires(self):
+        token = self.jwttoken
+        if self._token_expiry[0] != token:
+            self._token_expiry = (token, _jwt_expiry(token) if token else None)
+        return self._token_expiry[1]
+
+    @property
+    def token_expiring(self):
+        expires = self.token_expires
+        return expires is not None and expires - time.time() < self.token_refresh_margin
+
+    def _ensure_token(self):
+        if self.logged_in and not self.token_expiring:
+            return
+
+        # only one thread logs in or refreshes the token; the others wait and use the new token
+        with self._login_lock:
+            if not self.logged_in:
+                logger.debug("not logged in")
+                self.login()
+            elif self.token_expiring:
+                logger.debug("token expires soon - refreshing")
+                try:
+                    self.refresh_token()
+                except (Unauthorized, APIError):
+                    self.login()
+
+    def _relogin(self, stale_token):
+        with self._login_lock:
+            if self.jwttoken is None or self.jwttoken == stale_token:
+                self.login()
     
+    @property
+    def coalesced_requests(self):
+        return self._single_flight.coalesced if self._single_flight is not None else 0
+
+    @property
+    def cache_stats(self):
+        return self.cache.stats if self.cache is not None else None
+
     @property
     def logged_in(self):
         return self.jwttoken is not None
@@ -130,50 +293,206 @@ class TVDB(object):
     def language(self, language_id):
         return Language(self._api_request('get', '/languages/%s' % language_id), self)
     
-    @single_response(Series)
+    def series(self, series_id, keys=None, language=None):
+        """
+        Returns the series. With ``keys`` only these fields are fetched; with ``lazy=True`` the partial series is a
+        :class:`tvdbrest.lazy.LazySeries` fetching the full record when another field is accessed.
+        """
+        data = self._series_request(series_id, keys, language)['data']
+        if keys and self.lazy:
+            return UpgradeGroup(self, language=language).wrap(data, series_id)
+        return self.object_class(Series)(data, self)
+
     @login_required
-    def series(self, series_id, keys=None):
+    def _series_request(self, series_id, keys=None, language=None):
         u = '/series/%s' % series_id
         if keys:
             u += "/filter?%s" % urlencode({
                 'keys': ','.join(keys)
             })
-        return self._api_request('get', u)
+        return self._api_request('get', u, **_language_kwargs(language))
     
+    def series_many(self, series_ids, keys=None, concurrency=8, ordered=True, language=None):
+        """
+        Fetches many series concurrently with at most ``concurrency`` requests in flight. Yields a
+        :class:`SeriesResult` for each id, either in input order or (with ``ordered=False``) as they complete.
+        ``NotFound`` and ``APIError`` are reported in ``SeriesResult.error`` instead of aborting the batch.
+        """
+        self._ensure_token()
+
+        def _fetch(series_id):
+            try:
+                return SeriesResult(series_id, self.series(series_id, keys=keys, language=language), None)
+            except (NotFound, APIError) as e:
+                return SeriesResult(series_id, None, e)
+
+        return bounded_map(_fetch, series_ids, concurrency, ordered=ordered)
+
+    def series_translations(self, series_id, languages, concurrency=None):
+        """
+        Fetches the series in each of ``languages`` concurrently and returns a dict mapping the languages to the
+        :class:`Series` objects. Translations are kept in ``translation_cache``, so each is fetched only once.
+        """
+        return self._translations('series', series_id, languages,
+                                  lambda language: self.series(series_id, language=language), concurrency)
+
+    def translated_series(self, series_id, languages, concurrency=None):
+        """
+        Returns the series in the first of ``languages`` with untranslated (empty) fields taken from the following
+        languages, e.g. ``translated_series(71663, ['de', 'en'])`` for the German series with English fallbacks.
+        """
+        translations = self.series_translations(series_id, languages, concurrency)
+        return self.object_class(Series)(merge_translations([translations[language].as_dict()
+                                                             for language in languages]), self)
+
+    def episode_translations(self, series_id, languages, concurrency=None):
+        """
+        Like :meth:`series_translations` for all episodes of the series (lists of :class:`Episode` objects).
+        """
+        return self._translations('episodes', series_id, languages,
+                                  lambda language: list(self.episodes_by_series(series_id, language=language)),
+                                  concurrency)
+
+    def translated_episodes(self, series_id, languages, concurrency=None):
+        """
+        Like :meth:`translated_series` for all episodes of the series, in the order of the first language.
+        """
+        translations = self.episode_translations(series_id, languages, concurrency)
+        by_id = [dict((e.id, e.as_dict()) for e in translations[language]) for language in languages]
+        cls = self.object_class(Episode)
+        return [cls(merge_translations([episodes[e.id] for episodes in by_id if e.id in episodes]), self)
+                for e in translations[languages[0]]]
+
+    def _translations(self, kind, object_id, languages, fetch, concurrency=None):
+        result = {}
+        missing = []
+        for language in languages:
+            entry = self.translation_cache.get((kind, object_id, language))
+            if entry is not None and not entry.expired:
+                self.translation_cache.count('hits')
+                result[language] = entry.data
+            elif language not in missing:
+                missing.append(language)
+
+        if missing:
+            self._ensure_token()
+            for language, data in bounded_map(lambda l: (l, fetch(l)), missing, concurrency or len(missing)):
+                self.translation_cache.count('misses')
+                self.translation_cache.set((kind, object_id, language),
+                                           CacheEntry(data, expires=time.time() + self.translation_cache.ttl))
+                result[language] = data
+        return result
+
     @login_required
     def series_key_params(self, series_id):
         return self._api_request('get', '/series/%s/filter/params' % series_id)['data']['params']
     
-    @multi_response(Series)
+    def search(self, language=None, **kwargs):
+        """
+        Searches series. The results are partial records; with ``lazy=True`` they are
+        :class:`tvdbrest.lazy.LazySeries` objects which fetch their full records together on first access to a
+        missing field.
+        """
+        data = self._search_request(language, **kwargs)['data']
+        if self.lazy:
+            group = UpgradeGroup(self, language=language)
+            return [group.wrap(d) for d in data]
+        cls = self.object_class(Series)
+        return [cls(d, self) for d in data]
+
     @login_required
-    def search(self, **kwargs):
+    def _search_request(self, language=None, **kwargs):
         if not kwargs:
             return {
                 "data": []
             }
         u = "/search/series?%s" % urlencode(kwargs)
             
-        return self._api_request('get', u)
+        return self._api_request('get', u, **_language_kwargs(language))
     
     @multi_response(Actor)
     @login_required
     def actors_by_series(self, series_id):
         return self._api_request('get', '/series/%s/actors' % series_id)
     
+    def episodes_by_series(self, series_id, *args, **kwargs):
+        """
+        Returns the episodes of the series, optionally filtered by the query parameters the API supports for it
+        (see :meth:`episode_query_params`; other parameters raise a ``ValueError``). Filter queries on the fields
+        in :data:`tvdbrest.episodes.QUERY_FIELDS` are answered from the series' :meth:`episode_index` if it has
+        already been built and has not expired; otherwise they are sent to the API. Either way the episodes are
+        returned as a :class:`PaginatedAPIObjectList`.
+        """
+        language = kwargs.get('language', None)
+        filters = dict((k, v) for k, v in kwargs.items() if k not in ('language', 'page'))
+        if filters:
+            unsupported = set(filters) - set(self.episode_query_params(series_id))
+            if unsupported:
+                raise ValueError("Unsupported episode query parameter(s): %s" % ', '.join(sorted(unsupported)))
+
+            if 'page' not in kwargs and set(filters) <= set(QUERY_FIELDS):
+                episodes = self._query_episode_index(series_id, filters, language)
+                if episodes is not None:
+                    return episodes
+        return self._episodes_by_series(series_id, *args, **kwargs)
+
     @paged_response(Episode)
     @login_required
-    def episodes_by_series(self, series_id, *args, **kwargs):
-        u = '/series/%s/episodes' % series_id
-        if kwargs:
-            if not (len(kwargs) == 1 and 'page' in kwargs):
-                u += '/query'
-            u += "?%s" % urlencode(kwargs)
-        
-        return self._api_request('get', u)
+    def _episodes_by_series(self, series_id, *args, **kwargs):
+        language = kwargs.pop('language', None)
+        return self._api_request('get', _episodes_url(series_id, **kwargs), **_language_kwargs(language))
+
+    def _query_episode_index(self, series_id, filters, language=None):
+        entry = self.episode_index_cache.get((series_id, language or self.accept_language))
+        if entry is None or entry.expired:
+            return None
+
+        logger.debug("Answering episode query %s for series %s from the episode index", filters, series_id)
+        episodes = entry.data.query(**filters)
+        # a single page holding all results, like a query answered by the API with one page
+        return PaginatedAPIObjectList({'first': 1, 'last': 1}, episodes, None, page_size=max(len(episodes), 1))
+
+    def episode_index(self, series_id, refresh=False, language=None):
+        """
+        Returns an :class:`tvdbrest.episodes.EpisodeIndex` of all episodes of the series. Indexes are kept in
+        ``episode_index_cache`` (by default the last 64 for an hour) and rebuilt once expired or with ``refresh``.
+        """
+        key = (series_id, language or self.accept_language)
+        entry = None if refresh else self.episode_index_cache.get(key)
+        if entry is not None and not entry.expired:
+            self.episode_index_cache.count('hits')
+            return entry.data
+
+        self.episode_index_cache.count('misses')
+        episodes = self.episodes_by_series(series_id, language=language) if language else \
+            self.episodes_by_series(series_id)
+        index = EpisodeIndex(episodes, series_id)
+        self.episode_index_cache.set(key, CacheEntry(index, expires=time.time() + self.episode_index_cache.ttl))
+        return index
+
+    def stream_episodes_by_series(self, series_id, chunk_size=65536, **kwargs):
+        """
+        Like :meth:`episodes_by_series`, but decodes the response incrementally and yields the episodes while the
+        response is read. All pages are streamed one after another unless a ``page`` is given.
+        """
+        cls = self.object_class(Episode)
+        query = dict(kwargs)
+        while True:
+            members = {}
+            for d in self._stream_items(_episodes_url(series_id, **query), chunk_size, members):
+                yield cls(d, self)
+
+            links = members.get('links', None) or {}
+            if 'page' in kwargs or not links.get('next', None):
+                return
+            query['page'] = links['next']
 
     @login_required
     def episode_query_params(self, series_id):
-        return self._api_request('get', '/series/%s/episodes/query/params' % series_id)['data']
+        if series_id not in self._episode_query_params:
+            self._episode_query_params[series_id] = \
+                self._api_request('get', '/series/%s/episodes/query/params' % series_id)['data']
+        return self._episode_query_params[series_id]
 
     @single_response(Episode)
     @login_required
@@ -188,19 +507,72 @@ class TVDB(object):
     @multi_response(Image)
     @login_required
     def images(self, series_id, **kwargs):
-        u = '/series/%s/images/query' % series_id
-        if kwargs:
-            u += "?%s" % urlencode(kwargs)
-        return self._api_request('get', u)
+        return self._api_request('get', _images_url(series_id, **kwargs))
+
+    def stream_images(self, series_id, chunk_size=65536, **kwargs):
+        """
+        Like :meth:`images`, but decodes the response incrementally and yields the images while it is read.
+        """
+        cls = self.object_class(Image)
+        for d in self._stream_items(_images_url(series_id, **kwargs), chunk_size):
+            yield cls(d, self)
+
+    def _stream_items(self, relative_url, chunk_size, members=None):
+        response = self._stream_request(relative_url)
+        try:
+            stream = JSONArrayStream(response.iter_content(chunk_size))
+            for item in stream:
+                yield item
+            if members is not None:
+                members.update(stream.members)
+        finally:
+            response.close()
+
+    @login_required
+    def _stream_request(self, relative_url):
+        url = urljoin(self.api_url, relative_url)
+        return self._request('get', url, self._headers(), stream=True)[0]
     
-    @multi_response(Update)
+    def updates(self, from_time, to_time=None, concurrency=4):
+        """
+        Returns the series updated between ``from_time`` and ``to_time`` (default: now).
+
+        Ranges of up to one week (the longest range the API accepts) are fetched with a single request and returned
+        as an :class:`UpdateList`. Longer ranges are split into windows of one week which are fetched concurrently
+        (at most ``concurrency`` at once) and returned as an :class:`UpdateStream`, which yields each series once
+        with its most recent update, newest window first.
+        """
+        from_epoch = _dt_to_epoch(from_time)
+        to_epoch = _dt_to_epoch(to_time) if to_time else int(time.time())
+        if to_epoch - from_epoch > UPDATES_WINDOW:
+            return UpdateStream(self._windowed_updates(from_epoch, to_epoch, concurrency), self)
+
+        cls = self.object_class(Update)
+        return UpdateList([cls(d, self) for d in self._updates(from_time, to_time)['data']], self)
+
+    def _windowed_updates(self, from_time, to_time, concurrency):
+        windows = []
+        window_end = to_time
+        while window_end > from_time:
+            window_start = max(window_end - UPDATES_WINDOW, from_time)
+            windows.append((window_start, window_end))
+            window_end = window_start
+        logger.debug("Fetching updates from %s to %s in %s windows", from_time, to_time, len(windows))
+
+        self._ensure_token()
+        # windows are newest first, so the first update of a series seen is its most recent one
+        seen = set()
+        for updates in bounded_map(lambda window: latest_updates(self.updates(*window)).values(), windows,
+                                   concurrency):
+            for update in updates:
+                if update.id not in seen:
+                    seen.add(update.id)
+                    yield update
+
     @login_required
-    def updates(self, from_time, to_time=None):
+    def _updates(self, from_time, to_time=None):
         u = '/updated/query?'
-        
-        def _dt_to_epoch(o):
-            return int(time.mktime(o.timetuple())) - time.timezone if isinstance(o, datetime.datetime) else o
-        
+
         kwargs = {
             'fromTime': _dt_to_epoch(from_time)
         }
@@ -209,25 +581,183 @@ class TVDB(object):
         
         u += urlencode(kwargs)
         return self._api_request('get', u)
+
+    def resolve_updates(self, updates, concurrency=8, language=None):
+        """
+        Fetches the series of ``updates`` with at most ``concurrency`` requests in flight and yields a
+        :class:`SeriesResult` for each series as they complete. Series updated several times are fetched once.
+        Series found in the response cache with a ``lastUpdated`` at least as recent as the update are yielded from
+        the cache without a request; outdated cache entries are dropped and fetched again.
+        """
+        latest = latest_updates(updates)
+
+        to_fetch = []
+        for series_id, update in latest.items():
+            series = self._cached_series(series_id, update.lastUpdated, language)
+            if series is not None:
+                yield SeriesResult(series_id, series, None)
+            else:
+                to_fetch.append(series_id)
+
+        logger.debug("Resolving %s updated series (%s from cache)", len(to_fetch), len(latest) - len(to_fetch))
+        for result in self.series_many(to_fetch, concurrency=concurrency, ordered=False, language=language):
+            yield result
+
+    def _cached_series(self, series_id, last_updated, language=None):
+        """
+        Returns the cached series if it's at least as recent as ``last_updated``; outdated entries are removed from
+        the cache.
+        """
+        if self.cache is None or last_updated is None:
+            return None
+
+        key = (urljoin(self.api_url, '/series/%s' % series_id), language or self.accept_language)
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+
+        series = self.object_class(Series)(entry.data['data'], self)
+        if series.lastUpdated is not None and series.lastUpdated >= last_updated:
+            self.cache.count('hits')
+            return series
+
+        self.cache.delete(key)
+        return None
     
-    def _api_request(self, method, relative_url, data_attribute="data", **kwargs):
-        url = urljoin('https://api.thetvdb.com/', relative_url)
+    def _api_request(self, method, relative_url, data_attribute="data", cacheable=True, **kwargs):
+        url = urljoin(self.api_url, relative_url)
+        headers = self._headers(kwargs.pop('headers', {}))
+
+        if method.lower() != 'get':
+            return self._uncached_request(method, url, headers, **kwargs)
+
+        def _get():
+            if self.cache is not None and cacheable:
+                return self._cached_request(method, url, headers, **kwargs)
+            return self._uncached_request(method, url, headers, **kwargs)
+
+        if self._single_flight is None:
+            return _get()
+        # identical concurrent GETs share one request and the decoded response
+        return self._single_flight.do((method.lower(), url, headers.get('Accept-Language')), _get)
 
-        headers = kwargs.pop('headers', {})
+    def _headers(self, headers=None):
+        headers = headers if headers is not None else {}
         headers['User-Agent'] = self.useragent
         if self.jwttoken:
             headers['Authorization'] = 'Bearer %s' % self.jwttoken
         if self.accept_language:
-            headers['Accept-Language'] = self.accept_language
+            headers.setdefault('Accept-Language', self.accept_language)
+        return headers
 
-        response = requests.request(method, url, headers=headers, **kwargs)
-        
+    def _uncached_request(self, method, url, headers, **kwargs):
+        response, data = self._request(method, url, headers, decode=self._decode, **kwargs)
+        logger.info("Response: %s", response)
+        return data
+
+    def _decode(self, response):
+        return self.codec.loads(response.content)
+
+    def _cached_request(self, method, url, headers, **kwargs):
+        ttl = self.cache.ttl_for(url)
+        if not ttl:
+            return self._uncached_request(method, url, headers, **kwargs)
+
+        key = (url, headers.get('Accept-Language'))
+        entry = self.cache.get(key)
+
+        if entry is not None and not entry.expired:
+            self.cache.count('hits')
+            return entry.data
+
+        if entry is not None and entry.revalidatable:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+
+        def _decode(response):
+            if response.status_code == 304 and entry is not None:
+                return None
+            return self._decode(response)
+
+        response, data = self._request(method, url, headers, decode=_decode, **kwargs)
+        logger.info("Response: %s", response)
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.count('revalidations')
+            entry.expires = time.time() + ttl
+        else:
+            self.cache.count('misses')
+            entry = CacheEntry(data, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                               time.time() + ttl)
+        self.cache.set(key, entry)
+        return entry.data
+
+    def _request(self, method, url, headers, decode=None, **kwargs):
+        """
+        Sends the request (rate limited and retried according to the policies) and returns the response and the
+        body decoded by ``decode`` (``None`` without a ``decode`` function).
+        """
+        event = RequestEvent(method, url)
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            event.attempt = attempt
+            self._fire('before_request', event)
+            start = time.perf_counter()
+            try:
+                response = self.transport.request(method, url, headers=headers, **kwargs)
+            except Exception as e:
+                event.network_time = time.perf_counter() - start
+                event.error = e
+                self._fire('on_error', event)
+                raise
+            event.network_time = time.perf_counter() - start
+            event.response = response
+            event.status_code = response.status_code
+
+            if self.retry_policy is None or not self.retry_policy.should_retry(method, response.status_code, attempt):
+                break
+
+            delay = self.retry_policy.backoff(attempt, response)
+            attempt += 1
+            event.retry_delay = delay
+            self._fire('on_retry', event)
+            logger.info("HTTP %s for %s - retry %s in %.2fs", response.status_code, url, attempt, delay)
+            # release the connection (of streamed responses) before waiting
+            response.close()
+            time.sleep(delay)
+
+        error = None
         if response.status_code == 401:
-            raise Unauthorized(response.json()["Error"])
+            error = Unauthorized(self._error_message(response))
         elif response.status_code == 404:
-            raise NotFound(response.json()["Error"])
+            error = NotFound(self._error_message(response))
         elif response.status_code >= 400:
-            raise APIError()
-        
-        logger.info("Response: %s", response)
-        return response.json()
+            error = APIError()
+        if error is not None:
+            event.error = error
+            self._fire('on_error', event)
+            if kwargs.get('stream'):
+                response.close()
+            raise error
+
+        if not kwargs.get('stream'):
+            event.response_bytes = len(response.content or b'')
+
+        data = None
+        if decode is not None:
+            start = time.perf_counter()
+            data = decode(response)
+            event.decode_time = time.perf_counter() - start
+        self._fire('after_request', event)
+        return response, data
+
+    def _error_message(self, response):
+        try:
+            return self.codec.loads(response.content)["Error"]
+        except (TypeError, ValueError, KeyError):
+            return None
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+JSON codecs used to decode API responses and to serialize cached and mirrored data. :func:`default_codec` picks
+the fastest installed backend and falls back to the standard library ``json`` module.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class JSONCodec(object):
+    """
+    Codec based on the standard library ``json`` module.
+    """
+    name = 'json'
+
+    def loads(self, data):
+        if isinstance(data, (bytes, bytearray)):
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    Codec based on `orjson <https://github.com/ijl/orjson>`_, which decodes straight from bytes.
+    """
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise RuntimeError("orjson is not installed")
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+    def dumps(self, obj):
+        return orjson.dumps(obj)
+
+
+def default_codec():
+    return OrjsonCodec() if orjson is not None else JSONCodec()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Compact representations of the API objects. Known fields are stored in ``__slots__`` instead of the decoded JSON
+dict and the date fields are parsed once on first access. The compact classes are subclasses of the regular
+ones, so ``isinstance`` checks keep working. Use them with ``TVDB(..., compact=True)``.
+"""
+import datetime
+from types import MappingProxyType
+
+from tvdbrest.objects import parse_timestamp, parse_date, Series, Episode, Actor, Image, Update
+
+_NO_ATTRS = MappingProxyType({})
+_UNSET = object()
+
+
+def _parse_date(s):
+    # fast path for the common "YYYY-MM-DD" format
+    if s and len(s) == 10 and s[4] == '-' and s[7] == '-':
+        try:
+            return datetime.date(int(s[:4]), int(s[5:7]), int(s[8:10]))
+        except ValueError:
+            pass
+    return parse_date(s)
+
+
+def _slots(fields, date_fields):
+    return tuple(fields) + tuple('_%s' % f for f in date_fields) + tuple('_%s_parsed' % f for f in date_fields)
+
+
+def compact(cls):
+    """
+    Class decorator collecting the slot setters for the API fields of a compact class.
+    """
+    cls._setters = dict([(f, getattr(cls, f).__set__) for f in cls.FIELDS] +
+                        [(f, getattr(cls, '_%s' % f).__set__) for f in cls.DATE_FIELDS])
+    return cls
+
+
+def memoized_date(name, parser):
+    raw_slot = '_%s' % name
+    parsed_slot = '_%s_parsed' % name
+
+    def _get(self):
+        value = getattr(self, parsed_slot, _UNSET)
+        if value is _UNSET:
+            value = parser(getattr(self, raw_slot, None))
+            setattr(self, parsed_slot, value)
+        return value
+
+    return property(_get)
+
+
+class CompactAPIObjectMixin(object):
+    # the regular classes are dict-backed; the compact ones keep everything in slots
+    __slots__ = ('_attrs', '_tvdb')
+    FIELDS = ()
+    DATE_FIELDS = ()
+    _setters = {}
+
+    def __init__(self, attrs, tvdb):
+        self._tvdb = tvdb
+        extra = None
+        setters = self._setters
+
+        for key, value in attrs.items():
+            setter = setters.get(key, None)
+            if setter is not None:
+                setter(self, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        # fields not known in advance are kept in a (small) dict
+        self._attrs = extra or _NO_ATTRS
+
+    def as_dict(self):
+        d = dict(self._attrs)
+        for f in self.FIELDS:
+            try:
+                d[f] = getattr(self, f)
+            except KeyError:
+                pass
+        for f in self.DATE_FIELDS:
+            value = getattr(self, '_%s' % f, _UNSET)
+            if value is not _UNSET:
+                d[f] = value
+        return d
+
+
+SERIES_FIELDS = ('id', 'seriesName', 'aliases', 'banner', 'seriesId', 'status', 'network', 'networkId', 'runtime',
+                 'genre', 'overview', 'airsDayOfWeek', 'airsTime', 'rating', 'imdbId', 'zap2itId', 'added',
+                 'addedBy', 'siteRating', 'siteRatingCount', 'slug')
+
+EPISODE_FIELDS = ('id', 'airedSeason', 'airedSeasonID', 'airedEpisodeNumber', 'episodeName', 'absoluteNumber',
+                  'dvdSeason', 'dvdEpisodeNumber', 'dvdChapter', 'dvdDiscid', 'overview', 'language', 'seriesId',
+                  'imdbId', 'productionCode', 'director', 'directors', 'writers', 'guestStars', 'filename',
+                  'showUrl', 'lastUpdatedBy', 'airsAfterSeason', 'airsBeforeSeason', 'airsBeforeEpisode',
+                  'thumbAuthor', 'thumbAdded', 'thumbWidth', 'thumbHeight', 'siteRating', 'siteRatingCount')
+
+ACTOR_FIELDS = ('id', 'seriesId', 'name', 'role', 'sortOrder', 'image', 'imageAuthor', 'imageAdded', 'lastUpdated')
+
+IMAGE_FIELDS = ('id', 'keyType', 'subKey', 'fileName', 'resolution', 'ratingsInfo', 'thumbnail', 'languageId')
+
+UPDATE_FIELDS = ('id', )
+
+
+@compact
+class CompactSeries(CompactAPIObjectMixin, Series):
+    FIELDS = SERIES_FIELDS
+    DATE_FIELDS = ('firstAired', 'lastUpdated')
+    __slots__ = _slots(FIELDS, DATE_FIELDS)
+
+    firstAired = memoized_date('firstAired', _parse_date)
+    lastUpdated = memoized_date('lastUpdated', parse_timestamp)
+
+
+@compact
+class CompactEpisode(CompactAPIObjectMixin, Episode):
+    FIELDS = EPISODE_FIELDS
+    DATE_FIELDS = ('firstAired', 'lastUpdated')
+    __slots__ = _slots(FIELDS, DATE_FIELDS)
+
+    firstAired = memoized_date('firstAired', _parse_date)
+    lastUpdated = memoized_date('lastUpdated', parse_timestamp)
+
+
+@compact
+class CompactActor(CompactAPIObjectMixin, Actor):
+    FIELDS = ACTOR_FIELDS
+    __slots__ = _slots(FIELDS, ())
+
+
+@compact
+class CompactImage(CompactAPIObjectMixin, Image):
+    FIELDS = IMAGE_FIELDS
+    __slots__ = _slots(FIELDS, ())
+
+
+@compact
+class CompactUpdate(CompactAPIObjectMixin, Update):
+    FIELDS = UPDATE_FIELDS
+    DATE_FIELDS = ('lastUpdated', )
+    __slots__ = _slots(FIELDS, DATE_FIELDS)
+
+    lastUpdated = memoized_date('lastUpdated', parse_timestamp)
+
+
+COMPACT_CLASSES = {
+    Series: CompactSeries,
+    Episode: CompactEpisode,
+    Actor: CompactActor,
+    Image: CompactImage,
+    Update: CompactUpdate,
+}
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import logging
+import os
+import posixpath
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+from tvdbrest.codec import default_codec
+from tvdbrest.transport import SessionTransport
+from tvdbrest.util import atomic_write, bounded_map
+
+logger = logging.getLogger(__name__)
+
+
+class DownloadError(Exception):
+    pass
+
+
+class DownloadReport(object):
+    """
+    Result of :meth:`ImageDownloader.download`. ``paths`` maps each url to the path of its file (urls which failed
+    are listed in ``failed`` with the error instead).
+    """
+
+    def __init__(self):
+        self.paths = {}
+        self.failed = {}
+        self.downloaded = 0
+        self.not_modified = 0
+        self.deduplicated = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+
+    @property
+    def throughput(self):
+        """
+        Downloaded bytes per second.
+        """
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def files_per_second(self):
+        return (len(self.paths) + len(self.failed)) / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return "%s downloaded (%s duplicates), %s not modified, %s failed, %.1f KiB in %.2fs (%.1f KiB/s)" % (
+            self.downloaded, self.deduplicated, self.not_modified, len(self.failed), self.bytes / 1024.0,
+            self.elapsed, self.throughput / 1024.0)
+
+
+class ImageDownloader(object):
+    """
+    Downloads the files of :class:`tvdbrest.objects.Image` objects (or plain urls) concurrently into ``directory``.
+
+    Files are streamed to disk while their SHA-256 is computed and stored as ``<sha256><extension>`` below
+    ``directory/objects``, so identical images of different series are stored once. ``manifest.json`` keeps the
+    hash, ``ETag`` and ``Last-Modified`` of every url; known files are requested conditionally and skipped if the
+    server answers ``304 Not Modified``.
+
+        downloader = ImageDownloader('/var/cache/tvdb-images')
+        report = downloader.download(api.images(71663, keyType='fanart'))
+        print(report)
+
+    :param workers: number of concurrent downloads (and pooled connections)
+    :param transport: the :class:`tvdbrest.transport.Transport` (default: a pooled :class:`SessionTransport`)
+    """
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, directory, workers=8, transport=None, chunk_size=65536, timeout=60, codec=None):
+        self.directory = directory
+        self.workers = workers
+        self.transport = transport or SessionTransport(pool_maxsize=workers, timeout=timeout)
+        self.chunk_size = chunk_size
+        self.codec = codec or default_codec()
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(directory, 'tmp'), exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    def close(self):
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def _manifest_path(self):
+        return os.path.join(self.directory, self.MANIFEST)
+
+    def _load_manifest(self):
+        try:
+            with open(self._manifest_path, 'rb') as f:
+                return self.codec.loads(f.read())
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def save_manifest(self):
+        with self._lock:
+            data = self.codec.dumps(self.manifest)
+        atomic_write(self._manifest_path, data)
+
+    def path(self, url):
+        """
+        Returns the path of the stored file of ``url`` or ``None`` if it hasn't been downloaded.
+        """
+        entry = self.manifest.get(url)
+        if entry is None:
+            return None
+        path = self._abspath(entry['path'])
+        return path if os.path.exists(path) else None
+
+    def _abspath(self, relative_path):
+        return os.path.join(self.directory, *relative_path.split('/'))
+
+    def download(self, images, thumbnails=False):
+        """
+        Downloads the files of ``images`` (:class:`tvdbrest.objects.Image` objects or urls) and returns a
+        :class:`DownloadReport`. With ``thumbnails`` the thumbnails are downloaded as well.
+        """
+        urls = []
+        seen = set()
+        for image in images:
+            for url in ([image] if isinstance(image, str) else
+                        [image.url] + ([image.thumbnail_url] if thumbnails else [])):
+                if url not in seen:
+                    seen.add(url)
+                    urls.append(url)
+
+        report = DownloadReport()
+        start = time.perf_counter()
+        try:
+            for url, result in bounded_map(lambda u: (u, self._fetch(u, report)), urls, self.workers,
+                                           ordered=False):
+                if isinstance(result, Exception):
+                    report.failed[url] = result
+                else:
+                    report.paths[url] = result
+        finally:
+            report.elapsed = time.perf_counter() - start
+            self.save_manifest()
+
+        logger.info("Image download: %s", report)
+        return report
+
+    def _fetch(self, url, report):
+        headers = {}
+        entry = self.manifest.get(url)
+        if entry is not None and self.path(url) is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            response = self.transport.request('get', url, headers=headers, stream=True)
+        except Exception as e:
+            return e
+
+        try:
+            if response.status_code == 304 and headers:
+                with self._lock:
+                    report.not_modified += 1
+                return self._abspath(entry['path'])
+            if response.status_code != 200:
+                return DownloadError("HTTP %s for %s" % (response.status_code, url))
+
+            try:
+                relative_path, digest, size, duplicate = self._store(url, response)
+            except Exception as e:
+                return e
+        finally:
+            response.close()
+
+        with self._lock:
+            self.manifest[url] = {
+                'path': relative_path,
+                'sha256': digest,
+                'size': size,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
+            report.downloaded += 1
+            report.bytes += size
+            if duplicate:
+                report.deduplicated += 1
+        return self._abspath(relative_path)
+
+    def _store(self, url, response):
+        sha256 = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.directory, 'tmp'))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in response.iter_content(self.chunk_size):
+                    sha256.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+
+            digest = sha256.hexdigest()
+            relative_path = posixpath.join('objects', digest[:2], digest + posixpath.splitext(urlsplit(url).path)[1])
+            path = self._abspath(relative_path)
+
+            with self._lock:
+                duplicate = os.path.exists(path)
+                if not duplicate:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.replace(tmp_path, path)
+            return relative_path, digest, size, duplicate
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+import bisect
+import datetime
+import time
+
+
+def _field(episode, name):
+    try:
+        return getattr(episode, name)
+    except (AttributeError, KeyError):
+        return None
+
+
+def _to_date(d):
+    if isinstance(d, str):
+        return datetime.datetime.strptime(d, "%Y-%m-%d").date()
+    return d.date() if isinstance(d, datetime.datetime) else d
+
+
+def _matches(value, wanted):
+    if value is None:
+        return False
+    try:
+        return float(value) == float(wanted)
+    except (TypeError, ValueError):
+        return str(value) == str(wanted)
+
+
+# query parameters of /series/{id}/episodes/query and the episode fields they filter on
+QUERY_FIELDS = {
+    'airedSeason': 'airedSeason',
+    'airedEpisode': 'airedEpisodeNumber',
+    'dvdSeason': 'dvdSeason',
+    'dvdEpisode': 'dvdEpisodeNumber',
+    'absoluteNumber': 'absoluteNumber',
+    'imdbId': 'imdbId',
+    'firstAired': 'firstAired',
+}
+
+
+class EpisodeIndex(object):
+    """
+    Episodes of a series indexed by aired and DVD order, by id and by air date. Lookups by season and episode
+    number are dictionary lookups; air date ranges are found by bisecting the episodes sorted by ``firstAired``.
+
+        index = api.episode_index(71663)
+        index.get(5, 3)
+        index.aired_between(datetime.date(2017, 2, 1), datetime.date(2017, 2, 7))
+
+    :param episodes: iterable of :class:`tvdbrest.objects.Episode`
+    :param series_id: the id of the series the episodes belong to
+    """
+
+    def __init__(self, episodes, series_id=None):
+        self.series_id = series_id
+        self.created = time.time()
+
+        self._episodes = list(episodes)
+        self._by_id = {}
+        self._by_aired = {}
+        self._by_dvd = {}
+        self._seasons = {}
+        aired = []
+
+        for episode in self._episodes:
+            self._by_id[_field(episode, 'id')] = episode
+
+            season, number = _field(episode, 'airedSeason'), _field(episode, 'airedEpisodeNumber')
+            if season is not None and number is not None:
+                self._by_aired[(season, number)] = episode
+                self._seasons.setdefault(season, []).append(episode)
+
+            dvd_season, dvd_number = _field(episode, 'dvdSeason'), _field(episode, 'dvdEpisodeNumber')
+            if dvd_season is not None and dvd_number is not None:
+                self._by_dvd[(dvd_season, dvd_number)] = episode
+
+            first_aired = episode.firstAired
+            if first_aired is not None:
+                aired.append((first_aired, season or 0, number or 0, episode))
+
+        for season_episodes in self._seasons.values():
+            season_episodes.sort(key=lambda e: _field(e, 'airedEpisodeNumber'))
+
+        aired.sort(key=lambda t: t[:3])
+        self._aired_dates = [t[0] for t in aired]
+        self._aired = [t[3] for t in aired]
+
+    def __len__(self):
+        return len(self._episodes)
+
+    def __iter__(self):
+        return iter(self._episodes)
+
+    def __contains__(self, key):
+        return key in self._by_aired
+
+    def __getitem__(self, key):
+        """
+        Returns the episode with the aired ``(season, episode number)`` ``key``.
+        """
+        return self._by_aired[key]
+
+    def get(self, season, number, default=None):
+        return self._by_aired.get((season, number), default)
+
+    def get_dvd(self, season, number, default=None):
+        """
+        Returns the episode by DVD order (``dvdSeason``, ``dvdEpisodeNumber``).
+        """
+        return self._by_dvd.get((season, number), default)
+
+    def by_id(self, episode_id, default=None):
+        return self._by_id.get(episode_id, default)
+
+    @property
+    def seasons(self):
+        """
+        The aired season numbers in ascending order.
+        """
+        return sorted(self._seasons)
+
+    def season(self, season):
+        """
+        Returns the episodes of the aired ``season`` ordered by episode number.
+        """
+        return tuple(self._seasons.get(season, ()))
+
+    @property
+    def aired(self):
+        """
+        All episodes with a ``firstAired`` date in the order they aired.
+        """
+        return tuple(self._aired)
+
+    def aired_between(self, start, end=None):
+        """
+        Returns the episodes which aired between ``start`` and ``end`` (inclusive, default: ``start``) in the order
+        they aired.
+        """
+        start = _to_date(start)
+        end = _to_date(end or start)
+        return self._aired[bisect.bisect_left(self._aired_dates, start):bisect.bisect_right(self._aired_dates, end)]
+
+    def latest(self, today=None):
+        """
+        Returns the last episode which aired before or on ``today`` (default: the current date).
+        """
+        idx = bisect.bisect_right(self._aired_dates, _to_date(today or datetime.date.today()))
+        return self._aired[idx - 1] if idx else None
+
+    def query(self, **filters):
+        """
+        Answers an episode query like ``/series/{id}/episodes/query`` would (see :data:`QUERY_FIELDS` for the
+        supported parameters) and returns the matching episodes in aired order.
+        """
+        unknown = set(filters) - set(QUERY_FIELDS)
+        if unknown:
+            raise ValueError("Unsupported episode query parameter(s): %s" % ', '.join(sorted(unknown)))
+        filters = dict(filters)
+
+        if 'airedSeason' in filters and 'airedEpisode' in filters:
+            episode = self._by_aired.get((int(filters.pop('airedSeason')), int(filters.pop('airedEpisode'))))
+            candidates = [episode] if episode is not None else []
+        elif 'airedSeason' in filters:
+            candidates = self.season(int(filters.pop('airedSeason')))
+        elif 'firstAired' in filters:
+            candidates = self.aired_between(filters.pop('firstAired'))
+        else:
+            candidates = sorted(self._episodes, key=lambda e: (_field(e, 'airedSeason') or 0,
+                                                               _field(e, 'airedEpisodeNumber') or 0))
+
+        if 'firstAired' in filters:
+            first_aired = _to_date(filters.pop('firstAired'))
+            candidates = [e for e in candidates if e.firstAired == first_aired]
+
+        return [e for e in candidates
+                if all(_matches(_field(e, QUERY_FIELDS[key]), value) for key, value in filters.items())]
+
+    def next(self, today=None):
+        """
+        Returns the first episode airing after ``today`` (default: the current date).
+        """
+        idx = bisect.bisect_right(self._aired_dates, _to_date(today or datetime.date.today()))
+        return self._aired[idx] if idx < len(self._aired) else None
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Lazy partial objects. ``series(..., keys=[...])`` and ``search()`` return partial records; with
+``TVDB(..., lazy=True)`` they are returned as :class:`LazySeries` objects which fetch the full record the first time a
+field they don't hold is accessed. Objects returned by the same call share an :class:`UpgradeGroup`, so the first
+upgrade fetches the full records of the other objects of the group as well (concurrently, via
+:meth:`tvdbrest.client.TVDB.series_many`).
+"""
+import logging
+import threading
+from collections import OrderedDict
+
+from tvdbrest.objects import Series
+
+logger = logging.getLogger(__name__)
+
+
+class UpgradeGroup(object):
+    """
+    Partial objects which are upgraded together.
+
+    :param language: the language the full records are fetched in
+    :param max_batch: maximum number of objects upgraded at once
+    :param concurrency: maximum number of concurrent requests of an upgrade
+    """
+
+    def __init__(self, tvdb, language=None, max_batch=100, concurrency=8):
+        self.tvdb = tvdb
+        self.language = language
+        self.max_batch = max_batch
+        self.concurrency = concurrency
+        self.upgrades = 0
+        self._pending = OrderedDict()  # id -> lazy objects
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(len(objects) for objects in self._pending.values())
+
+    def wrap(self, attrs, object_id=None):
+        """
+        Returns a :class:`LazySeries` of the partial ``attrs`` belonging to this group.
+        """
+        object_id = object_id if object_id is not None else attrs['id']
+        obj = LazySeries(attrs, self.tvdb, (self, object_id))
+        with self._lock:
+            self._pending.setdefault(object_id, []).append(obj)
+        return obj
+
+    def upgrade(self, object_id):
+        """
+        Fetches the full records of ``object_id`` and up to ``max_batch`` - 1 other pending objects.
+        """
+        from tvdbrest.client import NotFound
+
+        with self._lock:
+            if object_id not in self._pending:
+                # upgraded by another thread in the meantime
+                return
+
+            ids = [object_id] + [i for i in self._pending if i != object_id][:self.max_batch - 1]
+            logger.debug("Upgrading %s partial series", len(ids))
+            self.upgrades += 1
+
+            error = None
+            for result in self.tvdb.series_many(ids, concurrency=self.concurrency, ordered=False,
+                                                language=self.language):
+                if result.error is not None and not isinstance(result.error, NotFound):
+                    # keep the objects pending to try again on the next access
+                    if result.series_id == object_id:
+                        error = result.error
+                    continue
+
+                attrs = result.series.as_dict() if result.series is not None else None
+                for obj in self._pending.pop(result.series_id, ()):
+                    obj._upgraded(attrs)
+
+            if error is not None:
+                raise error
+
+
+class LazyAPIObjectMixin(object):
+    """
+    Partial API object which fetches the full record (through its :class:`UpgradeGroup`) when a field it doesn't
+    hold is accessed.
+    """
+    __slots__ = ()
+
+    def __init__(self, attrs, tvdb, lazy):
+        super(LazyAPIObjectMixin, self).__init__(attrs, tvdb)
+        self._lazy = lazy
+
+    def __getattr__(self, item):
+        if item.startswith('_'):
+            raise AttributeError(item)
+        self._require(item)
+        return self._attrs[item]
+
+    def _require(self, field):
+        if self._lazy is not None and field not in self._attrs:
+            group, object_id = self._lazy
+            group.upgrade(object_id)
+
+    def _upgraded(self, attrs):
+        if attrs is not None:
+            self._attrs = dict(attrs)
+        # records which don't exist (anymore) keep their partial attributes
+        self._lazy = None
+
+    @property
+    def partial(self):
+        """
+        Whether the object holds a partial record which has not been upgraded yet.
+        """
+        return self._lazy is not None
+
+    @property
+    def fields(self):
+        """
+        The names of the fields the object holds.
+        """
+        return frozenset(self._attrs)
+
+    def upgrade(self):
+        """
+        Fetches the full record now (if it's still partial).
+        """
+        if self._lazy is not None:
+            group, object_id = self._lazy
+            group.upgrade(object_id)
+
+
+class LazySeries(LazyAPIObjectMixin, Series):
+    __slots__ = ('_lazy', )
+
+    @property
+    def firstAired(self):  # NOSONAR
+        self._require('firstAired')
+        return super(LazySeries, self).firstAired
+
+    @property
+    def lastUpdated(self):  # NOSONAR
+        self._require('lastUpdated')
+        return super(LazySeries, self).lastUpdated
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+import bisect
+import threading
+from collections import defaultdict
+
+from tvdbrest.util import endpoint_template
+
+HOOK_EVENTS = ('before_request', 'after_request', 'on_error', 'on_retry')
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestEvent(object):
+    """
+    Passed to the hooks of :class:`tvdbrest.client.TVDB`. One event is created per API request and updated on
+    every attempt.
+
+    ``network_time`` is the time spent in the transport (including reading the body unless the response is
+    streamed), ``decode_time`` the time spent decoding the body. ``response_bytes`` is ``None`` for streamed
+    responses.
+    """
+    __slots__ = ('method', 'url', 'endpoint', 'attempt', 'response', 'status_code', 'response_bytes',
+                 'network_time', 'decode_time', 'error', 'retry_delay')
+
+    def __init__(self, method, url):
+        self.method = method.lower()
+        self.url = url
+        self.endpoint = endpoint_template(url)
+        self.attempt = 0
+        self.response = None
+        self.status_code = None
+        self.response_bytes = None
+        self.network_time = None
+        self.decode_time = None
+        self.error = None
+        self.retry_delay = None
+
+    def __repr__(self):
+        return "<RequestEvent %s %s (%s)>" % (self.method.upper(), self.endpoint, self.status_code)
+
+
+class Histogram(object):
+    """
+    Cumulative histogram with fixed bucket boundaries (upper bounds, in the order of ``buckets``).
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """
+        Returns ``(upper bound, count)`` pairs including the ``+Inf`` bucket, as exported by Prometheus.
+        """
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+def _labels(**labels):
+    if not labels:
+        return ''
+    return '{%s}' % ','.join('%s="%s"' % (k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+                             for k, v in sorted(labels.items()))
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsCollector(object):
+    """
+    Collects per-endpoint request metrics from the hooks of a :class:`tvdbrest.client.TVDB` instance. Endpoints are
+    identified by their template (e.g. ``/series/{id}/episodes``) to keep the number of series bounded.
+
+        metrics = MetricsCollector()
+        tvdb = TVDB(..., metrics=metrics)
+        ...
+        print(metrics.to_prometheus())
+
+    :param buckets: upper bounds of the latency histogram buckets in seconds
+    :param prefix: prefix of the exported metric names
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix='tvdb'):
+        self.buckets = buckets
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = defaultdict(int)        # (endpoint, method, status) -> count
+            self.latency = {}                       # endpoint -> Histogram
+            self.response_bytes = defaultdict(int)  # endpoint -> bytes
+            self.network_time = defaultdict(float)  # endpoint -> seconds
+            self.decode_time = defaultdict(float)   # endpoint -> seconds
+            self.errors = defaultdict(int)          # (endpoint, error class) -> count
+            self.retries = defaultdict(int)         # endpoint -> count
+            self.logins = 0
+
+    def install(self, tvdb):
+        """
+        Registers the collector's hooks on ``tvdb``.
+        """
+        tvdb.add_hook('after_request', self.after_request)
+        tvdb.add_hook('on_error', self.on_error)
+        tvdb.add_hook('on_retry', self.on_retry)
+
+    def _observe(self, event):
+        if event.status_code is not None:
+            self.requests[(event.endpoint, event.method, event.status_code)] += 1
+        if event.network_time is not None:
+            if event.endpoint not in self.latency:
+                self.latency[event.endpoint] = Histogram(self.buckets)
+            self.latency[event.endpoint].observe(event.network_time + (event.decode_time or 0))
+            self.network_time[event.endpoint] += event.network_time
+        if event.decode_time is not None:
+            self.decode_time[event.endpoint] += event.decode_time
+        if event.response_bytes is not None:
+            self.response_bytes[event.endpoint] += event.response_bytes
+
+    def after_request(self, event):
+        with self._lock:
+            self._observe(event)
+            if event.endpoint == '/login':
+                self.logins += 1
+
+    def on_error(self, event):
+        with self._lock:
+            self._observe(event)
+            self.errors[(event.endpoint, type(event.error).__name__)] += 1
+
+    def on_retry(self, event):
+        with self._lock:
+            self._observe(event)
+            self.retries[event.endpoint] += 1
+
+    def summary(self):
+        """
+        Returns a dict with the totals per endpoint template.
+        """
+        with self._lock:
+            endpoints = set(e for e, _, _ in self.requests) | set(self.latency) | set(e for e, _ in self.errors)
+            result = {}
+            for endpoint in endpoints:
+                histogram = self.latency.get(endpoint)
+                result[endpoint] = {
+                    'requests': sum(c for (e, _, _), c in self.requests.items() if e == endpoint),
+                    'status_codes': dict((s, c) for (e, _, s), c in self.requests.items() if e == endpoint),
+                    'errors': sum(c for (e, _), c in self.errors.items() if e == endpoint),
+                    'retries': self.retries.get(endpoint, 0),
+                    'response_bytes': self.response_bytes.get(endpoint, 0),
+                    'network_time': self.network_time.get(endpoint, 0.0),
+                    'decode_time': self.decode_time.get(endpoint, 0.0),
+                    'mean_latency': histogram.sum / histogram.count if histogram and histogram.count else None,
+                }
+            return result
+
+    def to_prometheus(self):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        p = self.prefix
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append('# HELP %s_%s %s' % (p, name, help_text))
+            lines.append('# TYPE %s_%s %s' % (p, name, kind))
+            for suffix, labels, value in samples:
+                lines.append('%s_%s%s%s %s' % (p, name, suffix, _labels(**labels), _number(value)))
+
+        with self._lock:
+            metric('requests_total', 'counter', 'HTTP requests by endpoint, method and status code.',
+                   [('', dict(endpoint=e, method=m, status=s), c) for (e, m, s), c in sorted(self.requests.items())])
+
+            samples = []
+            for endpoint, histogram in sorted(self.latency.items()):
+                for bound, count in histogram.cumulative():
+                    samples.append(('_bucket', dict(endpoint=endpoint, le=_number(bound)), count))
+                samples.append(('_sum', dict(endpoint=endpoint), histogram.sum))
+                samples.append(('_count', dict(endpoint=endpoint), histogram.count))
+            metric('request_duration_seconds', 'histogram', 'Request latency (network and decoding) by endpoint.',
+                   samples)
+
+            metric('response_bytes_total', 'counter', 'Response body bytes by endpoint.',
+                   [('', dict(endpoint=e), v) for e, v in sorted(self.response_bytes.items())])
+            metric('network_seconds_total', 'counter', 'Time spent in the transport by endpoint.',
+                   [('', dict(endpoint=e), v) for e, v in sorted(self.network_time.items())])
+            metric('decode_seconds_total', 'counter', 'Time spent decoding responses by endpoint.',
+                   [('', dict(endpoint=e), v) for e, v in sorted(self.decode_time.items())])
+            metric('errors_total', 'counter', 'Failed requests by endpoint and error.',
+                   [('', dict(endpoint=e, error=err), c) for (e, err), c in sorted(self.errors.items())])
+            metric('retries_total', 'counter', 'Retried requests by endpoint.',
+                   [('', dict(endpoint=e), c) for e, c in sorted(self.retries.items())])
+            metric('logins_total', 'counter', 'Logins.', [('', {}, self.logins)])
+
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+import datetime
+import logging
+import sqlite3
+import threading
+import time
+
+from tvdbrest.client import NotFound, UPDATES_WINDOW
+from tvdbrest.codec import default_codec
+from tvdbrest.objects import Series, Episode
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    id INTEGER PRIMARY KEY,
+    imdb_id TEXT,
+    last_updated INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS series_imdb_id ON series (imdb_id);
+
+CREATE TABLE IF NOT EXISTS episodes (
+    id INTEGER PRIMARY KEY,
+    series_id INTEGER NOT NULL,
+    imdb_id TEXT,
+    first_aired TEXT,
+    aired_season INTEGER,
+    aired_episode INTEGER,
+    last_updated INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS episodes_series_id ON episodes (series_id, aired_season, aired_episode);
+CREATE INDEX IF NOT EXISTS episodes_imdb_id ON episodes (imdb_id);
+CREATE INDEX IF NOT EXISTS episodes_first_aired ON episodes (first_aired);
+
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class Mirror(object):
+    """
+    Local SQLite copy of a set of series and their episodes. :meth:`add_series` bootstraps a series, :meth:`sync`
+    uses :meth:`tvdbrest.client.TVDB.updates` to refetch only series and episodes changed since the last sync.
+    The read methods return :class:`tvdbrest.objects.Series` and :class:`tvdbrest.objects.Episode` objects bound
+    to ``tvdb``.
+    """
+
+    def __init__(self, tvdb, path, codec=None):
+        self.tvdb = tvdb
+        self.path = path
+        self.codec = codec or getattr(tvdb, 'codec', None) or default_codec()
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def _encode(self, attrs):
+        return self.codec.dumps(attrs).decode('utf-8')
+
+    def _decode(self, data):
+        return self.codec.loads(data)
+
+    # -- state
+
+    def _get_state(self, key, default=None):
+        rows = self._query("SELECT value FROM state WHERE key = ?", (key, ))
+        return rows[0][0] if rows else default
+
+    def _set_state(self, key, value):
+        self._db.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
+
+    @property
+    def last_sync(self):
+        value = self._get_state('last_sync')
+        return int(value) if value is not None else None
+
+    # -- writing
+
+    def _store_series(self, series):
+        attrs = series.as_dict()
+        self._db.execute("INSERT OR REPLACE INTO series (id, imdb_id, last_updated, data) VALUES (?, ?, ?, ?)",
+                         (attrs['id'], attrs.get('imdbId') or None, attrs.get('lastUpdated'), self._encode(attrs)))
+
+    def _store_episodes(self, series_id, episodes):
+        """
+        Stores the (complete) list of episodes of a series. Only new or changed episodes are written, episodes no
+        longer listed are removed. Returns the number of written episodes.
+        """
+        known = dict(self._db.execute("SELECT id, last_updated FROM episodes WHERE series_id = ?", (series_id, )))
+
+        rows = []
+        for episode in episodes:
+            attrs = episode.as_dict()
+            if attrs['id'] in known and known.pop(attrs['id']) == attrs.get('lastUpdated'):
+                continue
+            rows.append((attrs['id'], series_id, attrs.get('imdbId') or None, attrs.get('firstAired') or None,
+                         attrs.get('airedSeason'), attrs.get('airedEpisodeNumber'), attrs.get('lastUpdated'),
+                         self._encode(attrs)))
+
+        self._db.executemany("INSERT OR REPLACE INTO episodes (id, series_id, imdb_id, first_aired, aired_season, "
+                             "aired_episode, last_updated, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self._db.executemany("DELETE FROM episodes WHERE id = ?", [(episode_id, ) for episode_id in known])
+        return len(rows)
+
+    def _refresh_series(self, series_id):
+        series = self.tvdb.series(series_id)
+        episodes = list(self.tvdb.episodes_by_series(series_id))
+
+        with self._lock, self._db:
+            self._store_series(series)
+            written = self._store_episodes(series_id, episodes)
+        logger.info("Refreshed series %s (%s episodes written)", series_id, written)
+        return series
+
+    def add_series(self, series_id):
+        """
+        Fetches the series and all its episodes into the mirror. Subsequent :meth:`sync` calls keep it up to date.
+        """
+        with self._lock, self._db:
+            if self.last_sync is None:
+                self._set_state('last_sync', str(int(time.time())))
+        return self._refresh_series(series_id)
+
+    def remove_series(self, series_id):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM episodes WHERE series_id = ?", (series_id, ))
+            self._db.execute("DELETE FROM series WHERE id = ?", (series_id, ))
+
+    @property
+    def series_ids(self):
+        return set(row[0] for row in self._query("SELECT id FROM series"))
+
+    def sync(self, to_time=None):
+        """
+        Refetches the mirrored series which changed between the last sync and ``to_time`` (default: now). Returns
+        the ids of the refreshed series.
+        """
+        to_time = int(to_time or time.time())
+        from_time = self.last_sync or to_time
+
+        last_updated = dict(self._query("SELECT id, last_updated FROM series"))
+        changed = set()
+
+        window_start = from_time
+        while window_start < to_time:
+            window_end = min(window_start + UPDATES_WINDOW, to_time)
+            for update in self.tvdb.updates(window_start, window_end):
+                if update.id not in last_updated:
+                    continue
+                if update.as_dict().get('lastUpdated', 0) > (last_updated[update.id] or 0):
+                    changed.add(update.id)
+            window_start = window_end
+
+        for series_id in sorted(changed):
+            try:
+                self._refresh_series(series_id)
+            except NotFound:
+                logger.warning("Series %s no longer exists - removing it from the mirror", series_id)
+                self.remove_series(series_id)
+
+        with self._lock, self._db:
+            self._set_state('last_sync', str(to_time))
+        return changed
+
+    # -- reading
+
+    def _series(self, rows):
+        if not rows:
+            raise NotFound("Series not found in mirror")
+        return Series(self._decode(rows[0][0]), self.tvdb)
+
+    def _episodes(self, rows):
+        return [Episode(self._decode(row[0]), self.tvdb) for row in rows]
+
+    def series(self, series_id):
+        return self._series(self._query("SELECT data FROM series WHERE id = ?", (series_id, )))
+
+    def series_by_imdb_id(self, imdb_id):
+        return self._series(self._query("SELECT data FROM series WHERE imdb_id = ?", (imdb_id, )))
+
+    def episode(self, episode_id):
+        episodes = self._episodes(self._query("SELECT data FROM episodes WHERE id = ?", (episode_id, )))
+        if not episodes:
+            raise NotFound("Episode not found in mirror")
+        return episodes[0]
+
+    def episodes_by_series(self, series_id):
+        return self._episodes(self._query("SELECT data FROM episodes WHERE series_id = ? "
+                                          "ORDER BY aired_season, aired_episode", (series_id, )))
+
+    def episodes_by_imdb_id(self, imdb_id):
+        return self._episodes(self._query("SELECT data FROM episodes WHERE imdb_id = ?", (imdb_id, )))
+
+    def episodes_aired(self, start, end=None, series_id=None):
+        """
+        Returns the episodes which aired between ``start`` and ``end`` (inclusive, default: ``start``), optionally
+        restricted to a series.
+        """
+        end = end or start
+        query = "SELECT data FROM episodes WHERE first_aired BETWEEN ? AND ?"
+        params = [_date_str(start), _date_str(end)]
+        if series_id is not None:
+            query += " AND series_id = ?"
+            params.append(series_id)
+        return self._episodes(self._query(query + " ORDER BY first_aired", params))
+
+
+def _date_str(d):
+    return d.strftime("%Y-%m-%d") if isinstance(d, (datetime.date, datetime.datetime)) else d
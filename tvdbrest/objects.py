@@ -1,28 +1,53 @@
 # -*- coding: utf-8 -*-
 import datetime
 import math
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from tvdbrest.util import bounded_map
+
+
+def parse_timestamp(lu):
+    if not lu:
+        return None
+
+    return datetime.datetime.fromtimestamp(lu, tz=datetime.timezone.utc)
+
+
+def parse_date(s):
+    if not s:
+        return None
+
+    return datetime.datetime.strptime(s, "%Y-%m-%d").date()
+
+
+def merge_translations(translations):
+    """
+    Merges the attributes (dicts) of an object in several languages, given in order of preference: fields which
+    are empty (``None``, ``""`` or ``[]``) in a language are taken from the next language providing a value.
+    """
+    merged = {}
+    for attrs in translations:
+        for key, value in attrs.items():
+            if merged.get(key, None) in (None, '', []):
+                merged[key] = value
+    return merged
 
 
 class LastUpdatedFieldMixin(object):
+    __slots__ = ()
 
     @property
     def lastUpdated(self):  # NOSONAR
-        lu = self._attrs.get('lastUpdated', None)
-        if not lu:
-            return None
-        
-        return datetime.datetime.fromtimestamp(lu, tz=datetime.timezone.utc)
+        return parse_timestamp(self._attrs.get('lastUpdated', None))
 
 
 class FirstAiredFieldMixin(object):
+    __slots__ = ()
 
     @property
     def firstAired(self):  # NOSONAR
-        s = self._attrs.get('firstAired', None)
-        if not s:
-            return None
-        
-        return datetime.datetime.strptime(s, "%Y-%m-%d").date()
+        return parse_date(self._attrs.get('firstAired', None))
 
 
 class APIObject(object):
@@ -33,13 +58,22 @@ class APIObject(object):
         self._tvdb = tvdb
     
     def __getattr__(self, item):
+        # private and special attributes (e.g. unset slots) are never API fields
+        if item.startswith('_'):
+            raise AttributeError(item)
         return self._attrs[item]
     
     def __eq__(self, other):
         return isinstance(other, self.__class__) and self.id == other.id
     
     def __str__(self):
-        return self._attrs[self.STR_ATTR] if self.STR_ATTR else super(APIObject, self).__str__()
+        return getattr(self, self.STR_ATTR) if self.STR_ATTR else super(APIObject, self).__str__()
+
+    def as_dict(self):
+        """
+        Returns the attributes of the object as received from the API.
+        """
+        return dict(self._attrs)
 
 
 class Language(APIObject):
@@ -59,6 +93,9 @@ class Series(LastUpdatedFieldMixin, FirstAiredFieldMixin, APIObject):
     def episodes(self, **kwargs):
         return self._tvdb.episodes_by_series(self.id, **kwargs)
 
+    def episode_index(self, refresh=False):
+        return self._tvdb.episode_index(self.id, refresh=refresh)
+
     def images(self, **kwargs):
         return self._tvdb.images(self.id, **kwargs)
 
@@ -83,15 +120,67 @@ class Image(APIObject):
 
 
 class Update(LastUpdatedFieldMixin, APIObject):
-    
+
     @property
     def series(self):
         return self._tvdb.series(self.id)
 
 
+def latest_updates(updates):
+    """
+    Returns an ordered dict mapping the series ids of ``updates`` to their most recent :class:`Update`.
+    """
+    latest = OrderedDict()
+    for update in updates:
+        current = latest.get(update.id)
+        if current is None or (update.lastUpdated is not None and
+                               (current.lastUpdated is None or update.lastUpdated > current.lastUpdated)):
+            latest[update.id] = update
+    return latest
+
+
+class ResolveUpdatesMixin(object):
+
+    def resolve(self, concurrency=8, language=None):
+        """
+        Fetches the updated series concurrently and yields a :class:`tvdbrest.client.SeriesResult` for each
+        series as they complete (see :meth:`tvdbrest.client.TVDB.resolve_updates`).
+        """
+        return self._tvdb.resolve_updates(self, concurrency=concurrency, language=language)
+
+
+class UpdateList(ResolveUpdatesMixin, list):
+    """
+    List of :class:`Update` objects as returned by :meth:`tvdbrest.client.TVDB.updates`.
+    """
+
+    def __init__(self, updates, tvdb):
+        super(UpdateList, self).__init__(updates)
+        self._tvdb = tvdb
+
+
+class UpdateStream(ResolveUpdatesMixin):
+    """
+    Updates of a time range longer than the API accepts at once, yielded lazily while the windows of the range are
+    fetched (see :meth:`tvdbrest.client.TVDB.updates`). The stream can be iterated once.
+    """
+
+    def __init__(self, updates, tvdb):
+        self._updates = updates
+        self._tvdb = tvdb
+
+    def __iter__(self):
+        return self._updates
+
+
 class PaginatedAPIObjectList(list):
+    """
+    List of API objects which fetches the pages lazily. With ``prefetch_workers`` > 1, iterating the list fetches
+    up to ``read_ahead`` pages (default: twice the number of workers) ahead of the current page concurrently.
+    """
 
-    def __init__(self, links, initial_items, fetch_func, fetch_args=None, fetch_kwargs=None, page_size=100):
+    def __init__(self, links, initial_items, fetch_func, fetch_args=None, fetch_kwargs=None, page_size=100,
+                 prefetch_workers=0, read_ahead=None):
         self._first_page = links['first']
         self._last_page = links['last']
 
@@ -103,6 +192,8 @@ class PaginatedAPIObjectList(list):
         self._fetch_func = fetch_func
         self._fetch_args = fetch_args
         self._fetch_kwargs = fetch_kwargs
+        self.prefetch_workers = prefetch_workers
+        self.read_ahead = read_ahead
         super(PaginatedAPIObjectList, self).__init__()
 
     @property
@@ -113,7 +204,7 @@ class PaginatedAPIObjectList(list):
         return len(self._pages[self._last_page-1])
 
     def _fetch_page(self, page_number):
-        kwargs = self._fetch_kwargs or {}
+        kwargs = dict(self._fetch_kwargs or {})
         kwargs['page'] = page_number
         return self._fetch_func(*self._fetch_args or (), **kwargs)
 
@@ -121,6 +212,9 @@ class PaginatedAPIObjectList(list):
         return (self._last_page-1) * self._page_size + self._last_page_item_count
 
     def __iter__(self):
+        if self.prefetch_workers > 1 and self._first_page != self._last_page:
+            return iter(self._iter_prefetched_pages())
+
         def _iter_pages():
             for page_idx in range(self._first_page-1, self._last_page):
                 if self._pages[page_idx] is None:
@@ -130,15 +224,79 @@ class PaginatedAPIObjectList(list):
                     
         return iter(_iter_pages())
 
+    def _iter_prefetched_pages(self):
+        read_ahead = max(self.read_ahead or self.prefetch_workers * 2, 1)
+        executor = ThreadPoolExecutor(max_workers=self.prefetch_workers)
+        futures = {}
+
+        def _store(page_idx):
+            def _callback(future):
+                if not future.cancelled() and future.exception() is None:
+                    self._pages[page_idx] = future.result()
+            return _callback
+
+        try:
+            for page_idx in range(self._first_page-1, self._last_page):
+                for ahead_idx in range(page_idx, min(page_idx + read_ahead, self._last_page)):
+                    if self._pages[ahead_idx] is None and ahead_idx not in futures:
+                        futures[ahead_idx] = executor.submit(self._fetch_page, ahead_idx+1)
+                        futures[ahead_idx].add_done_callback(_store(ahead_idx))
+
+                future = futures.pop(page_idx, None)
+                page = future.result() if future is not None else self._pages[page_idx]
+                for page_item in page:
+                    yield page_item
+        finally:
+            for future in futures.values():
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _fetch_pages(self, page_indexes):
+        missing = [page_idx for page_idx in page_indexes if self._pages[page_idx] is None]
+        if self.prefetch_workers > 1 and len(missing) > 1:
+            pages = bounded_map(lambda page_idx: self._fetch_page(page_idx+1), missing, self.prefetch_workers)
+        else:
+            pages = (self._fetch_page(page_idx+1) for page_idx in missing)
+
+        for page_idx, page in zip(missing, pages):
+            self._pages[page_idx] = page
+
+    def _slice(self, s):
+        """
+        Returns the items of the slice ``s`` as a list. Only the pages covering the slice are fetched (concurrently
+        with ``prefetch_workers`` > 1). The length of the list - and thereby the last page - is only needed for
+        negative bounds, negative steps and open ends.
+        """
+        if (s.step or 1) > 0 and s.stop is not None and (s.start or 0) >= 0 and s.stop >= 0:
+            # all pages before the last one are full, so the upper bound is sufficient
+            indexes = range(*s.indices(self._last_page * self._page_size))
+        else:
+            indexes = range(*s.indices(len(self)))
+
+        if not indexes:
+            return []
+
+        page_size = self._page_size
+        self._fetch_pages(sorted(set(i // page_size for i in indexes if i // page_size < self._last_page)))
+
+        items = []
+        for i in indexes:
+            page_idx, page_item_idx = divmod(i, page_size)
+            if page_idx < self._last_page and page_item_idx < len(self._pages[page_idx]):
+                items.append(self._pages[page_idx][page_item_idx])
+        return items
+
     def __getitem__(self, item):
         if isinstance(item, slice):
-            raise ValueError("slicing not supported")
-        
+            return self._slice(item)
+
         if item >= 0:
             absolute_index = item
         else:
             # item from the end of the list
-            absolute_index = (self._last_page * self._page_size)-1 - item
+            if -item > self._last_page * self._page_size:
+                raise IndexError("list index out of range")
+            absolute_index = len(self) + item
         
         # definitely out of bounds
         if not 0 <= absolute_index <= (self._last_page * self._page_size)-1:
@@ -151,9 +309,8 @@ class PaginatedAPIObjectList(list):
         if self._pages[page_idx] is None:
             self._pages[page_idx] = self._fetch_page(page_idx+1)
 
-        # if we've already fetched the last page, we can determine for sure that the index is out of range
-        if absolute_index >= 0 and self._pages[self._last_page-1] is not None and \
-            page_item_idx >= len(self._pages[self._last_page-1]):
-                raise IndexError("list index out of range")
+        # only the last page may be shorter than page_size
+        if page_item_idx >= len(self._pages[page_idx]):
+            raise IndexError("list index out of range")
 
         return self._pages[page_idx][page_item_idx]
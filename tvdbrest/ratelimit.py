@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+import email.utils
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket(object):
+    """
+    Thread-safe token bucket allowing ``rate`` requests per second with bursts of up to ``capacity`` requests.
+    Share one instance between threads and :class:`tvdbrest.client.TVDB` instances to enforce a common limit.
+    """
+
+    def __init__(self, rate, capacity=None):
+        assert rate > 0
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(rate, 1))
+        self.throttled = 0
+        self.throttle_delay = 0.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """
+        Takes ``tokens`` from the bucket, sleeping until they are available. Returns the time waited in seconds.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # tokens may become negative - callers arriving later wait for the debt to be paid off
+            self._tokens -= tokens
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            if delay:
+                self.throttled += 1
+                self.throttle_delay += delay
+
+        if delay:
+            logger.debug("Rate limit reached - waiting %.3fs", delay)
+            time.sleep(delay)
+        return delay
+
+
+class RetryPolicy(object):
+    """
+    Retries idempotent requests failing with one of ``statuses``. The delay between attempts grows exponentially
+    (``backoff_factor * 2 ** attempt``, capped at ``max_backoff``) with full jitter. A ``Retry-After`` header of the
+    response is the minimum delay, even if it is longer than ``max_backoff``; ``max_retry_after`` limits it.
+    """
+
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=30, statuses=(429, 500, 502, 503, 504),
+                 methods=('get', 'head', 'options'), jitter=True, max_retry_after=None):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(m.lower() for m in methods)
+        self.jitter = jitter
+        self.retries = 0
+        self.retry_delay = 0.0
+        self._lock = threading.Lock()
+
+    def should_retry(self, method, status_code, attempt):
+        return attempt < self.max_retries and method.lower() in self.methods and status_code in self.statuses
+
+    def backoff(self, attempt, response=None):
+        delay = min(self.backoff_factor * (2 ** attempt), self.max_backoff)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+
+        retry_after = _retry_after(response)
+        if retry_after is not None:
+            if self.max_retry_after is not None:
+                retry_after = min(retry_after, self.max_retry_after)
+            delay = max(delay, retry_after)
+
+        with self._lock:
+            self.retries += 1
+            self.retry_delay += delay
+        return delay
+
+
+def _retry_after(response):
+    headers = getattr(response, 'headers', None) or {}
+    value = headers.get('Retry-After', None)
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
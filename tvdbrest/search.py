@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+import bisect
+import heapq
+import logging
+import re
+import threading
+import unicodedata
+
+from tvdbrest.client import NotFound
+from tvdbrest.codec import default_codec
+from tvdbrest.objects import Series
+from tvdbrest.util import atomic_write
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r'[^\W_]+', re.UNICODE)
+
+# fields of a series which are indexed and the weight of a match in them
+SEARCH_FIELDS = (
+    ('seriesName', 4.0),
+    ('aliases', 3.0),
+    ('imdbId', 4.0),
+    ('zap2itId', 4.0),
+    ('network', 1.0),
+)
+
+EXACT, PREFIX, TYPO = 1.0, 0.6, 0.4
+
+
+def normalize(text):
+    """
+    Lower-cases ``text`` and strips accents, e.g. ``Pokémon`` becomes ``pokemon``.
+    """
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    return _TOKEN.findall(normalize(text))
+
+
+def _deletes(token):
+    return set(token[:i] + token[i+1:] for i in range(len(token)))
+
+
+def _within_one_edit(a, b):
+    """
+    Returns whether ``a`` and ``b`` differ by at most one insertion, deletion, substitution or transposition.
+    """
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diff = [i for i in range(len(a)) if a[i] != b[i]]
+        return len(diff) == 1 or (len(diff) == 2 and diff[1] == diff[0] + 1 and
+                                  a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]])
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i+1:]
+
+
+class SeriesSearchIndex(object):
+    """
+    In-memory search index over series which have already been fetched. Matches the tokens of the query against
+    the tokens of ``seriesName``, ``aliases``, ``network``, ``imdbId`` and ``zap2itId`` exactly, by prefix (so
+    incomplete input matches while it is typed) and with one typo (insertion, deletion, substitution or
+    transposition; for tokens of at least ``typo_min_length`` characters). All query tokens have to match.
+
+    Typo candidates are found through a dictionary of all single-character deletions of the indexed tokens, so
+    queries don't scan the vocabulary.
+
+    :param tvdb: the :class:`tvdbrest.client.TVDB` used by :meth:`search` on a local miss (optional)
+    :param typo_min_length: minimum length of a token to be matched with a typo
+    """
+
+    def __init__(self, tvdb=None, typo_min_length=4, codec=None):
+        self.tvdb = tvdb
+        self.typo_min_length = typo_min_length
+        self.codec = codec or getattr(tvdb, 'codec', None) or default_codec()
+        self._series = {}
+        self._names = {}        # series id -> normalized series name
+        self._postings = {}     # token -> {series id: field weight}
+        self._deletions = {}    # single deletion of a token -> tokens
+        self._tokens = []       # sorted vocabulary for prefix matches
+        self._tokens_dirty = False
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._series)
+
+    def __contains__(self, series_id):
+        return series_id in self._series
+
+    def _field_tokens(self, series):
+        attrs = series.as_dict()
+        tokens = {}
+        for field, weight in SEARCH_FIELDS:
+            values = attrs.get(field) or ()
+            for value in ([values] if isinstance(values, str) else values):
+                for token in tokenize(str(value)):
+                    tokens[token] = max(tokens.get(token, 0), weight)
+        return tokens
+
+    def add(self, series):
+        """
+        Adds or replaces ``series`` (a :class:`tvdbrest.objects.Series`).
+        """
+        with self._lock:
+            if series.id in self._series:
+                self.remove(series.id)
+            self._series[series.id] = series
+            self._names[series.id] = ' '.join(tokenize(series.as_dict().get('seriesName') or ''))
+
+            for token, weight in self._field_tokens(series).items():
+                if token not in self._postings:
+                    self._postings[token] = {}
+                    self._tokens_dirty = True
+                    if len(token) >= self.typo_min_length:
+                        for deletion in _deletes(token):
+                            self._deletions.setdefault(deletion, set()).add(token)
+                self._postings[token][series.id] = weight
+
+    def add_many(self, series):
+        for s in series:
+            self.add(s)
+
+    def remove(self, series_id):
+        with self._lock:
+            series = self._series.pop(series_id, None)
+            if series is None:
+                return
+            del self._names[series_id]
+
+            for token in self._field_tokens(series):
+                postings = self._postings.get(token)
+                if postings is None:
+                    continue
+                postings.pop(series_id, None)
+                if not postings:
+                    del self._postings[token]
+                    self._tokens_dirty = True
+                    for deletion in _deletes(token):
+                        tokens = self._deletions.get(deletion)
+                        if tokens is not None:
+                            tokens.discard(token)
+                            if not tokens:
+                                del self._deletions[deletion]
+
+    def _prefix_tokens(self, prefix):
+        if self._tokens_dirty:
+            self._tokens = sorted(self._postings)
+            self._tokens_dirty = False
+        start = bisect.bisect_left(self._tokens, prefix)
+        end = bisect.bisect_left(self._tokens, prefix + '\uffff')
+        return self._tokens[start:end]
+
+    def _typo_tokens(self, token):
+        if len(token) < self.typo_min_length:
+            return set()
+        candidates = set(self._deletions.get(token, ()))
+        for deletion in _deletes(token):
+            if deletion in self._postings:
+                candidates.add(deletion)
+            candidates.update(self._deletions.get(deletion, ()))
+        return set(c for c in candidates if _within_one_edit(token, c))
+
+    def _token_scores(self, token):
+        scores = {}
+
+        def _score(candidate, quality):
+            for series_id, weight in self._postings[candidate].items():
+                scores[series_id] = max(scores.get(series_id, 0), weight * quality)
+
+        for candidate in self._typo_tokens(token):
+            _score(candidate, TYPO)
+        for candidate in self._prefix_tokens(token):
+            _score(candidate, PREFIX if candidate != token else EXACT)
+        return scores
+
+    def local_search(self, query, limit=10):
+        """
+        Returns up to ``limit`` series matching ``query``, best matches first.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            scores = None
+            for token in tokens:
+                token_scores = self._token_scores(token)
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = dict((series_id, score + token_scores[series_id])
+                                  for series_id, score in scores.items() if series_id in token_scores)
+                if not scores:
+                    return []
+
+            normalized_query = ' '.join(tokens)
+            for series_id in scores:
+                name = self._names[series_id]
+                if name == normalized_query:
+                    scores[series_id] += 10
+                elif name.startswith(normalized_query):
+                    scores[series_id] += 5
+
+            ranked = heapq.nsmallest(limit, scores, key=lambda series_id: (-scores[series_id], series_id))
+            return [self._series[series_id] for series_id in ranked]
+
+    def search(self, query, limit=10, remote=True):
+        """
+        Like :meth:`local_search`, but falls back to :meth:`tvdbrest.client.TVDB.search` if nothing matches
+        locally (and ``remote`` is set). Series found remotely are added to the index.
+        """
+        results = self.local_search(query, limit)
+        if results or not remote or self.tvdb is None or not query.strip():
+            return results
+
+        logger.debug("No local match for %r - searching remotely", query)
+        try:
+            found = self.tvdb.search(name=query)
+        except NotFound:
+            # the API answers searches without any result with a 404
+            return []
+        self.add_many(found)
+        return found[:limit]
+
+    def save(self, path):
+        """
+        Writes the indexed series to ``path``; the index is rebuilt by :meth:`load`.
+        """
+        with self._lock:
+            data = self.codec.dumps([s.as_dict() for s in self._series.values()])
+        atomic_write(path, data)
+
+    @classmethod
+    def load(cls, path, tvdb=None, **kwargs):
+        index = cls(tvdb, **kwargs)
+        with open(path, 'rb') as f:
+            attrs = index.codec.loads(f.read())
+        series_class = tvdb.object_class(Series) if tvdb is not None else Series
+        index.add_many(series_class(a, tvdb) for a in attrs)
+        return index
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import codecs
+import json
+import re
+
+_WHITESPACE = re.compile(r'\s*')
+# characters which may continue a number decoded at the end of the buffer
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*')
+
+
+class JSONArrayStream(object):
+    """
+    Incrementally decodes the elements of the array ``key`` in a JSON object read from ``chunks`` (an iterable of
+    bytes, e.g. ``response.iter_content()``). Iterating yields the elements of the array as soon as they are
+    complete, so neither the whole body nor all elements have to be held in memory. The other members of the
+    top-level object are available in :attr:`members` once they have been read (``links`` usually precedes
+    ``data`` in TVDB responses; all members are known after the iteration has finished).
+    """
+
+    def __init__(self, chunks, key='data'):
+        self.key = key
+        self.members = {}
+        self._chunks = iter(chunks)
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _read(self):
+        if self._eof:
+            raise ValueError("Unexpected end of JSON document")
+
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            text = self._text_decoder.decode(b'', final=True)
+        else:
+            text = self._text_decoder.decode(chunk)
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+
+    def _skip_whitespace(self):
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            self._read()
+
+    def _expect(self, chars):
+        c = self._skip_whitespace()
+        if c not in chars:
+            raise ValueError("Expected one of %r at position %s, got %r" % (chars, self._pos, c))
+        self._pos += 1
+        return c
+
+    def _value(self):
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                # incomplete value - read more (raises at the end of the document)
+                self._read()
+                continue
+
+            # numbers and literals at the end of the buffer might continue in the next chunk - also if the chunk
+            # ends within the fraction or exponent ("1." or "2e" are decoded as 1 and 2)
+            if not self._eof and not isinstance(value, (dict, list, str)) and \
+                    _NUMBER_TAIL.match(self._buffer, end).end() == len(self._buffer):
+                self._read()
+                continue
+
+            self._pos = end
+            return value
+
+    def __iter__(self):
+        self._expect('{')
+        if self._skip_whitespace() == '}':
+            return
+
+        while True:
+            member = self._value()
+            self._expect(':')
+
+            if member == self.key and self._skip_whitespace() == '[':
+                self._pos += 1
+                for item in self._array_items():
+                    yield item
+            else:
+                self.members[member] = self._value()
+
+            if self._expect(',}') == '}':
+                return
+
+    def _array_items(self):
+        if self._skip_whitespace() == ']':
+            self._pos += 1
+            return
+
+        while True:
+            yield self._value()
+            if self._expect(',]') == ']':
+                return
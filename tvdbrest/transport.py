@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class Transport(object):
+    """
+    Base class for the HTTP layer used by :class:`tvdbrest.client.TVDB`. A transport takes the method, the absolute
+    url and the keyword arguments known from :func:`requests.request` and returns a response object compatible with
+    :class:`requests.Response`.
+    """
+
+    def request(self, method, url, **kwargs):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SessionTransport(Transport):
+    """
+    Transport based on a :class:`requests.Session` with a connection pool. Connections are kept alive between
+    requests, so only the first request to a host pays for the TCP and TLS handshake.
+
+    :param pool_connections: number of per-host connection pools to keep
+    :param pool_maxsize: maximum number of connections kept alive per host
+    :param pool_block: block when all connections of a host are in use instead of opening an additional one
+    :param timeout: default timeout (seconds or a ``(connect, read)`` tuple) for requests without an explicit timeout
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False, timeout=None):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.timeout = timeout
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        session = self._session
+        if session is None:
+            # the first requests of a client may come from several threads at once
+            with self._lock:
+                if self._session is None:
+                    self._session = self._create_session()
+                session = self._session
+        return session
+
+    def _create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize,
+                              pool_block=self.pool_block)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def request(self, method, url, **kwargs):
+        if self.timeout is not None:
+            kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                logger.debug("Closing HTTP session")
+                self._session.close()
+                self._session = None
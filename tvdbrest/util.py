@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+import itertools
+import os
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlsplit
+
+
+def endpoint_template(url):
+    """
+    Returns the endpoint template of an (absolute or relative) API url, e.g. ``/series/{id}/episodes`` for
+    ``https://api.thetvdb.com/series/71663/episodes?page=2``.
+    """
+    path = urlsplit(url).path or '/'
+    return '/'.join('{id}' if segment.isdigit() else segment for segment in path.split('/'))
+
+
+def atomic_write(path, data, sync=False):
+    """
+    Writes ``data`` (bytes) to ``path`` by replacing it with a temporary file in the same directory, so readers see
+    either the old or the new content. With ``sync`` the data is flushed to disk before the file is replaced.
+    """
+    fd, tmp_path = tempfile.mkstemp(prefix='.%s.' % os.path.basename(path), suffix='.tmp',
+                                    dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def bounded_map(func, iterable, workers, ordered=True, window=None):
+    """
+    Calls ``func`` for each item of ``iterable`` on a pool of ``workers`` threads and yields the results, either in
+    input order or as they complete. At most ``window`` (default: twice the number of workers) items are in flight,
+    so ``iterable`` may be a large or lazy sequence.
+    """
+    window = max(window or workers * 2, 1)
+    items = iter(iterable)
+    executor = ThreadPoolExecutor(max_workers=max(workers, 1))
+
+    def _submit(n):
+        return [executor.submit(func, item) for item in itertools.islice(items, n)]
+
+    pending = deque(_submit(window))
+    try:
+        if ordered:
+            while pending:
+                future = pending.popleft()
+                result = future.result()
+                pending.extend(_submit(1))
+                yield result
+        else:
+            while pending:
+                done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+                pending = deque(not_done)
+                pending.extend(_submit(len(done)))
+                for future in done:
+                    yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+class SingleFlight(object):
+    """
+    Runs a function only once for concurrent calls with the same key. Callers arriving while a call for their key is
+    in flight wait for it and share its result (or exception).
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            future = self._calls.get(key, None)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]